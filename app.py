@@ -4,1181 +4,221 @@ Improved Flask Recruitment Analytics Dashboard
 Now compatible with your specific Excel file structure
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+from flask import Flask, Response, g, render_template, request, jsonify, send_file
+from datetime import date, datetime, timedelta
+import importlib
 import json
 import io
+import csv
+import tempfile
 import base64
 from werkzeug.utils import secure_filename
 import os
+import signal
 import sqlite3
 import hashlib
+import threading
+import time
+import uuid
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from contextlib import contextmanager
 import warnings
+import metrics
+import memory_trace
+import query_trace
 warnings.filterwarnings('ignore')
 
-app = Flask(__name__)
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+# pandas, numpy and scikit-learn (via ml_models) take over a second to import,
+# so they load on the first data request instead of at worker start
+pd = LazyModule('pandas')
+np = LazyModule('numpy')
+ml_models = LazyModule('ml_models')
+frame_store = LazyModule('frame_store')
+snapshots = LazyModule('snapshots')
+archive = LazyModule('archive')
+duckdb_backend = LazyModule('duckdb_backend')
+polars_transform = LazyModule('polars_transform')
+
+# Templates ship next to app.py and are used as-is
+app = Flask(__name__, template_folder='.')
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['DATABASE'] = 'recruitment_data.db'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-
-# Ensure directories exist
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-os.makedirs('templates', exist_ok=True)
-os.makedirs('static/css', exist_ok=True)
-os.makedirs('static/js', exist_ok=True)
+app.config['CACHE_MAX_ENTRIES'] = 256  # serialized dashboard payloads kept in memory
+app.config['CACHE_WARMUP'] = True  # precompute default views after each upload
+app.config['MODELS_FOLDER'] = 'models'  # versioned ML artifacts, one subfolder per database
+app.config['AUTO_TRAIN_MODELS'] = True  # retrain ML models after each upload
+app.config['SQL_TRACE'] = os.environ.get('SQL_TRACE') == '1'  # time every statement, see /api/sql-trace
+app.config['SQL_SLOW_QUERY_MS'] = float(os.environ.get('SQL_SLOW_QUERY_MS', 100))  # log + EXPLAIN above this
+app.config['MEMORY_PROFILE'] = os.environ.get('MEMORY_PROFILE') == '1'  # tracemalloc per request, see /api/memory-profile
+app.config['MEMORY_PROFILE_LOG'] = 'logs/memory_profile.log'  # rotating JSON lines
+app.config['MEMORY_PROFILE_TOP'] = 10  # allocation sites kept per request / stage
+app.config['PREFORK_MASTER_PID'] = None  # set by serve.py; uploads signal it to reload workers
+app.config['FRAME_STORE'] = False  # share prepared frames across worker processes (turned on by serve.py)
+app.config['FRAME_STORE_FOLDER'] = 'frame_store'  # registry of shared-memory segments
+app.config['FRAME_STORE_UPLOADS'] = 3  # latest uploads kept in shared memory
+app.config['SNAPSHOTS'] = True  # read prepared sheets from columnar snapshots instead of SQLite
+app.config['SNAPSHOT_FOLDER'] = 'snapshots'  # <upload id>/<sheet>/ of memory-mapped .npy columns
+app.config['QUERY_BACKEND'] = os.environ.get('QUERY_BACKEND', 'pandas')  # 'pandas' or 'duckdb' (if installed)
+app.config['DUCKDB_TABLES'] = 4  # upload sheets kept as DuckDB tables per process
+app.config['INGEST_ENGINE'] = os.environ.get('INGEST_ENGINE', 'pandas')  # prepare_df engine: 'pandas' or 'polars' (if installed)
+app.config['RETENTION_UPLOADS'] = int(os.environ.get('RETENTION_UPLOADS', 0))  # latest uploads kept in SQLite; older ones are archived (0 = keep all)
+app.config['RETENTION_INTERVAL'] = 24 * 3600  # seconds between background retention runs
+app.config['ARCHIVE_FOLDER'] = 'archive'  # compressed upload_<id>.npz files of archived uploads
+app.config['DAILY_REFRESH'] = True  # after midnight, rebuild pipeline saved views and warm the default dashboards
+app.config['DAILY_REFRESH_DELAY'] = 60  # seconds past midnight the daily refresh waits
 
 # Color palette for consistency
 COLORS = ['#062C3A', '#ABC100', '#5D858B', '#00617E', '#00A4A6', '#97B8BB', 
           '#F4A41D', '#71164C', '#E2EC57', '#75A1D2', '#344893', '#00A78B', '#C8313F']
 
-def create_clean_templates():
-    """Create clean, separate template files"""
-    
-    # Create base.html - CLEAN VERSION
-    base_template = '''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{% block title %}Recruitment Analytics Dashboard{% endblock %}</title>
-    
-    <!-- Bootstrap CSS -->
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    
-    <!-- Font Awesome -->
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-    
-    <!-- Plotly.js -->
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-    
-    <style>
-        :root {
-            --primary-color: #062C3A;
-            --secondary-color: #ABC100;
-            --accent-1: #5D858B;
-            --accent-2: #00617E;
-        }
-        
-        body {
-            background-color: #ffffff;
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            color: #333;
-        }
-        
-        .navbar {
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            padding: 1rem 0;
-        }
-        
-        .text-primary {
-            color: var(--primary-color) !important;
-        }
-        
-        .btn-primary {
-            background-color: var(--primary-color);
-            border-color: var(--primary-color);
-        }
-        
-        .btn-primary:hover {
-            background-color: #051e26;
-            border-color: #051e26;
-        }
-        
-        .upload-area {
-            border: 2px dashed #dee2e6;
-            border-radius: 8px;
-            padding: 3rem;
-            text-align: center;
-            transition: all 0.3s ease;
-            cursor: pointer;
-            background-color: #fafafa;
-        }
-        
-        .upload-area:hover {
-            border-color: var(--primary-color);
-            background-color: #f0f8ff;
-        }
-        
-        .upload-area.dragover {
-            border-color: var(--secondary-color);
-            background-color: #f0fff0;
-            transform: scale(1.02);
-        }
-        
-        .kpi-card {
-            background: linear-gradient(135deg, #fff 0%, #f8f9fa 100%);
-            border: 1px solid #dee2e6;
-            border-radius: 12px;
-            padding: 2rem 1.5rem;
-            text-align: center;
-            transition: transform 0.3s ease, box-shadow 0.3s ease;
-            height: 120px;
-            display: flex;
-            flex-direction: column;
-            justify-content: center;
-        }
-        
-        .kpi-card:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 8px 25px rgba(0,0,0,0.1);
-        }
-        
-        .kpi-value {
-            font-size: 2.5rem;
-            font-weight: bold;
-            color: var(--primary-color);
-            margin-bottom: 0.5rem;
-            line-height: 1;
-        }
-        
-        .kpi-label {
-            font-size: 0.9rem;
-            color: #666;
-            font-weight: 500;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }
-        
-        .card {
-            border: none;
-            border-radius: 12px;
-            box-shadow: 0 2px 12px rgba(0,0,0,0.08);
-            transition: box-shadow 0.3s ease;
-        }
-        
-        .card:hover {
-            box-shadow: 0 4px 20px rgba(0,0,0,0.12);
-        }
-        
-        .card-header {
-            background-color: #f8f9fa;
-            border-bottom: 1px solid #dee2e6;
-            border-radius: 12px 12px 0 0 !important;
-            padding: 1rem 1.5rem;
-        }
-        
-        .nav-tabs {
-            border-bottom: 2px solid #dee2e6;
-        }
-        
-        .nav-tabs .nav-link {
-            border: none;
-            color: #666;
-            font-weight: 500;
-            padding: 1rem 1.5rem;
-            transition: all 0.3s ease;
-        }
-        
-        .nav-tabs .nav-link:hover {
-            border-color: transparent;
-            color: var(--primary-color);
-            background-color: #f8f9fa;
-        }
-        
-        .nav-tabs .nav-link.active {
-            color: var(--primary-color);
-            background-color: #fff;
-            border-color: var(--primary-color) var(--primary-color) #fff;
-            border-width: 0 0 3px 0;
-            font-weight: 600;
-        }
-        
-        .chart-container {
-            min-height: 400px;
-            padding: 1rem;
-        }
-        
-        .loading-overlay {
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            background-color: rgba(255, 255, 255, 0.9);
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            z-index: 9999;
-            flex-direction: column;
-        }
-        
-        .debug-info {
-            background: #f8f9fa;
-            border: 1px solid #dee2e6;
-            border-radius: 8px;
-            padding: 1rem;
-            margin: 1rem 0;
-            font-family: monospace;
-            font-size: 0.9rem;
-        }
-        
-        @media (max-width: 768px) {
-            .kpi-card {
-                margin-bottom: 1rem;
-                height: auto;
-                padding: 1.5rem 1rem;
-            }
-            
-            .kpi-value {
-                font-size: 2rem;
-            }
-        }
-    </style>
-</head>
-<body>
-    <!-- Header -->
-    <nav class="navbar navbar-expand-lg navbar-light bg-white border-bottom">
-        <div class="container-fluid">
-            <div class="navbar-brand d-flex align-items-center">
-                <i class="fas fa-chart-line fa-2x me-3 text-primary"></i>
-                <h2 class="mb-0 text-primary">Recruitment Analytics Dashboard</h2>
-            </div>
-            <div class="navbar-nav ms-auto">
-                <button class="btn btn-primary btn-sm" id="exportBtn" disabled>
-                    <i class="fas fa-download me-2"></i>Export Report
-                </button>
-            </div>
-        </div>
-    </nav>
-
-    <!-- Main Content -->
-    <div class="container-fluid mt-4">
-        {% block content %}{% endblock %}
-    </div>
-
-    <!-- Loading Overlay -->
-    <div id="loadingOverlay" class="loading-overlay d-none">
-        <div class="loading-spinner">
-            <div class="spinner-border text-primary" role="status">
-                <span class="visually-hidden">Loading...</span>
-            </div>
-            <p class="mt-3">Processing data...</p>
-        </div>
-    </div>
-
-    <!-- Bootstrap JS -->
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
-    
-    {% block scripts %}{% endblock %}
-</body>
-</html>'''
-
-    # Create index.html - CLEAN VERSION (extends base, no duplicate blocks)
-    index_template = '''{% extends "base.html" %}
-
-{% block content %}
-<!-- File Upload Section -->
-<div class="row mb-4" id="uploadSection">
-    <div class="col-12">
-        <div class="card">
-            <div class="card-header">
-                <h5 class="mb-0"><i class="fas fa-upload me-2"></i>Data Upload</h5>
-            </div>
-            <div class="card-body">
-                <div class="upload-area" id="uploadArea">
-                    <div class="upload-content">
-                        <i class="fas fa-cloud-upload-alt fa-3x text-muted mb-3"></i>
-                        <h5>Drag and Drop Excel File Here</h5>
-                        <p class="text-muted">or click to browse</p>
-                        <input type="file" id="fileInput" accept=".xlsx,.xls" style="display: none;">
-                    </div>
-                </div>
-                <div id="uploadStatus" class="mt-3"></div>
-                
-                <!-- Debug Information -->
-                <div id="debugInfo" class="debug-info d-none">
-                    <h6>📊 File Analysis:</h6>
-                    <div id="debugContent"></div>
-                </div>
-            </div>
-        </div>
-    </div>
-</div>
-
-<!-- Dashboard Section -->
-<div id="dashboardSection" class="d-none">
-    <!-- Global Filters -->
-    <div class="row mb-4">
-        <div class="col-12">
-            <div class="card">
-                <div class="card-header">
-                    <h5 class="mb-0"><i class="fas fa-filter me-2"></i>Global Filters</h5>
-                </div>
-                <div class="card-body">
-                    <div class="row g-3">
-                        <div class="col-md-3">
-                            <label class="form-label">Hiring Manager</label>
-                            <select class="form-select" id="filterHiringManager" multiple>
-                            </select>
-                        </div>
-                        <div class="col-md-3">
-                            <label class="form-label">TA Partner</label>
-                            <select class="form-select" id="filterTAPartner" multiple>
-                            </select>
-                        </div>
-                        <div class="col-md-3">
-                            <label class="form-label">Country</label>
-                            <select class="form-select" id="filterCountry" multiple>
-                            </select>
-                        </div>
-                        <div class="col-md-3">
-                            <label class="form-label">Project</label>
-                            <select class="form-select" id="filterProject" multiple>
-                            </select>
-                        </div>
-                    </div>
-                    <div class="row g-3 mt-2">
-                        <div class="col-md-6">
-                            <label class="form-label">Date Range</label>
-                            <div class="row">
-                                <div class="col-6">
-                                    <input type="date" class="form-control" id="startDate">
-                                </div>
-                                <div class="col-6">
-                                    <input type="date" class="form-control" id="endDate">
-                                </div>
-                            </div>
-                        </div>
-                        <div class="col-md-6 d-flex align-items-end">
-                            <button class="btn btn-secondary me-2" id="resetFilters">
-                                <i class="fas fa-undo me-2"></i>Reset
-                            </button>
-                            <button class="btn btn-primary" id="applyFilters">
-                                <i class="fas fa-search me-2"></i>Apply Filters
-                            </button>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- Dashboard Tabs -->
-    <div class="row">
-        <div class="col-12">
-            <ul class="nav nav-tabs" id="dashboardTabs" role="tablist">
-                <li class="nav-item" role="presentation">
-                    <button class="nav-link" id="hired-tab" data-bs-toggle="tab" data-bs-target="#hired-content" 
-                            type="button" role="tab">
-                        <i class="fas fa-chart-line me-2"></i>Hired Performance
-                    </button>
-                </li>
-                <li class="nav-item" role="presentation">
-                    <button class="nav-link" id="pipeline-tab" data-bs-toggle="tab" data-bs-target="#pipeline-content" 
-                            type="button" role="tab">
-                        <i class="fas fa-tasks me-2"></i>Live Pipeline
-                    </button>
-                </li>
-            </ul>
-            
-            <div class="tab-content" id="dashboardTabContent">
-                <!-- Hired Performance Tab -->
-                <div class="tab-pane fade" id="hired-content" role="tabpanel">
-                    <!-- KPI Cards -->
-                    <div class="row mb-4 mt-4">
-                        <div class="col-md-3">
-                            <div class="kpi-card">
-                                <div class="kpi-value" id="totalFilled">-</div>
-                                <div class="kpi-label">Total Positions Filled</div>
-                            </div>
-                        </div>
-                        <div class="col-md-3">
-                            <div class="kpi-card">
-                                <div class="kpi-value" id="avgTTF">-</div>
-                                <div class="kpi-label">Avg Time-to-Fill (days)</div>
-                            </div>
-                        </div>
-                        <div class="col-md-3">
-                            <div class="kpi-card">
-                                <div class="kpi-value" id="overallConversion">-</div>
-                                <div class="kpi-label">CV to Interview Rate (%)</div>
-                            </div>
-                        </div>
-                        <div class="col-md-3">
-                            <div class="kpi-card">
-                                <div class="kpi-value" id="avgBudgetVariance">-</div>
-                                <div class="kpi-label">Avg Budget Variance (%)</div>
-                            </div>
-                        </div>
-                    </div>
-
-                    <!-- AI Commentary -->
-                    <div class="row mb-4">
-                        <div class="col-12">
-                            <div class="card">
-                                <div class="card-header">
-                                    <h5 class="mb-0"><i class="fas fa-robot me-2"></i>AI Insights</h5>
-                                </div>
-                                <div class="card-body">
-                                    <div id="hiredCommentary">Loading insights...</div>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-
-                    <!-- Charts Row 1 -->
-                    <div class="row mb-4">
-                        <div class="col-md-6">
-                            <div class="card">
-                                <div class="card-header">
-                                    <h5 class="mb-0">Recruitment Funnel</h5>
-                                </div>
-                                <div class="card-body">
-                                    <div id="funnelChart" class="chart-container"></div>
-                                </div>
-                            </div>
-                        </div>
-                        <div class="col-md-6">
-                            <div class="card">
-                                <div class="card-header">
-                                    <h5 class="mb-0">Time-to-Fill Analysis</h5>
-                                </div>
-                                <div class="card-body">
-                                    <div id="ttfChart" class="chart-container"></div>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-
-                    <!-- Charts Row 2 -->
-                    <div class="row mb-4">
-                        <div class="col-md-6">
-                            <div class="card">
-                                <div class="card-header">
-                                    <h5 class="mb-0">Financial Analysis</h5>
-                                </div>
-                                <div class="card-body">
-                                    <div id="financialChart" class="chart-container"></div>
-                                </div>
-                            </div>
-                        </div>
-                        <div class="col-md-6">
-                            <div class="card">
-                                <div class="card-header">
-                                    <h5 class="mb-0">Performance Leaderboard</h5>
-                                </div>
-                                <div class="card-body">
-                                    <div id="leaderboardTable" class="chart-container"></div>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-
-                <!-- Live Pipeline Tab -->
-                <div class="tab-pane fade" id="pipeline-content" role="tabpanel">
-                    <!-- KPI Cards -->
-                    <div class="row mb-4 mt-4">
-                        <div class="col-md-3">
-                            <div class="kpi-card">
-                                <div class="kpi-value" id="totalOpen">-</div>
-                                <div class="kpi-label">Total Open Positions</div>
-                            </div>
-                        </div>
-                        <div class="col-md-3">
-                            <div class="kpi-card">
-                                <div class="kpi-value" id="avgAge">-</div>
-                                <div class="kpi-label">Avg Position Age (days)</div>
-                            </div>
-                        </div>
-                        <div class="col-md-3">
-                            <div class="kpi-card">
-                                <div class="kpi-value" id="positionsOver60">-</div>
-                                <div class="kpi-label">Positions >60 days</div>
-                            </div>
-                        </div>
-                        <div class="col-md-3">
-                            <div class="kpi-card">
-                                <div class="kpi-value" id="bottleneckStage">-</div>
-                                <div class="kpi-label">Most Common Stage</div>
-                            </div>
-                        </div>
-                    </div>
-
-                    <!-- AI Commentary -->
-                    <div class="row mb-4">
-                        <div class="col-12">
-                            <div class="card">
-                                <div class="card-header">
-                                    <h5 class="mb-0"><i class="fas fa-robot me-2"></i>AI Insights</h5>
-                                </div>
-                                <div class="card-body">
-                                    <div id="pipelineCommentary">Loading insights...</div>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-
-                    <!-- Charts -->
-                    <div class="row mb-4">
-                        <div class="col-md-6">
-                            <div class="card">
-                                <div class="card-header">
-                                    <h5 class="mb-0">Pipeline Stage Distribution</h5>
-                                </div>
-                                <div class="card-body">
-                                    <div id="stageChart" class="chart-container"></div>
-                                </div>
-                            </div>
-                        </div>
-                        <div class="col-md-6">
-                            <div class="card">
-                                <div class="card-header">
-                                    <h5 class="mb-0">Resource Analysis</h5>
-                                </div>
-                                <div class="card-body">
-                                    <div id="resourceChart" class="chart-container"></div>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-</div>
-{% endblock %}
-
-{% block scripts %}
-<script>
-// Professional Color Palette
-const COLORS = ['#062C3A', '#ABC100', '#5D858B', '#00617E', '#00A4A6', '#97B8BB', 
-                '#F4A41D', '#71164C', '#E2EC57', '#75A1D2', '#344893', '#00A78B', '#C8313F'];
-
-// Global State Management
-let dashboardState = {
-    hasHiredData: false,
-    hasFinalData: false,
-    currentDashboard: 'hired',
-    currentUploadId: null,
-    isLoading: false,
-    debugMode: true
-};
-
-// Application Initialization
-document.addEventListener('DOMContentLoaded', function() {
-    console.log('🚀 Initializing Recruitment Analytics Dashboard...');
-    initializeFileUpload();
-    initializeFilters();
-    initializeTabs();
-    console.log('✅ Dashboard initialized successfully');
-});
-
-// File Upload System
-function initializeFileUpload() {
-    const uploadArea = document.getElementById('uploadArea');
-    const fileInput = document.getElementById('fileInput');
-    
-    // Click to upload
-    uploadArea.addEventListener('click', () => fileInput.click());
-    
-    // Drag and drop functionality
-    uploadArea.addEventListener('dragover', handleDragOver);
-    uploadArea.addEventListener('dragleave', handleDragLeave);
-    uploadArea.addEventListener('drop', handleFileDrop);
-    
-    // File input change
-    fileInput.addEventListener('change', (e) => {
-        if (e.target.files.length > 0) {
-            processFileUpload(e.target.files[0]);
-        }
-    });
-    
-    console.log('📁 File upload system initialized');
-}
-
-function handleDragOver(e) {
-    e.preventDefault();
-    e.currentTarget.classList.add('dragover');
-}
-
-function handleDragLeave(e) {
-    e.preventDefault();
-    e.currentTarget.classList.remove('dragover');
-}
-
-function handleFileDrop(e) {
-    e.preventDefault();
-    e.currentTarget.classList.remove('dragover');
-    
-    const files = e.dataTransfer.files;
-    if (files.length > 0) {
-        processFileUpload(files[0]);
-    }
-}
-
-function processFileUpload(file) {
-    console.log('📤 Processing file upload:', file.name);
-    
-    // Show debug info
-    if (dashboardState.debugMode) {
-        showDebugInfo(`Processing: ${file.name} (${(file.size / 1024 / 1024).toFixed(2)} MB)`);
-    }
-    
-    // Validate file type
-    if (!file.name.match(/\\.(xlsx|xls)$/i)) {
-        showNotification('Please upload an Excel file (.xlsx or .xls)', 'error');
-        return;
-    }
-    
-    // Validate file size (16MB limit)
-    if (file.size > 16 * 1024 * 1024) {
-        showNotification('File too large. Maximum size is 16MB.', 'error');
-        return;
-    }
-    
-    uploadFileToServer(file);
-}
-
-function uploadFileToServer(file) {
-    dashboardState.isLoading = true;
-    showLoadingState(true);
-    
-    const formData = new FormData();
-    formData.append('file', file);
-    
-    fetch('/upload', {
-        method: 'POST',
-        body: formData
-    })
-    .then(response => response.json())
-    .then(handleUploadResponse)
-    .catch(handleUploadError)
-    .finally(() => {
-        dashboardState.isLoading = false;
-        showLoadingState(false);
-    });
-}
-
-function handleUploadResponse(data) {
-    if (data.success) {
-        console.log('✅ File uploaded successfully');
-        
-        // Update dashboard state
-        dashboardState.hasHiredData = data.has_hired;
-        dashboardState.hasFinalData = data.has_final;
-        dashboardState.currentUploadId = data.upload_id;
-        
-        // Show debug info
-        if (dashboardState.debugMode && data.debug_info) {
-            showDebugInfo(data.debug_info);
-        }
-        
-        showNotification(data.message, 'success');
-        initializeDashboard();
-    } else {
-        console.error('❌ Upload failed:', data.error);
-        showNotification(data.error || 'Upload failed', 'error');
-        
-        // Show debug info for errors
-        if (data.debug_info) {
-            showDebugInfo(data.debug_info);
-        }
-    }
-}
-
-function handleUploadError(error) {
-    console.error('❌ Upload error:', error);
-    showNotification('Upload failed: ' + error.message, 'error');
-}
-
-function showDebugInfo(info) {
-    const debugDiv = document.getElementById('debugInfo');
-    const debugContent = document.getElementById('debugContent');
-    
-    debugContent.innerHTML = `<pre>${info}</pre>`;
-    debugDiv.classList.remove('d-none');
-}
-
-// Dashboard Initialization
-function initializeDashboard() {
-    console.log('🎯 Initializing dashboard views...');
-    
-    // Show dashboard section
-    document.getElementById('dashboardSection').classList.remove('d-none');
-    document.getElementById('exportBtn').disabled = false;
-    
-    // Setup tabs based on available data
-    setupDashboardTabs();
-    
-    // Load filter options
-    loadFilterOptions();
-    
-    console.log('✅ Dashboard views initialized');
-}
-
-function setupDashboardTabs() {
-    const hiredTab = document.getElementById('hired-tab');
-    const pipelineTab = document.getElementById('pipeline-tab');
-    
-    // Reset tab states
-    hiredTab.classList.remove('active', 'disabled');
-    pipelineTab.classList.remove('active', 'disabled');
-    
-    if (dashboardState.hasHiredData) {
-        console.log('📊 Hired data available - enabling hired tab');
-        hiredTab.classList.add('active');
-        document.getElementById('hired-content').classList.add('show', 'active');
-        dashboardState.currentDashboard = 'hired';
-        loadDashboardData('hired');
-    } else {
-        hiredTab.classList.add('disabled');
-    }
-    
-    if (dashboardState.hasFinalData) {
-        console.log('📈 Pipeline data available - enabling pipeline tab');
-        if (!dashboardState.hasHiredData) {
-            pipelineTab.classList.add('active');
-            document.getElementById('pipeline-content').classList.add('show', 'active');
-            document.getElementById('hired-content').classList.remove('show', 'active');
-            dashboardState.currentDashboard = 'pipeline';
-            loadDashboardData('pipeline');
-        }
-    } else {
-        pipelineTab.classList.add('disabled');
-    }
-}
-
-// Filter System
-function initializeFilters() {
-    document.getElementById('applyFilters').addEventListener('click', applyFilters);
-    document.getElementById('resetFilters').addEventListener('click', resetFilters);
-    console.log('🔍 Filter system initialized');
-}
-
-function loadFilterOptions() {
-    if (!dashboardState.currentUploadId) return;
-    
-    console.log('🔍 Loading filter options...');
-    
-    const params = new URLSearchParams();
-    params.append('upload_id', dashboardState.currentUploadId);
-    
-    fetch(`/api/filter-options/${dashboardState.currentDashboard}?${params}`)
-    .then(response => response.json())
-    .then(populateFilterDropdowns)
-    .catch(error => {
-        console.error('❌ Error loading filter options:', error);
-    });
-}
-
-function populateFilterDropdowns(data) {
-    console.log('📝 Populating filter dropdowns');
-    
-    const filters = [
-        { id: 'filterHiringManager', data: data.hiring_manager || [] },
-        { id: 'filterTAPartner', data: data.ta_partner || [] },
-        { id: 'filterCountry', data: data.country || [] },
-        { id: 'filterProject', data: data.project || [] }
-    ];
-    
-    filters.forEach(filter => {
-        const select = document.getElementById(filter.id);
-        select.innerHTML = '';
-        
-        filter.data.forEach(option => {
-            const optionElement = document.createElement('option');
-            optionElement.value = option;
-            optionElement.textContent = option;
-            select.appendChild(optionElement);
-        });
-    });
-    
-    // Set date range
-    if (data.date_range) {
-        document.getElementById('startDate').value = data.date_range.min || '';
-        document.getElementById('endDate').value = data.date_range.max || '';
-    }
+# Query parameter -> column used by the global filters
+FILTER_MAPPING = {
+    'hiring_manager': 'hiring_manager',
+    'ta_partner': 'ta_partner',
+    'country': 'job_location_country',
+    'project': 'project_name'
 }
 
-function applyFilters() {
-    console.log('🔍 Applying filters...');
-    loadDashboardData(dashboardState.currentDashboard);
+# Columns the dashboard aggregations read, per view; filters add the columns they test
+DASHBOARD_COLUMNS = {
+    'hired': ['time_to_fill', 'cv_to_interview_rate', 'budget_variance_pct', 'job_title', 'ta_partner',
+              'job_ref_id', 'number_of_cvs_shared', 'number_of_candidates_interviewed',
+              'number_of_candidates_offered', 'number_of_candidates_accepted_offer'],
+    'pipeline': ['position_created_date', 'job_state', 'project_name']
 }
 
-function resetFilters() {
-    console.log('🔄 Resetting filters...');
-    
-    // Clear all filter selections
-    ['filterHiringManager', 'filterTAPartner', 'filterCountry', 'filterProject'].forEach(id => {
-        document.getElementById(id).selectedIndex = -1;
-    });
-    
-    // Clear date inputs
-    document.getElementById('startDate').value = '';
-    document.getElementById('endDate').value = '';
-    
-    // Reload data
-    loadDashboardData(dashboardState.currentDashboard);
+# Whitelisted pivot dimensions -> source column
+PIVOT_DIMENSIONS = {
+    'title': 'job_title',
+    'role': 'job_title',
+    'partner': 'ta_partner',
+    'manager': 'hiring_manager',
+    'country': 'job_location_country',
+    'project': 'project_name',
+    'business_line': 'business_line',
+    'service_line': 'service_line',
+    'month': 'position_created_date'
 }
 
-// Tab Management
-function initializeTabs() {
-    document.getElementById('hired-tab').addEventListener('click', () => switchToTab('hired'));
-    document.getElementById('pipeline-tab').addEventListener('click', () => switchToTab('pipeline'));
-    console.log('📑 Tab system initialized');
+# Whitelisted pivot measures -> (source column, aggregation)
+PIVOT_MEASURES = {
+    'count': (None, 'size'),
+    'ttf_mean': ('time_to_fill', 'mean'),
+    'ttf_median': ('time_to_fill', 'median'),
+    'ttf_count': ('time_to_fill', 'count'),
+    'ttf_sum': ('time_to_fill', 'sum'),
+    'budget_variance': ('budget_variance_pct', 'mean'),
+    'conversion': ('cv_to_interview_rate', 'mean')
 }
 
-function switchToTab(tabType) {
-    if (tabType === 'hired' && !dashboardState.hasHiredData) return;
-    if (tabType === 'pipeline' && !dashboardState.hasFinalData) return;
-    
-    console.log(`🔄 Switching to ${tabType} tab`);
-    
-    dashboardState.currentDashboard = tabType;
-    loadDashboardData(tabType);
+# Indexed sort keys for keyset pagination of row-level detail, per table
+ROW_SORT_KEYS = {
+    'hired_data': ['id', 'position_created_date', 'filled_date', 'time_to_fill'],
+    'final_data': ['id', 'position_created_date']
 }
 
-// Data Loading and Visualization
-function loadDashboardData(dashboardType) {
-    if (!dashboardState.currentUploadId) return;
-    
-    console.log(`📊 Loading ${dashboardType} dashboard data...`);
-    showLoadingState(true);
-    
-    const params = buildFilterParams();
-    
-    fetch(`/api/dashboard-data/${dashboardType}?${params}`)
-    .then(response => response.json())
-    .then(data => {
-        if (data.error) {
-            showNotification(data.error, 'error');
-            return;
-        }
-        
-        if (dashboardType === 'hired') {
-            renderHiredDashboard(data);
-        } else {
-            renderPipelineDashboard(data);
-        }
-        
-        console.log(`✅ ${dashboardType} dashboard rendered`);
-    })
-    .catch(error => {
-        console.error(`❌ Error loading ${dashboardType} data:`, error);
-        showNotification('Error loading dashboard data', 'error');
-    })
-    .finally(() => {
-        showLoadingState(false);
-    });
+# Sort keys computed at query time -> indexed column they order by in reverse
+ROW_DERIVED_SORT_KEYS = {
+    'hired_data': {},
+    'final_data': {'position_age': 'position_created_date'}
 }
 
-function buildFilterParams() {
-    const params = new URLSearchParams();
-    params.append('upload_id', dashboardState.currentUploadId);
-    
-    // Add filter parameters
-    const filters = [
-        { id: 'filterHiringManager', param: 'hiring_manager' },
-        { id: 'filterTAPartner', param: 'ta_partner' },
-        { id: 'filterCountry', param: 'country' },
-        { id: 'filterProject', param: 'project' }
-    ];
-    
-    filters.forEach(filter => {
-        const select = document.getElementById(filter.id);
-        const selected = Array.from(select.selectedOptions).map(option => option.value);
-        if (selected.length > 0) {
-            params.append(filter.param, selected.join(','));
-        }
-    });
-    
-    // Add date range
-    const startDate = document.getElementById('startDate').value;
-    const endDate = document.getElementById('endDate').value;
-    if (startDate) params.append('start_date', startDate);
-    if (endDate) params.append('end_date', endDate);
-    
-    return params.toString();
-}
-
-// Dashboard Rendering Functions
-function renderHiredDashboard(data) {
-    console.log('🎨 Rendering hired dashboard...');
-    
-    // Update KPIs
-    if (data.kpis) {
-        updateElement('totalFilled', data.kpis.total_filled.toLocaleString());
-        updateElement('avgTTF', data.kpis.avg_ttf.toFixed(1));
-        updateElement('overallConversion', data.kpis.overall_conversion.toFixed(1) + '%');
-        updateElement('avgBudgetVariance', formatVariance(data.kpis.avg_budget_variance));
-    }
-    
-    // Update commentary
-    if (data.commentary) {
-        updateElement('hiredCommentary', data.commentary);
-    }
-    
-    // Render charts
-    if (data.funnel) renderFunnelChart('funnelChart', data.funnel);
-    if (data.ttf_by_role) renderTTFChart('ttfChart', data.ttf_by_role);
-    if (data.financial) renderFinancialChart('financialChart', data.financial);
-    if (data.leaderboard) renderLeaderboardTable('leaderboardTable', data.leaderboard);
+# Date columns, stored as integer days since EPOCH
+EPOCH = date(1970, 1, 1)
+DATE_COLUMNS = {
+    'hired_data': ['position_created_date', 'filled_date'],
+    'final_data': ['position_created_date']
 }
 
-function renderPipelineDashboard(data) {
-    console.log('🎨 Rendering pipeline dashboard...');
-    
-    // Update KPIs
-    if (data.kpis) {
-        updateElement('totalOpen', data.kpis.total_open.toLocaleString());
-        updateElement('avgAge', data.kpis.avg_age.toFixed(1));
-        updateElement('positionsOver60', data.kpis.positions_over_60.toLocaleString());
-        updateElement('bottleneckStage', data.kpis.bottleneck_stage);
-    }
-    
-    // Update commentary
-    if (data.commentary) {
-        updateElement('pipelineCommentary', data.commentary);
+# Row columns computed at query time: dates are returned as YYYY-MM-DD, and
+# {as_of_day} is the as-of date's day number. The date aliases shadow the
+# stored columns in ORDER BY, so conditions and sorts qualify stored columns.
+ROW_COMPUTED_COLUMNS = {
+    'hired_data': {
+        'position_created_date': "date(position_created_date * 86400, 'unixepoch')",
+        'filled_date': "date(filled_date * 86400, 'unixepoch')"
+    },
+    'final_data': {
+        'position_created_date': "date(position_created_date * 86400, 'unixepoch')",
+        'position_age': '{as_of_day} - final_data.position_created_date'
     }
-    
-    // Render charts
-    if (data.stage_distribution) renderStageChart('stageChart', data.stage_distribution);
-    if (data.resource_distribution) renderResourceChart('resourceChart', data.resource_distribution);
-}
-
-// Chart Rendering Functions
-function renderFunnelChart(elementId, data) {
-    if (!data.stages || !data.values) return;
-    
-    const trace = {
-        type: 'funnel',
-        y: data.stages,
-        x: data.values,
-        textinfo: 'value+percent initial',
-        marker: { color: COLORS.slice(0, data.stages.length) },
-        connector: { line: { color: 'rgba(0,0,0,0.3)', width: 2 } }
-    };
-
-    const layout = {
-        title: { text: 'Recruitment Funnel Analysis', font: { size: 16, color: COLORS[0] } },
-        margin: { t: 60, l: 100, r: 50, b: 50 },
-        paper_bgcolor: 'white',
-        plot_bgcolor: 'white'
-    };
-
-    Plotly.newPlot(elementId, [trace], layout, { responsive: true, displayModeBar: false });
-}
-
-function renderTTFChart(elementId, data) {
-    if (!data.roles || !data.values) return;
-    
-    const trace = {
-        type: 'bar',
-        x: data.values,
-        y: data.roles,
-        orientation: 'h',
-        marker: { color: COLORS[0] },
-        text: data.values.map(v => `${v.toFixed(1)} days`),
-        textposition: 'inside',
-        textfont: { color: 'white' }
-    };
-
-    const layout = {
-        title: { text: 'Average Time-to-Fill by Role', font: { size: 16, color: COLORS[0] } },
-        xaxis: { title: 'Days' },
-        yaxis: { title: 'Role', automargin: true },
-        margin: { t: 60, l: 150, r: 50, b: 80 },
-        paper_bgcolor: 'white',
-        plot_bgcolor: 'white'
-    };
-
-    Plotly.newPlot(elementId, [trace], layout, { responsive: true, displayModeBar: false });
 }
 
-function renderFinancialChart(elementId, data) {
-    if (!data.variance_data || data.variance_data.length === 0) {
-        document.getElementById(elementId).innerHTML = '<p class="text-muted text-center">No financial data available</p>';
-        return;
+# Named drill-down predicates (KPI / chart segments) per table; {name} is a computed column
+ROW_METRIC_PREDICATES = {
+    'hired_data': {
+        'ttf_over_45': 'time_to_fill > 45',
+        'ttf_over_60': 'time_to_fill > 60',
+        'over_budget': 'budget_variance_pct > 0',
+        'under_budget': 'budget_variance_pct < 0',
+        'no_interviews': 'number_of_candidates_interviewed = 0'
+    },
+    'final_data': {
+        'positions_over_60': '{position_age} > 60',
+        'positions_over_45': '{position_age} > 45',
+        'no_cvs': 'number_of_cvs_shared = 0'
     }
-    
-    const trace = {
-        type: 'histogram',
-        x: data.variance_data,
-        marker: { color: COLORS[1], opacity: 0.8 },
-        nbinsx: 15
-    };
-
-    const layout = {
-        title: { text: 'Budget Variance Distribution', font: { size: 16, color: COLORS[0] } },
-        xaxis: { title: 'Budget Variance (%)' },
-        yaxis: { title: 'Number of Positions' },
-        margin: { t: 60, l: 80, r: 50, b: 80 },
-        paper_bgcolor: 'white',
-        plot_bgcolor: 'white'
-    };
-
-    Plotly.newPlot(elementId, [trace], layout, { responsive: true, displayModeBar: false });
 }
 
-function renderStageChart(elementId, data) {
-    if (!data.stages || !data.values) return;
-    
-    const trace = {
-        type: 'bar',
-        x: data.stages,
-        y: data.values,
-        marker: { color: COLORS.slice(0, data.stages.length) },
-        text: data.values,
-        textposition: 'outside'
-    };
-
-    const layout = {
-        title: { text: 'Pipeline Stage Distribution', font: { size: 16, color: COLORS[0] } },
-        xaxis: { title: 'Job State' },
-        yaxis: { title: 'Number of Positions' },
-        margin: { t: 60, l: 80, r: 50, b: 100 },
-        paper_bgcolor: 'white',
-        plot_bgcolor: 'white'
-    };
-
-    Plotly.newPlot(elementId, [trace], layout, { responsive: true, displayModeBar: false });
-}
+ROWS_PAGE_SIZE = 50
+ROWS_MAX_PAGE_SIZE = 500
 
-function renderResourceChart(elementId, data) {
-    if (!data.stages || !data.values) return;
-    
-    const trace = {
-        type: 'pie',
-        labels: data.stages,
-        values: data.values,
-        marker: { colors: COLORS.slice(0, data.stages.length) },
-        textinfo: 'label+percent',
-        textposition: 'auto'
-    };
-
-    const layout = {
-        title: { text: 'Resource Distribution', font: { size: 16, color: COLORS[0] } },
-        margin: { t: 60, l: 50, r: 50, b: 50 },
-        paper_bgcolor: 'white',
-        plot_bgcolor: 'white'
-    };
-
-    Plotly.newPlot(elementId, [trace], layout, { responsive: true, displayModeBar: false });
-}
+# Streaming exports read this many rows per cursor fetch
+EXPORT_BATCH_SIZE = 5000
+EXPORT_CHUNK_SIZE = 64 * 1024
+# XLSX can only be zipped once every row is in, so larger exports are sent to CSV
+EXPORT_XLSX_MAX_ROWS = 100000
+EXPORT_XLSX_SPOOL_BYTES = 8 * 1024 * 1024  # finished workbooks up to this size never touch disk
 
-function renderLeaderboardTable(elementId, data) {
-    if (!data || data.length === 0) {
-        document.getElementById(elementId).innerHTML = '<p class="text-muted text-center">No leaderboard data available</p>';
-        return;
-    }
+# In-memory cache of serialized JSON payloads, see get_cached_payload()
+_payload_cache = OrderedDict()
+_payload_cache_lock = threading.Lock()
 
-    let tableHTML = `
-        <div class="table-responsive">
-            <table class="table table-striped table-hover">
-                <thead class="table-dark">
-                    <tr>
-                        <th>Rank</th>
-                        <th>TA Partner</th>
-                        <th>Avg TTF</th>
-                        <th>CV-Interview %</th>
-                        <th>Total Hires</th>
-                    </tr>
-                </thead>
-                <tbody>
-    `;
-
-    data.forEach((partner, index) => {
-        const rankClass = index === 0 ? 'table-success' : '';
-        const rankIcon = index === 0 ? '🏆' : index === 1 ? '🥈' : index === 2 ? '🥉' : '';
-        
-        tableHTML += `
-            <tr class="${rankClass}">
-                <td><strong>${rankIcon} ${index + 1}</strong></td>
-                <td>${partner.ta_partner}</td>
-                <td>${typeof partner.avg_ttf === 'number' ? partner.avg_ttf.toFixed(1) : 'N/A'}</td>
-                <td>${typeof partner.conversion_rate === 'number' ? partner.conversion_rate.toFixed(1) + '%' : 'N/A'}</td>
-                <td>${partner.total_hires}</td>
-            </tr>
-        `;
-    });
-
-    tableHTML += '</tbody></table></div>';
-    document.getElementById(elementId).innerHTML = tableHTML;
-}
+# Background work (cache warm-up) runs here so uploads return immediately
+_background_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='dashboard-bg')
 
-// Utility Functions
-function updateElement(id, content) {
-    const element = document.getElementById(id);
-    if (element) {
-        element.innerHTML = content;
-    }
-}
+# Model training runs in a separate process, created on first use
+_training_executor = None
+_training_jobs = {}
+_training_lock = threading.Lock()
 
-function formatVariance(value) {
-    if (typeof value !== 'number') return 'N/A';
-    return (value >= 0 ? '+' : '') + value.toFixed(1) + '%';
-}
+# Prepared frames of the latest uploads, loaded by the pre-fork master (serve.py)
+# and shared copy-on-write by its workers; treated as read-only
+_preloaded_frames = {}
 
-function showNotification(message, type = 'info') {
-    const alertClass = {
-        'success': 'alert-success',
-        'error': 'alert-danger',
-        'warning': 'alert-warning',
-        'info': 'alert-info'
-    }[type] || 'alert-info';
-    
-    const icon = {
-        'success': 'fas fa-check-circle',
-        'error': 'fas fa-exclamation-circle',
-        'warning': 'fas fa-exclamation-triangle',
-        'info': 'fas fa-info-circle'
-    }[type] || 'fas fa-info-circle';
-    
-    const uploadStatus = document.getElementById('uploadStatus');
-    uploadStatus.innerHTML = `
-        <div class="alert ${alertClass} alert-dismissible fade show" role="alert">
-            <i class="${icon} me-2"></i>${message}
-            <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
-        </div>
-    `;
-    
-    console.log(`📢 Notification: ${message} (${type})`);
-}
-
-function showLoadingState(show) {
-    const overlay = document.getElementById('loadingOverlay');
-    if (show) {
-        overlay.classList.remove('d-none');
-    } else {
-        overlay.classList.add('d-none');
-    }
-}
+# Retention runs of this process are serialized; the last report is kept for /api/retention
+_retention_lock = threading.Lock()
+_retention_thread = None
+_last_retention = None
 
-// Error Handling
-window.addEventListener('error', function(e) {
-    console.error('❌ JavaScript Error:', e.error);
-    showNotification('An unexpected error occurred. Please refresh the page.', 'error');
-});
+# Thread of start_daily_refresh()
+_daily_refresh_thread = None
 
-// Console Welcome Message
-console.log('%c🎯 Recruitment Analytics Dashboard', 'color: #062C3A; font-size: 20px; font-weight: bold;');
-console.log('%c✨ Compatible with your Excel file structure', 'color: #ABC100; font-size: 14px;');
-console.log('%c🚀 Ready for analysis', 'color: #5D858B; font-size: 12px;');
-</script>
-{% endblock %}'''
-
-    # Write clean template files
-    try:
-        with open('templates/base.html', 'w', encoding='utf-8') as f:
-            f.write(base_template)
-        print("✅ Created clean base.html template")
-        
-        with open('templates/index.html', 'w', encoding='utf-8') as f:
-            f.write(index_template)
-        print("✅ Created clean index.html template")
-        
-        return True
-    except Exception as e:
-        print(f"❌ Error creating templates: {e}")
-        return False
+# Instance id of each database whose schema has been set up by this process
+_initialized_databases = {}
+_schema_lock = threading.Lock()
 
 @contextmanager
 def get_db_connection():
-    conn = sqlite3.connect(app.config['DATABASE'])
+    if app.config['SQL_TRACE']:
+        conn = query_trace.connect(app.config['DATABASE'], app.config['SQL_SLOW_QUERY_MS'] / 1000)
+    else:
+        conn = sqlite3.connect(app.config['DATABASE'])
     conn.row_factory = sqlite3.Row
     try:
         yield conn
@@ -1190,6 +230,20 @@ def init_database():
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
+        # Lets retention hand freed pages back incrementally; only takes effect on a new database
+        cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        
+        # Random id of this database file; files kept beside it (model artifacts)
+        # are filed under it, since upload ids start over in a recreated database
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS database_info (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO database_info (key, value) VALUES ('instance_id', ?)",
+                       (uuid.uuid4().hex,))
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS uploads (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -1207,7 +261,7 @@ def init_database():
                 upload_id INTEGER,
                 job_ref_id TEXT,
                 ta_partner TEXT,
-                position_created_date DATE,
+                position_created_date INTEGER,
                 job_title TEXT,
                 job_location_country TEXT,
                 project_name TEXT,
@@ -1216,7 +270,7 @@ def init_database():
                 accepted_salary_currency TEXT,
                 sourcing_partner TEXT,
                 hiring_manager TEXT,
-                filled_date DATE,
+                filled_date INTEGER,
                 number_of_cvs_shared INTEGER,
                 number_of_cvs_shortlisted INTEGER,
                 number_of_candidates_interviewed INTEGER,
@@ -1238,7 +292,7 @@ def init_database():
                 upload_id INTEGER,
                 job_ref_id TEXT,
                 ta_partner TEXT,
-                position_created_date DATE,
+                position_created_date INTEGER,
                 job_title TEXT,
                 job_location_country TEXT,
                 project_name TEXT,
@@ -1254,14 +308,71 @@ def init_database():
                 job_state TEXT,
                 business_line TEXT,
                 service_line TEXT,
-                position_age INTEGER,
+                position_age INTEGER, -- unused: ages are computed at query time
                 cv_to_interview_rate REAL,
                 FOREIGN KEY (upload_id) REFERENCES uploads (id)
             )
         ''')
         
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS saved_views (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL,
+                dashboard_type TEXT NOT NULL,
+                filters TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                open_count INTEGER DEFAULT 0,
+                last_opened_at TIMESTAMP,
+                last_error TEXT,
+                last_error_at TIMESTAMP
+            )
+        ''')
+        
+        # One-time migration of dates stored as YYYY-MM-DD text to day numbers
+        if cursor.execute('PRAGMA user_version').fetchone()[0] < 1:
+            for table_name, date_cols in DATE_COLUMNS.items():
+                for col in date_cols:
+                    cursor.execute(f'''
+                        UPDATE {table_name} SET {col} = CAST(julianday({col}) - 2440587.5 AS INTEGER)
+                        WHERE typeof({col}) = 'text'
+                    ''')
+            cursor.execute('PRAGMA user_version = 1')
+        
+        # Saved views created before materialization failures were recorded
+        if cursor.execute('PRAGMA user_version').fetchone()[0] < 2:
+            view_columns = {row[1] for row in cursor.execute('PRAGMA table_info(saved_views)')}
+            for col, col_type in (('last_error', 'TEXT'), ('last_error_at', 'TIMESTAMP')):
+                if col not in view_columns:
+                    cursor.execute(f'ALTER TABLE saved_views ADD COLUMN {col} {col_type}')
+            cursor.execute('PRAGMA user_version = 2')
+        
+        # Composite indexes back the keyset-paginated /api/rows endpoint
+        # and the (upload_id, date) range scans of date filters
+        for table_name, sort_cols in ROW_SORT_KEYS.items():
+            for sort_col in sort_cols:
+                index_cols = 'upload_id, id' if sort_col == 'id' else f'upload_id, {sort_col}, id'
+                cursor.execute(f'''
+                    CREATE INDEX IF NOT EXISTS idx_{table_name}_upload_{sort_col}
+                    ON {table_name} ({index_cols})
+                ''')
+        
+        # Materialized payload of each saved view, one row per upload
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS saved_view_results (
+                view_id INTEGER NOT NULL,
+                upload_id INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (view_id, upload_id),
+                FOREIGN KEY (view_id) REFERENCES saved_views (id),
+                FOREIGN KEY (upload_id) REFERENCES uploads (id)
+            )
+        ''')
+        
         conn.commit()
+        return cursor.execute("SELECT value FROM database_info WHERE key = 'instance_id'").fetchone()[0]
 
+@metrics.stage('prepare_df')
 def prepare_df(df, sheet_type):
     """Prepare and clean dataframe - Updated for your Excel structure"""
     if df is None or df.empty:
@@ -1322,33 +433,60 @@ def prepare_df(df, sheet_type):
     # Apply column mapping
     columns_found = []
     columns_missing = []
+    renames = {}
     
     for old_col, new_col in column_mapping.items():
         if old_col in df.columns:
-            df = df.rename(columns={old_col: new_col})
+            renames[old_col] = new_col
             columns_found.append(f"{old_col} -> {new_col}")
         else:
             columns_missing.append(old_col)
     
+    # One rename instead of one full copy of the sheet per column
+    df = df.rename(columns=renames, copy=False)
+    
     debug_info.append(f"Columns mapped: {columns_found}")
     if columns_missing:
         debug_info.append(f"Columns missing: {columns_missing}")
     
-    # Convert date columns
     date_cols = ['position_created_date']
     if sheet_type == 'hired':
         date_cols.append('filled_date')
     
+    numeric_cols = ['number_of_cvs_shared', 'number_of_cvs_shortlisted', 
+                   'number_of_candidates_interviewed', 'number_of_candidates_offered',
+                   'number_of_candidates_accepted_offer', 'max_budgeted_salary', 'accepted_salary']
+    
+    if app.config['INGEST_ENGINE'] == 'polars' and polars_transform.POLARS_AVAILABLE:
+        df = polars_transform.convert_and_derive(df, sheet_type, date_cols, numeric_cols, debug_info)
+    else:
+        df = convert_and_derive(df, sheet_type, date_cols, numeric_cols, debug_info)
+    
+    # Fill missing values
+    categorical_cols = ['ta_partner', 'job_location_country', 'project_name', 'business_line', 
+                       'job_state', 'sourcing_partner', 'hiring_manager']
+    for col in categorical_cols:
+        if col in df.columns:
+            df[col] = df[col].fillna('Unknown')
+    
+    # Remove completely empty rows; none are left once any column has been filled above
+    if not any(col in df.columns for col in categorical_cols + numeric_cols):
+        df = df.dropna(how='all')
+    
+    debug_info.append(f"Final shape: {df.shape}")
+    debug_info.append(f"Final columns: {list(df.columns)}")
+    
+    return df, "\\n".join(debug_info)
+
+def convert_and_derive(df, sheet_type, date_cols, numeric_cols, debug_info):
+    """Coerce date and numeric columns and add the derived metrics (pandas engine)"""
+    # Convert date columns
     for col in date_cols:
         if col in df.columns:
             df[col] = pd.to_datetime(df[col], errors='coerce')
             debug_info.append(f"Converted {col} to datetime")
     
     # Convert numeric columns
-    numeric_cols = ['number_of_cvs_shared', 'number_of_cvs_shortlisted', 
-                   'number_of_candidates_interviewed', 'number_of_candidates_offered',
-                   'number_of_candidates_accepted_offer', 'max_budgeted_salary', 'accepted_salary']
-    
     for col in numeric_cols:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
@@ -1364,32 +502,44 @@ def prepare_df(df, sheet_type):
             df['budget_variance_pct'] = ((df['accepted_salary'] - df['max_budgeted_salary']) / df['max_budgeted_salary'] * 100)
             debug_info.append("Calculated budget_variance_pct")
     
-    if sheet_type == 'final':
-        if 'position_created_date' in df.columns:
-            df['position_age'] = (datetime.now() - df['position_created_date']).dt.days
-            debug_info.append("Calculated position_age")
-    
     # Calculate conversion rates
     if all(col in df.columns for col in ['number_of_cvs_shared', 'number_of_candidates_interviewed']):
         df['cv_to_interview_rate'] = np.where(df['number_of_cvs_shared'] > 0, 
                                             df['number_of_candidates_interviewed'] / df['number_of_cvs_shared'] * 100, 0)
         debug_info.append("Calculated cv_to_interview_rate")
     
-    # Fill missing values
-    categorical_cols = ['ta_partner', 'job_location_country', 'project_name', 'business_line', 
-                       'job_state', 'sourcing_partner', 'hiring_manager']
-    for col in categorical_cols:
-        if col in df.columns:
-            df[col] = df[col].fillna('Unknown')
-    
-    # Remove completely empty rows
-    df = df.dropna(how='all')
-    
-    debug_info.append(f"Final shape: {df.shape}")
-    debug_info.append(f"Final columns: {list(df.columns)}")
-    
-    return df, "\\n".join(debug_info)
+    return df
+
+def to_epoch_days(series):
+    """Datetime series -> nullable integer days since 1970-01-01"""
+    days = series.to_numpy(dtype='datetime64[D]')
+    values = pd.array(days.astype(np.int64), dtype='Int64')
+    values[np.isnat(days)] = pd.NA
+    return values
+
+def from_epoch_days(series):
+    """Day numbers as read from SQLite (float64 when NULLs are present) -> datetime64[ns] series"""
+    days = series.to_numpy(dtype='float64')
+    missing = np.isnan(days)
+    values = np.where(missing, 0, days).astype(np.int64).astype('datetime64[D]').astype('datetime64[ns]')
+    values[missing] = np.datetime64('NaT')
+    return pd.Series(values, index=series.index, name=series.name)
+
+def epoch_day(value):
+    """Day number of a date or YYYY-MM-DD string"""
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return (value - EPOCH).days
+
+def decode_date_columns(df, table_name):
+    """Day numbers as read from SQLite back to datetime, in place; no string parsing involved"""
+    with metrics.stage('decode_dates'):
+        for col in DATE_COLUMNS[table_name]:
+            if col in df.columns:
+                df[col] = from_epoch_days(df[col])
+    return df
 
+@metrics.stage('save_to_database')
 def save_to_database(df, sheet_type, upload_id):
     """Save dataframe to database"""
     if df is None or df.empty:
@@ -1399,55 +549,1268 @@ def save_to_database(df, sheet_type, upload_id):
         df_clean = df.copy()
         df_clean['upload_id'] = upload_id
         
-        # Convert datetime to string
+        # Store dates as day numbers
         for col in df_clean.columns:
-            if df_clean[col].dtype == 'datetime64[ns]':
-                df_clean[col] = df_clean[col].dt.strftime('%Y-%m-%d').replace('NaT', None)
+            if pd.api.types.is_datetime64_dtype(df_clean[col]):
+                df_clean[col] = to_epoch_days(df_clean[col])
         
         df_clean = df_clean.where(pd.notnull(df_clean), None)
         
         table_name = 'hired_data' if sheet_type == 'hired' else 'final_data'
         
-        cursor = conn.cursor()
-        cursor.execute(f'DELETE FROM {table_name} WHERE upload_id = ?', (upload_id,))
-        df_clean.to_sql(table_name, conn, if_exists='append', index=False)
-        conn.commit()
+        # The rows are being rewritten, so any snapshot of them is stale
+        if app.config['SNAPSHOTS']:
+            snapshots.remove_snapshot(get_snapshot_path(upload_id, sheet_type))
+        if use_duckdb():
+            duckdb_backend.drop_upload(upload_id)
+        
+        with metrics.db_query(f'insert_{table_name}'):
+            cursor = conn.cursor()
+            cursor.execute(f'DELETE FROM {table_name} WHERE upload_id = ?', (upload_id,))
+            df_clean.to_sql(table_name, conn, if_exists='append', index=False)
+            conn.commit()
+        
+        # Snapshot the rows read back once with load_from_database()'s own query,
+        # so a snapshot read returns exactly what a SQLite read would
+        if app.config['SNAPSHOTS']:
+            with metrics.db_query(f'load_{table_name}'):
+                loaded = pd.read_sql_query(f'SELECT d.* FROM {table_name} d WHERE d.upload_id = ?',
+                                           conn, params=[upload_id])
+            write_upload_snapshot(upload_id, sheet_type, decode_date_columns(loaded, table_name))
+
+def load_from_database(sheet_type, upload_id=None, columns=None, date_range=None):
+    """Load data from database.
+
+    columns limits the snapshot or SQLite read to the columns a caller uses
+    (unknown names are skipped); frames already in memory are returned whole.
+    date_range, a (start, end) pair of YYYY-MM-DD dates, limits a SQLite read
+    to positions created in that range; other sources are not filtered, so
+    callers still apply their filters.
+    """
+    if upload_id:
+        preloaded = _preloaded_frames.get((sheet_type, int(upload_id)))
+        if preloaded is not None:
+            return preloaded
+
+        if app.config['FRAME_STORE']:
+            shared = get_frame_store().attach((sheet_type, int(upload_id)))
+            if shared is not None:
+                return shared
+
+        if app.config['SNAPSHOTS']:
+            with metrics.stage('read_snapshot'):
+                snapshot = snapshots.read_snapshot(get_snapshot_path(upload_id, sheet_type), columns)
+            if snapshot is not None:
+                return snapshot
 
-def load_from_database(sheet_type, upload_id=None):
-    """Load data from database"""
     with get_db_connection() as conn:
         table_name = 'hired_data' if sheet_type == 'hired' else 'final_data'
         
+        projection = ['*']
+        if columns is not None:
+            stored = {row['name'] for row in conn.execute(f'PRAGMA table_info({table_name})')}
+            projection = [col for col in dict.fromkeys(columns) if col in stored] or ['*']
+        
         if upload_id:
-            query = f'SELECT * FROM {table_name} WHERE upload_id = ?'
-            df = pd.read_sql_query(query, conn, params=(upload_id,))
+            source, params = f'{table_name} d WHERE d.upload_id = ?', [upload_id]
         else:
-            query = f'''
-                SELECT d.* FROM {table_name} d
-                JOIN uploads u ON d.upload_id = u.id
-                WHERE u.id = (SELECT MAX(id) FROM uploads)
-            '''
-            df = pd.read_sql_query(query, conn)
+            source, params = (f'{table_name} d JOIN uploads u ON d.upload_id = u.id '
+                              'WHERE u.id = (SELECT MAX(id) FROM uploads)'), []
+        
+        # Day numbers compare as integers, so the range is a scan of the
+        # (upload_id, position_created_date) index; ORDER BY keeps the row
+        # order of an unfiltered read
+        date_clause, date_params = '', []
+        if date_range:
+            date_clause = ' AND d.position_created_date BETWEEN ? AND ? ORDER BY d.id'
+            date_params = [epoch_day(date_range[0]), epoch_day(date_range[1])]
+        
+        with metrics.db_query(f'load_{table_name}'):
+            query = f'SELECT {", ".join(f"d.{col}" for col in projection)} FROM {source}{date_clause}'
+            df = pd.read_sql_query(query, conn, params=params + date_params)
         
         if df.empty:
+            # An empty range of an upload that has rows is an empty result, not missing data
+            if date_range and conn.execute(f'SELECT 1 FROM {source} LIMIT 1', params).fetchone():
+                return df
             return None
             
-        # Convert date strings back to datetime
-        date_columns = ['position_created_date']
-        if sheet_type == 'hired':
-            date_columns.append('filled_date')
+        decode_date_columns(df, table_name)
         
-        for col in date_columns:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors='coerce')
+        # Uploads from before snapshots existed get one on their first full read
+        if upload_id and app.config['SNAPSHOTS'] and projection == ['*'] and not date_range:
+            write_upload_snapshot(upload_id, sheet_type, df)
         
         return df
 
-# Initialize on startup
-init_database()
-if not create_clean_templates():
-    print("❌ Failed to create templates")
-    exit(1)
+def get_snapshot_path(upload_id, sheet_type):
+    """Snapshot directory for an upload's sheet"""
+    return snapshots.snapshot_path(app.config['SNAPSHOT_FOLDER'], upload_id, sheet_type)
+
+@metrics.stage('write_snapshot')
+def write_upload_snapshot(upload_id, sheet_type, df):
+    """Write the columnar snapshot of a sheet in the dtypes it loads with from SQLite"""
+    try:
+        snapshots.write_snapshot(get_snapshot_path(upload_id, sheet_type), df)
+    except Exception as e:
+        print(f"⚠️ Could not write snapshot for upload {upload_id} ({sheet_type}): {e}")
+
+def get_frame_store():
+    """Shared-memory store for the configured database"""
+    return frame_store.get_store(app.config['FRAME_STORE_FOLDER'], app.config['DATABASE'])
+
+def publish_upload_frames(upload_id, sheet_types):
+    """Write an upload's prepared frames to shared memory and evict older uploads"""
+    try:
+        store = get_frame_store()
+        for sheet_type in sheet_types:
+            store.publish((sheet_type, upload_id), load_from_database(sheet_type, upload_id))
+
+        with get_db_connection() as conn:
+            keep = {row['id'] for row in conn.execute('SELECT id FROM uploads ORDER BY id DESC LIMIT ?',
+                                                      (app.config['FRAME_STORE_UPLOADS'],))}
+        for key, _ in store.entries():
+            if key[1] not in keep:
+                store.evict(key)
+    except Exception as e:
+        print(f"⚠️ Could not publish shared frames for upload {upload_id}: {e}")
+
+def evict_upload_frames(upload_id):
+    """Remove an upload's frames from shared memory (once no process holds them)"""
+    if app.config['FRAME_STORE']:
+        store = get_frame_store()
+        for sheet_type in ('hired', 'final'):
+            store.evict((sheet_type, int(upload_id)))
+
+def preload_frames(upload_count):
+    """Load the prepared frames of the latest uploads into memory before forking workers"""
+    global _preloaded_frames
+
+    with get_db_connection() as conn:
+        upload_ids = [row['id'] for row in conn.execute('SELECT id FROM uploads ORDER BY id DESC LIMIT ?',
+                                                         (upload_count,))]
+
+    frames = {}
+    for upload_id in upload_ids:
+        for sheet_type in ('hired', 'final'):
+            df = load_from_database(sheet_type, upload_id)
+            if df is not None:
+                frames[(sheet_type, upload_id)] = df
+
+    # Swap in one step so readers never see a half-built mapping
+    _preloaded_frames = frames
+    return sorted(frames)
+
+def in_prefork_master():
+    """Whether this is serve.py's master process, which forks the workers"""
+    return app.config['PREFORK_MASTER_PID'] == os.getpid()
+
+def notify_data_changed():
+    """Ask the pre-fork master to reload data into a new worker generation
+    (the master signals itself, e.g. after its own retention run)"""
+    master_pid = app.config['PREFORK_MASTER_PID']
+    if master_pid:
+        try:
+            os.kill(master_pid, signal.SIGHUP)
+        except OSError as e:
+            print(f"⚠️ Could not signal the server to reload data: {e}")
+
+def get_archive_path(upload_id):
+    """Archive file of an upload"""
+    return archive.archive_path(app.config['ARCHIVE_FOLDER'], upload_id)
+
+def database_size():
+    """Size of the SQLite database file in bytes"""
+    try:
+        return os.path.getsize(app.config['DATABASE'])
+    except OSError:
+        return 0
+
+def forget_upload(upload_id):
+    """Drop everything derived from an upload's rows: cached payloads, snapshots,
+    shared and preloaded frames, DuckDB tables and ML models"""
+    global _preloaded_frames
+
+    with _payload_cache_lock:
+        for key in [key for key in _payload_cache if key[2] == upload_id]:
+            del _payload_cache[key]
+
+    for sheet_type in ('hired', 'final'):
+        snapshots.remove_snapshot(get_snapshot_path(upload_id, sheet_type))
+    try:
+        os.rmdir(os.path.dirname(get_snapshot_path(upload_id, 'hired')))
+    except OSError:
+        pass
+
+    evict_upload_frames(upload_id)
+    if use_duckdb():
+        duckdb_backend.drop_upload(upload_id)
+    _preloaded_frames = {key: df for key, df in _preloaded_frames.items() if key[1] != upload_id}
+
+    discard_upload_models(upload_id)
+
+def discard_upload_models(upload_id):
+    """Drop an upload's serving models, artifacts and training state"""
+    ml_models.remove_upload_models(get_models_folder(), upload_id)
+    with _training_lock:
+        _training_jobs.pop(upload_id, None)
+
+def archive_upload(upload_id):
+    """Move an upload from SQLite to its archive file; returns the archive size in bytes (0 if gone)"""
+    with get_db_connection() as conn:
+        upload = conn.execute('SELECT * FROM uploads WHERE id = ?', (upload_id,)).fetchone()
+        if upload is None:
+            return 0
+        with metrics.db_query('read_archived_upload'):
+            tables = {table_name: pd.read_sql_query(f'SELECT * FROM {table_name} WHERE upload_id = ? ORDER BY id',
+                                                    conn, params=(upload_id,))
+                      for table_name in ('hired_data', 'final_data')}
+
+    size = archive.write_archive(get_archive_path(upload_id), dict(upload), tables)
+
+    # Rows are only deleted once the archive is on disk; one transaction for all of them
+    with get_db_connection() as conn:
+        with metrics.db_query('delete_archived_upload'):
+            for table_name in ('hired_data', 'final_data', 'saved_view_results'):
+                conn.execute(f'DELETE FROM {table_name} WHERE upload_id = ?', (upload_id,))
+            conn.execute('DELETE FROM uploads WHERE id = ?', (upload_id,))
+            conn.commit()
+
+    forget_upload(upload_id)
+    return size
+
+def compact_database():
+    """Return free pages to the filesystem with an incremental vacuum"""
+    with get_db_connection() as conn:
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            # Databases created before incremental auto-vacuum pay one full VACUUM to switch
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+        else:
+            # A cursor steps the pragma once (one page); executescript runs it to completion
+            conn.executescript('PRAGMA incremental_vacuum;')
+
+def apply_retention(keep=None, dry_run=False):
+    """Archive every upload but the latest `keep` and compact the database; returns a report"""
+    global _last_retention
+    keep = app.config['RETENTION_UPLOADS'] if keep is None else keep
+    if keep < 1:
+        raise ValueError('At least the latest upload must be kept')
+
+    with _retention_lock:
+        started = time.perf_counter()
+        with get_db_connection() as conn:
+            upload_ids = [row['id'] for row in conn.execute('SELECT id FROM uploads ORDER BY id DESC LIMIT -1 OFFSET ?',
+                                                             (keep,))]
+        if dry_run:
+            return {'keep': keep, 'dry_run': True, 'to_archive': sorted(upload_ids)}
+
+        size_before = database_size()
+        archived = []
+        archive_bytes = 0
+        for upload_id in sorted(upload_ids):
+            archive_bytes += archive_upload(upload_id)
+            archived.append(upload_id)
+        compact_database()
+        size_after = database_size()
+
+        report = {
+            'keep': keep,
+            'archived': archived,
+            'archive_bytes': archive_bytes,
+            'database_bytes_before': size_before,
+            'database_bytes_after': size_after,
+            'reclaimed_bytes': max(size_before - size_after, 0),
+            'seconds': round(time.perf_counter() - started, 3),
+            'finished_at': datetime.now().isoformat()
+        }
+        metrics.RETENTION_ARCHIVED.inc(len(archived))
+        metrics.RETENTION_ARCHIVE_BYTES.inc(archive_bytes)
+        metrics.RETENTION_RECLAIMED_BYTES.inc(report['reclaimed_bytes'])
+        metrics.DATABASE_BYTES.set(size_after)
+        _last_retention = report
+
+    if archived:
+        notify_data_changed()
+    return report
+
+def retention_scheduled():
+    """Whether retention runs in the background every RETENTION_INTERVAL seconds"""
+    return app.config['RETENTION_UPLOADS'] >= 1 and app.config['RETENTION_INTERVAL'] > 0
+
+def run_scheduled_retention():
+    """One background retention run; failures are logged rather than raised"""
+    try:
+        report = apply_retention()
+    except Exception as e:
+        print(f"⚠️ Retention run failed: {e}")
+        return None
+    if report['archived']:
+        print(f"🗄️ Archived uploads {report['archived']}, reclaimed "
+              f"{report['reclaimed_bytes'] / 1024 / 1024:.1f} MB")
+    return report
+
+def start_retention_schedule():
+    """Run retention now and then every RETENTION_INTERVAL seconds on a daemon thread.
+
+    serve.py's master runs it from its own loop instead: no thread may be
+    running when it forks workers.
+    """
+    global _retention_thread
+    if not retention_scheduled() or in_prefork_master() or _retention_thread is not None:
+        return None
+
+    def run():
+        while True:
+            run_scheduled_retention()
+            time.sleep(app.config['RETENTION_INTERVAL'])
+
+    _retention_thread = threading.Thread(target=run, name='dashboard-retention', daemon=True)
+    _retention_thread.start()
+    return _retention_thread
+
+def shutdown_background_work():
+    """Let queued background jobs and model training finish before a worker process exits"""
+    _background_executor.shutdown(wait=True)
+    if _training_executor is not None:
+        _training_executor.shutdown(wait=True)
+
+def resolve_upload_id(upload_id=None):
+    """Return a concrete upload id, defaulting to the latest upload"""
+    if upload_id:
+        return int(upload_id)
+
+    with get_db_connection() as conn:
+        row = conn.execute('SELECT MAX(id) AS id FROM uploads').fetchone()
+        return row['id'] if row else None
+
+def parse_filters(args):
+    """Normalize global filter query parameters into a canonical dict"""
+    filters = {}
+
+    for param in FILTER_MAPPING:
+        values = args.get(param)
+        if values:
+            filters[param] = sorted(values.split(','))
+
+    # Date range only applies when both ends are given
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+    if start_date and end_date:
+        try:
+            filters['start_date'] = date.fromisoformat(start_date).isoformat()
+            filters['end_date'] = date.fromisoformat(end_date).isoformat()
+        except ValueError:
+            raise ValueError('start_date and end_date must be dates in YYYY-MM-DD format')
+
+    return filters
+
+def parse_as_of(value):
+    """Date position ages are counted to: a YYYY-MM-DD value, or today"""
+    if not value:
+        return date.today()
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError('as_of must be a date in YYYY-MM-DD format')
+
+def with_as_of(dashboard_type, filters, as_of=None):
+    """Add the as-of date to a pipeline view's filters (or spec); hired views have no ages.
+
+    The date is part of every cache key built from them, so results for the
+    default as-of date roll over at midnight.
+    """
+    if dashboard_type == 'hired':
+        return filters
+    return dict(filters, as_of=(as_of or date.today()).isoformat())
+
+def filters_as_of(filters):
+    """The as-of date carried by with_as_of(), defaulting to today"""
+    return date.fromisoformat(filters['as_of']) if filters.get('as_of') else date.today()
+
+def add_position_age(df, as_of):
+    """Pipeline frame as of a date, with position_age in whole days from creation to as_of.
+
+    Positions created after as_of did not exist yet and are left out; rows
+    without a creation date are kept with no age. Returns a shallow copy.
+    """
+    if 'position_created_date' not in df.columns:
+        return df
+
+    created = pd.to_datetime(df['position_created_date'], errors='coerce').to_numpy(dtype='datetime64[D]')
+    as_of = np.datetime64(as_of, 'D')
+    not_yet_created = created > as_of
+    if not_yet_created.any():
+        df = df[~not_yet_created]
+        created = created[~not_yet_created]
+    ages = as_of - created
+    missing = np.isnat(ages)
+    ages = ages.astype(np.int64)
+    if missing.any():
+        ages = np.where(missing, np.nan, ages)
+
+    df = df.copy(deep=False)
+    df['position_age'] = ages
+    return df
+
+def apply_filters(df, filters):
+    """Apply normalized global filters to a dataframe"""
+    filtered_df = df
+
+    for param, col_name in FILTER_MAPPING.items():
+        values = filters.get(param)
+        if values and col_name in filtered_df.columns:
+            filtered_df = filtered_df[filtered_df[col_name].isin(values)]
+
+    if 'start_date' in filters and 'position_created_date' in filtered_df.columns:
+        start, end = np.datetime64(filters['start_date']), np.datetime64(filters['end_date'])
+        created = filtered_df['position_created_date']
+        filtered_df = filtered_df[(created >= start) & (created <= end)]
+
+    return filtered_df
+
+def filter_date_range(filters):
+    """(start, end) of a filter set's date filter for load_from_database(), or None"""
+    if 'start_date' in filters:
+        return filters['start_date'], filters['end_date']
+    return None
+
+def filter_columns(filters=None):
+    """Columns apply_filters() tests for a filter set; every filterable column when filters is None"""
+    if filters is None:
+        return list(FILTER_MAPPING.values()) + ['position_created_date']
+    columns = [col_name for param, col_name in FILTER_MAPPING.items() if filters.get(param)]
+    if 'start_date' in filters:
+        columns.append('position_created_date')
+    return columns
+
+def make_cache_key(kind, dashboard_type, upload_id, filters=None, spec=None):
+    """Build a hashable cache key for a payload"""
+    view_type = 'hired' if dashboard_type == 'hired' else 'pipeline'
+    return (kind, view_type, upload_id, json.dumps(filters or {}, sort_keys=True),
+            json.dumps(spec or {}, sort_keys=True))
+
+def get_cached_payload(key, builder):
+    """Return the serialized payload for key, building and caching it on a miss"""
+    with _payload_cache_lock:
+        body = _payload_cache.get(key)
+        if body is not None:
+            _payload_cache.move_to_end(key)
+            metrics.CACHE_REQUESTS.inc(kind=key[0], result='hit')
+            return body
+
+    metrics.CACHE_REQUESTS.inc(kind=key[0], result='miss')
+    payload = builder()
+    with metrics.stage('serialize'):
+        body = app.json.dumps(payload)
+
+    # Errors (e.g. no data yet) are not cached
+    if isinstance(payload, dict) and 'error' in payload:
+        return body
+
+    with _payload_cache_lock:
+        _payload_cache[key] = body
+        _payload_cache.move_to_end(key)
+        while len(_payload_cache) > app.config['CACHE_MAX_ENTRIES']:
+            _payload_cache.popitem(last=False)
+
+    return body
+
+def clear_payload_cache():
+    """Drop every cached payload"""
+    with _payload_cache_lock:
+        _payload_cache.clear()
+
+def json_body_response(body):
+    """Wrap an already serialized JSON body in a response"""
+    return app.response_class(body, mimetype='application/json')
+
+def build_filter_options(dashboard_type, upload_id):
+    """Compute the filter dropdown options for a dashboard"""
+    df = load_from_database('hired' if dashboard_type == 'hired' else 'final', upload_id, filter_columns())
+
+    if df is None or df.empty:
+        return {}
+
+    options = {}
+
+    with metrics.stage('aggregate'):
+        for filter_key, col_name in FILTER_MAPPING.items():
+            if col_name in df.columns:
+                unique_values = sorted([str(val) for val in df[col_name].unique() if pd.notna(val) and str(val) != 'Unknown'])
+                options[filter_key] = unique_values
+
+        if 'position_created_date' in df.columns:
+            min_date = df['position_created_date'].min().strftime('%Y-%m-%d') if pd.notna(df['position_created_date'].min()) else None
+            max_date = df['position_created_date'].max().strftime('%Y-%m-%d') if pd.notna(df['position_created_date'].max()) else None
+            options['date_range'] = {'min': min_date, 'max': max_date}
+
+    return options
+
+def build_dashboard_payload(dashboard_type, upload_id, filters):
+    """Compute the full dashboard payload for an upload and filter set"""
+    if upload_id and use_duckdb():
+        data = build_dashboard_payload_duckdb(dashboard_type, upload_id, filters)
+        if data is not None:
+            return data
+
+    view_type = 'hired' if dashboard_type == 'hired' else 'pipeline'
+    df = load_from_database('hired' if dashboard_type == 'hired' else 'final', upload_id,
+                            DASHBOARD_COLUMNS[view_type] + filter_columns(filters), filter_date_range(filters))
+
+    if df is None or (df.empty and not filter_date_range(filters)):
+        return {'error': 'No data available'}
+
+    with metrics.stage('filter'):
+        filtered_df = apply_filters(df, filters)
+
+    with metrics.stage('aggregate'):
+        if dashboard_type == 'hired':
+            return get_hired_dashboard_data(filtered_df)
+        else:
+            return get_pipeline_dashboard_data(add_position_age(filtered_df, filters_as_of(filters)))
+
+def use_duckdb():
+    """Whether dashboard aggregations run in DuckDB (never in the pre-fork master:
+    its thread pool would not survive the fork)"""
+    return (app.config['QUERY_BACKEND'] == 'duckdb' and duckdb_backend.DUCKDB_AVAILABLE
+            and not in_prefork_master())
+
+def build_dashboard_payload_duckdb(dashboard_type, upload_id, filters):
+    """Dashboard payload computed in DuckDB; None to fall back to pandas"""
+    sheet_type = 'hired' if dashboard_type == 'hired' else 'final'
+    # The frame is only loaded when the upload is not yet a DuckDB table, which then serves every filter set
+    view_type = 'hired' if dashboard_type == 'hired' else 'pipeline'
+    load = lambda: load_from_database(sheet_type, upload_id, DASHBOARD_COLUMNS[view_type] + filter_columns())
+    try:
+        # Filtering happens inside the SQL, so the whole query counts as aggregation
+        with metrics.stage('aggregate'):
+            if sheet_type == 'hired':
+                data = duckdb_backend.hired_dashboard_data((sheet_type, upload_id), load, filters, FILTER_MAPPING,
+                                                           app.config['DUCKDB_TABLES'])
+                if data is not None:
+                    data['commentary'] = hired_commentary(data['kpis'])
+            else:
+                data = duckdb_backend.pipeline_dashboard_data((sheet_type, upload_id), load, filters, FILTER_MAPPING,
+                                                              app.config['DUCKDB_TABLES'], filters_as_of(filters))
+                if data is not None:
+                    data['commentary'] = pipeline_commentary(data['kpis'], True)
+        return data
+    except Exception as e:
+        print(f"⚠️ DuckDB query failed for upload {upload_id}, using pandas: {e}")
+        return None
+
+def normalize_view_filters(raw_filters):
+    """Normalize saved view filters (lists or comma strings) like query parameters"""
+    args = {}
+    for key, value in (raw_filters or {}).items():
+        if isinstance(value, (list, tuple)):
+            value = ','.join(str(v) for v in value)
+        if value:
+            args[key] = str(value)
+    return parse_filters(args)
+
+def saved_view_to_dict(row):
+    """Convert a saved_views row into its API representation"""
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'dashboard_type': row['dashboard_type'],
+        'filters': json.loads(row['filters']),
+        'created_at': row['created_at'],
+        'open_count': row['open_count'],
+        'last_opened_at': row['last_opened_at'],
+        'last_error': row['last_error'],
+        'last_error_at': row['last_error_at']
+    }
+
+def materialize_saved_view(view, upload_id):
+    """Compute a saved view's payload for an upload (pipeline ages as of today) and store it"""
+    filters = with_as_of(view['dashboard_type'], json.loads(view['filters']))
+    body = get_cached_payload(make_cache_key('dashboard', view['dashboard_type'], upload_id, filters),
+                              lambda: build_dashboard_payload(view['dashboard_type'], upload_id, filters))
+
+    if 'error' in json.loads(body):
+        return body
+
+    with get_db_connection() as conn:
+        conn.execute('''
+            INSERT OR REPLACE INTO saved_view_results (view_id, upload_id, payload)
+            VALUES (?, ?, ?)
+        ''', (view['id'], upload_id, body))
+        conn.execute('UPDATE saved_views SET last_error = NULL, last_error_at = NULL WHERE id = ?', (view['id'],))
+        conn.commit()
+
+    return body
+
+def run_saved_view_job(view, upload_id):
+    """Background materialization of a saved view; failures are logged and kept on the view"""
+    try:
+        return materialize_saved_view(view, upload_id)
+    except Exception as e:
+        print(f"⚠️ Saved view \"{view['name']}\" failed for upload {upload_id}: {e}")
+        try:
+            with get_db_connection() as conn:
+                conn.execute('''
+                    UPDATE saved_views SET last_error = ?, last_error_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                ''', (f'Upload {upload_id}: {e}', view['id']))
+                conn.commit()
+        except sqlite3.Error as db_error:
+            print(f"⚠️ Could not record the failure of saved view {view['id']}: {db_error}")
+        return None
+
+def materialize_saved_views(upload_id, view_types):
+    """Materialize the saved views of the given types that have no current result
+    for an upload (none yet, or a pipeline result from before today), most opened first"""
+    if not view_types:
+        return
+
+    placeholders = ','.join('?' * len(view_types))
+    with get_db_connection() as conn:
+        views = conn.execute(f'''
+            SELECT saved_views.* FROM saved_views
+            LEFT JOIN saved_view_results AS result
+                ON result.view_id = saved_views.id AND result.upload_id = ?
+            WHERE saved_views.dashboard_type IN ({placeholders})
+              AND (result.view_id IS NULL
+                   OR (saved_views.dashboard_type = 'pipeline'
+                       AND DATE(result.computed_at, 'localtime') != ?))
+            ORDER BY saved_views.open_count DESC, saved_views.id
+        ''', [upload_id, *view_types, date.today().isoformat()]).fetchall()
+
+    for view in views:
+        run_saved_view_job(view, upload_id)
+
+def parse_pivot_spec(args):
+    """Validate pivot query parameters, returning (spec, error)"""
+    dimension = args.get('dimension', 'title')
+    if dimension not in PIVOT_DIMENSIONS:
+        return None, f'Unsupported dimension "{dimension}". Choose from: {", ".join(PIVOT_DIMENSIONS)}'
+
+    measures = [m for m in args.get('measures', 'ttf_mean').split(',') if m]
+    unknown = [m for m in measures if m not in PIVOT_MEASURES]
+    if not measures or unknown:
+        return None, f'Unsupported measures {unknown}. Choose from: {", ".join(PIVOT_MEASURES)}'
+
+    sort = args.get('sort', measures[0])
+    if sort not in measures and sort != 'group':
+        return None, 'sort must be "group" or one of the requested measures'
+
+    try:
+        limit = max(1, min(int(args.get('limit', 10)), 1000))
+    except ValueError:
+        return None, 'limit must be an integer'
+
+    spec = {
+        'dimension': dimension,
+        'measures': measures,
+        'sort': sort,
+        'order': 'desc' if args.get('order') == 'desc' else 'asc',
+        'limit': limit
+    }
+    return spec, None
+
+def build_pivot_payload(dashboard_type, upload_id, filters, spec):
+    """Group a dashboard's rows by one dimension and aggregate the requested measures"""
+    measure_columns = [PIVOT_MEASURES[m][0] for m in spec['measures'] if PIVOT_MEASURES[m][0]]
+    df = load_from_database('hired' if dashboard_type == 'hired' else 'final', upload_id,
+                            [PIVOT_DIMENSIONS[spec['dimension']]] + measure_columns + filter_columns(filters),
+                            filter_date_range(filters))
+
+    if df is None or (df.empty and not filter_date_range(filters)):
+        return {'error': 'No data available'}
+
+    df = apply_filters(df, filters)
+
+    dim_col = PIVOT_DIMENSIONS[spec['dimension']]
+    missing = [col for col, _ in (PIVOT_MEASURES[m] for m in spec['measures']) if col and col not in df.columns]
+    if dim_col not in df.columns or missing:
+        return {'error': f'Columns not available for this dashboard: {[dim_col] if dim_col not in df.columns else missing}'}
+
+    if spec['dimension'] == 'month':
+        keys = df[dim_col].dt.strftime('%Y-%m')
+    else:
+        keys = df[dim_col]
+
+    grouped = df.groupby(keys, sort=False)
+    result = pd.DataFrame({
+        measure: grouped.size() if agg == 'size' else grouped[col].agg(agg)
+        for measure, (col, agg) in ((m, PIVOT_MEASURES[m]) for m in spec['measures'])
+    })
+
+    ascending = spec['order'] == 'asc'
+    if spec['sort'] == 'group':
+        result = result.sort_index(ascending=ascending)
+    else:
+        result = result.sort_values(spec['sort'], ascending=ascending)
+    result = result.head(spec['limit'])
+
+    # NaN is not valid JSON
+    result = result.astype(object).where(result.notna(), None)
+    groups = [str(g) for g in result.index]
+
+    return {
+        'dimension': spec['dimension'],
+        'groups': groups,
+        'measures': {m: result[m].tolist() for m in spec['measures']},
+        # Same shape as ttf_by_role so the TTF chart can render it directly
+        'roles': groups,
+        'values': result[spec['measures'][0]].tolist()
+    }
+
+def encode_row_cursor(sort_value, row_id):
+    """Encode the last row's (sort value, id) as an opaque page cursor"""
+    raw = json.dumps([sort_value, row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_row_cursor(cursor):
+    """Decode a page cursor, raising ValueError when it is malformed"""
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        sort_value, row_id = None, None
+    if not isinstance(sort_value, (str, int, float)) or type(row_id) is not int:
+        raise ValueError('Invalid cursor: pass the next_cursor returned with the previous page')
+    return sort_value, row_id
+
+def row_column_sql(table_name, filters):
+    """SQL expressions of a table's computed row columns, evaluated as of the filters' date"""
+    as_of_day = epoch_day(filters_as_of(filters))
+    return {col: expr.format(as_of_day=as_of_day) for col, expr in ROW_COMPUTED_COLUMNS[table_name].items()}
+
+def select_row_columns(table_name, filters, columns):
+    """SELECT list for row columns, with computed columns under their own names"""
+    computed = row_column_sql(table_name, filters)
+    return ', '.join(f'{computed[col]} AS {col}' if col in computed else col for col in columns)
+
+def build_rows_where(table_name, upload_id, filters, predicates):
+    """Translate global filters and drill-down predicates into SQL conditions"""
+    where = ['upload_id = ?']
+    params = [upload_id]
+
+    for param, col_name in FILTER_MAPPING.items():
+        values = filters.get(param)
+        if values:
+            where.append(f'{col_name} IN ({",".join("?" * len(values))})')
+            params.extend(values)
+
+    if 'start_date' in filters:
+        where.append(f'{table_name}.position_created_date BETWEEN ? AND ?')
+        params.extend([epoch_day(filters['start_date']), epoch_day(filters['end_date'])])
+
+    # Rows aged as of a date leave out positions created after it, like add_position_age()
+    if 'position_age' in ROW_COMPUTED_COLUMNS[table_name]:
+        where.append(f'({table_name}.position_created_date IS NULL OR {table_name}.position_created_date <= ?)')
+        params.append(epoch_day(filters_as_of(filters)))
+
+    if predicates.get('stage'):
+        where.append('job_state = ?')
+        params.append(predicates['stage'])
+
+    if predicates.get('partner'):
+        where.append('ta_partner = ?')
+        params.append(predicates['partner'])
+
+    if predicates.get('metric'):
+        metric_sql = ROW_METRIC_PREDICATES[table_name].get(predicates['metric'])
+        if metric_sql is None:
+            raise ValueError(f'metric must be one of: {", ".join(ROW_METRIC_PREDICATES[table_name])}')
+        where.append(metric_sql.format(**row_column_sql(table_name, filters)))
+
+    return where, params
+
+def fetch_rows_page(sheet_type, upload_id, filters, predicates, columns=None,
+                    sort='id', order='asc', cursor=None, limit=ROWS_PAGE_SIZE):
+    """Fetch one page of row-level detail using keyset pagination.
+
+    Pages seek on the (upload_id, sort, id) index instead of using OFFSET,
+    so every page costs the same. Rows whose sort column is NULL are not
+    part of a result sorted by that column.
+    """
+    table_name = 'hired_data' if sheet_type == 'hired' else 'final_data'
+
+    sort_keys = ROW_SORT_KEYS[table_name] + list(ROW_DERIVED_SORT_KEYS[table_name])
+    if sort not in sort_keys:
+        raise ValueError(f'sort must be one of: {", ".join(sort_keys)}')
+
+    # A computed key (position_age) seeks the index of the column it is derived from, in reverse
+    sort_column, seek_order = sort, order
+    if sort in ROW_DERIVED_SORT_KEYS[table_name]:
+        sort_column = ROW_DERIVED_SORT_KEYS[table_name][sort]
+        seek_order = 'asc' if order == 'desc' else 'desc'
+
+    with get_db_connection() as conn:
+        table_columns = [row['name'] for row in conn.execute(f'PRAGMA table_info({table_name})')]
+
+        if columns:
+            unknown = [col for col in columns if col not in table_columns]
+            if unknown:
+                raise ValueError(f'Unknown columns: {unknown}')
+            selected = ['id'] + [col for col in columns if col != 'id']
+        else:
+            selected = table_columns
+        for col in (sort, sort_column):
+            if col not in selected:
+                selected.append(col)
+
+        where, params = build_rows_where(table_name, upload_id, filters, predicates)
+
+        direction = 'DESC' if seek_order == 'desc' else 'ASC'
+        comparison = '<' if seek_order == 'desc' else '>'
+
+        if sort_column == 'id':
+            order_by = f'id {direction}'
+            if cursor:
+                _, last_id = decode_row_cursor(cursor)
+                where.append(f'id {comparison} ?')
+                params.append(last_id)
+        else:
+            stored = f'{table_name}.{sort_column}'
+            order_by = f'{stored} {direction}, id {direction}'
+            where.append(f'{stored} IS NOT NULL')
+            if cursor:
+                last_value, last_id = decode_row_cursor(cursor)
+                where.append(f'({stored}, id) {comparison} (?, ?)')
+                params.extend([last_value, last_id])
+
+        query = f'''
+            SELECT {select_row_columns(table_name, filters, selected)} FROM {table_name}
+            WHERE {" AND ".join(where)}
+            ORDER BY {order_by}
+            LIMIT ?
+        '''
+        params.append(limit + 1)
+
+        rows = [dict(row) for row in conn.execute(query, params).fetchall()]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_value = rows[-1][sort_column]
+        if sort_column in DATE_COLUMNS[table_name]:
+            last_value = epoch_day(last_value)
+        next_cursor = encode_row_cursor(last_value, rows[-1]['id'])
+
+    return {
+        'columns': selected,
+        'rows': rows,
+        'next_cursor': next_cursor,
+        'sort': sort,
+        'order': order
+    }
+
+def iter_export_batches(table_name, upload_id, filters, predicates, columns):
+    """Yield the filtered rows of a table in fixed-size batches from a SQLite cursor"""
+    with get_db_connection() as conn:
+        where, params = build_rows_where(table_name, upload_id, filters, predicates)
+        cursor = conn.execute(f'''
+            SELECT {select_row_columns(table_name, filters, columns)} FROM {table_name}
+            WHERE {" AND ".join(where)}
+            ORDER BY id
+        ''', params)
+
+        while True:
+            batch = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not batch:
+                break
+            yield batch
+
+def generate_csv_export(batches, columns):
+    """Stream CSV text, header first, one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(columns)
+    yield buffer.getvalue()
+
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerows(batch)
+        yield buffer.getvalue()
+
+def generate_xlsx_export(batches, columns, sheet_title):
+    """Stream an XLSX file built with a write-only workbook.
+
+    An empty first chunk sends the response headers straight away. The
+    write-only sheet writes rows out as batches arrive, but the zip container
+    can only be written once all rows are in, so the finished file is spooled
+    and its bytes streamed afterwards.
+    """
+    yield b''
+
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_title)
+    sheet.append(columns)
+
+    for batch in batches:
+        for row in batch:
+            sheet.append(tuple(row))
+
+    with tempfile.SpooledTemporaryFile(max_size=EXPORT_XLSX_SPOOL_BYTES) as tmp:
+        workbook.save(tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(EXPORT_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+def get_training_executor():
+    """Return the single-process pool used for model training"""
+    global _training_executor
+    with _training_lock:
+        if _training_executor is None:
+            _training_executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        return _training_executor
+
+def schedule_model_training(upload_id):
+    """Queue a background retraining job for an upload unless one is already running.
+
+    Returns None when another process (e.g. a serve.py worker) holds the
+    training lock; its artifacts are picked up by get_serving_model().
+    """
+    if not ml_models.SKLEARN_AVAILABLE:
+        return None
+
+    models_folder = get_models_folder()
+    with _training_lock:
+        job = _training_jobs.get(upload_id)
+        if job and job['status'] == 'training':
+            return job
+        lock = ml_models.acquire_training_lock(models_folder, upload_id)
+        if lock is None:
+            return None
+        job = {'status': 'training', 'started_at': time.time(), 'error': None}
+        _training_jobs[upload_id] = job
+
+    try:
+        future = get_training_executor().submit(
+            ml_models.run_training_job, app.config['DATABASE'], models_folder, upload_id)
+    except Exception:
+        ml_models.release_training_lock(lock)
+        raise
+
+    def on_done(done):
+        try:
+            artifacts = done.result()
+            # Hot-swap: the new model replaces the old one in a single assignment
+            for kind, path in artifacts.items():
+                if path:
+                    ml_models.install_model(kind, upload_id, ml_models.load_artifact(path))
+            job['status'] = 'ready' if any(artifacts.values()) else 'insufficient_data'
+        except Exception as e:
+            job['status'] = 'failed'
+            job['error'] = str(e)
+            print(f"⚠️ Model training failed for upload {upload_id}: {e}")
+        job['finished_at'] = time.time()
+        ml_models.release_training_lock(lock)
+
+    future.add_done_callback(on_done)
+    return job
+
+def get_serving_model(kind, upload_id, schedule=True):
+    """Return the serving model, loading the newest artifact or scheduling training on a miss"""
+    model = ml_models.get_model(kind, upload_id)
+    if model is not None:
+        return model
+
+    artifact = ml_models.latest_artifact(get_models_folder(), kind, upload_id)
+    if artifact:
+        model = ml_models.load_artifact(artifact[1])
+        ml_models.install_model(kind, upload_id, model)
+        return model
+
+    # Never train on a request worker
+    job = _training_jobs.get(upload_id)
+    if schedule and (job is None or job['status'] == 'failed'):
+        schedule_model_training(upload_id)
+    return None
+
+def model_unavailable_error(upload_id):
+    """Explain why no model is being served for an upload"""
+    job = _training_jobs.get(upload_id)
+    if job and job['status'] == 'insufficient_data':
+        return jsonify({'error': f'Not enough hired data to train a model (need {ml_models.MIN_TRAINING_ROWS} filled positions)'}), 400
+    if job and job['status'] == 'failed':
+        return jsonify({'error': f"Model training failed: {job['error']}"}), 500
+    return jsonify({'error': 'AI models are training for this upload. Please try again shortly.', 'status': 'training'}), 503
+
+def build_recommendations_payload(upload_id, limit, position_id=None, as_of=None):
+    """Recommend partners for the oldest open positions of an upload, aged as of a date (today)"""
+    similarity = get_serving_model('similarity', upload_id)
+    if similarity is None:
+        return {'error': 'AI models are not available for this upload yet'}
+
+    positions = load_from_database('final', upload_id)
+    if positions is None:
+        return {'error': 'No pipeline data available'}
+    positions = add_position_age(positions, as_of or date.today())
+
+    if position_id is not None:
+        positions = positions[positions['id'] == position_id]
+    elif 'position_age' in positions.columns:
+        positions = positions.sort_values('position_age', ascending=False)
+    positions = positions.head(limit)
+
+    started = time.perf_counter()
+    matches = ml_models.recommend_partners(similarity, positions) if len(positions) else []
+    ml_models.record_serving_latency('similarity', time.perf_counter() - started)
+
+    results = []
+    recommendations = []
+    for (_, position), match in zip(positions.iterrows(), matches):
+        age = position.get('position_age')
+        role = position.get('job_title') or 'Unknown role'
+        results.append({
+            'id': int(position['id']),
+            'job_ref_id': position.get('job_ref_id'),
+            'job_title': role,
+            'position_age': int(age) if pd.notna(age) else None,
+            **match
+        })
+
+        if not match['ta_partners']:
+            continue
+
+        best = match['ta_partners'][0]
+        sourcing = ', '.join(p['name'] for p in match['sourcing_partners']) or 'any sourcing partner'
+        recommendations.append({
+            'type': 'sourcing',
+            'priority': 'high' if pd.notna(age) and age > 60 else 'medium' if pd.notna(age) and age > 30 else 'low',
+            'title': f"{role} ({position.get('job_ref_id') or position['id']})",
+            'description': f"{best['name']} filled {best['similar_roles_filled']} of the most similar historical roles",
+            'action': f"Assign {best['name']} as TA partner and source through {sourcing}",
+            'impact': f"Expected time-to-fill {match['expected_ttf']} days" if match['expected_ttf'] is not None else 'Faster fill'
+        })
+
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'positions': results,
+        'recommendations': recommendations
+    }
+
+def warm_upload_cache(upload_id, has_hired, has_final):
+    """Precompute the default views of an upload and materialize its saved views"""
+    views = []
+    if has_hired:
+        views.append('hired')
+    if has_final:
+        views.append('pipeline')
+
+    for view_type in views:
+        filters = with_as_of(view_type, {})
+        get_cached_payload(make_cache_key('dashboard', view_type, upload_id, filters),
+                           lambda: build_dashboard_payload(view_type, upload_id, filters))
+        get_cached_payload(make_cache_key('filter_options', view_type, upload_id),
+                           lambda: build_filter_options(view_type, upload_id))
+
+    materialize_saved_views(upload_id, views)
+
+def warm_latest_uploads(upload_count, fresh_cache=True):
+    """Warm the latest uploads, by default into an emptied payload cache.
+
+    serve.py's master calls this after preloading and before forking, so
+    every new worker generation starts warm instead of only the worker that
+    handled the upload.
+    """
+    if fresh_cache:
+        clear_payload_cache()
+    if not app.config['CACHE_WARMUP']:
+        return []
+
+    with get_db_connection() as conn:
+        uploads = conn.execute('''
+            SELECT id, has_hired_sheet, has_final_sheet FROM uploads ORDER BY id DESC LIMIT ?
+        ''', (upload_count,)).fetchall()
+
+    for upload in uploads:
+        try:
+            warm_upload_cache(upload['id'], bool(upload['has_hired_sheet']), bool(upload['has_final_sheet']))
+        except Exception as e:
+            print(f"⚠️ Cache warm-up failed for upload {upload['id']}: {e}")
+    return [upload['id'] for upload in uploads]
+
+def start_daily_refresh():
+    """Shortly after every midnight, warm the latest upload again on a daemon thread.
+
+    Pipeline ages move on with the date, so yesterday's pipeline payloads and
+    saved-view results no longer match the first morning request. serve.py's
+    master reloads its workers on a new day instead.
+    """
+    global _daily_refresh_thread
+    if not app.config['DAILY_REFRESH'] or in_prefork_master() or _daily_refresh_thread is not None:
+        return None
+
+    def run():
+        while True:
+            now = datetime.now()
+            midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+            time.sleep((midnight - now).total_seconds() + app.config['DAILY_REFRESH_DELAY'])
+            # Hired payloads are unchanged and stay cached; stale pipeline ones are rebuilt
+            warmed = warm_latest_uploads(1, fresh_cache=False)
+            print(f"🌅 Refreshed pipeline views of uploads {warmed} for {date.today().isoformat()}")
+
+    _daily_refresh_thread = threading.Thread(target=run, name='dashboard-daily-refresh', daemon=True)
+    _daily_refresh_thread.start()
+    return _daily_refresh_thread
+
+def schedule_cache_warmup(upload_id, has_hired, has_final):
+    """Run warm_upload_cache in the background; under serve.py the master warms
+    the worker generation that the upload's reload starts instead"""
+    if not app.config['CACHE_WARMUP'] or app.config['PREFORK_MASTER_PID']:
+        return None
+
+    def run():
+        try:
+            warm_upload_cache(upload_id, has_hired, has_final)
+        except Exception as e:
+            print(f"⚠️ Cache warm-up failed for upload {upload_id}: {e}")
+
+    return _background_executor.submit(run)
+
+def ensure_database():
+    """Run schema setup once per process for the configured database"""
+    database = app.config['DATABASE']
+    if database in _initialized_databases:
+        return
+
+    with _schema_lock:
+        if database not in _initialized_databases:
+            _initialized_databases[database] = init_database()
+
+def get_models_folder():
+    """Model artifact folder of the configured database"""
+    ensure_database()
+    return os.path.join(app.config['MODELS_FOLDER'], _initialized_databases[app.config['DATABASE']])
+
+def create_app(config=None):
+    """Configure the application and set up its storage; used by app.py and WSGI servers"""
+    if config:
+        app.config.update(config)
+
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    ensure_database()
+
+    if app.config['QUERY_BACKEND'] == 'duckdb' and not duckdb_backend.DUCKDB_AVAILABLE:
+        print("⚠️ QUERY_BACKEND is 'duckdb' but duckdb is not installed; using pandas")
+
+    start_retention_schedule()
+    start_daily_refresh()
+    return app
+
+# Requests that are never memory profiled (the profiler's own endpoints, scrapes, assets)
+MEMORY_PROFILE_SKIP = ('/metrics', '/api/memory-profile', '/static/')
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_started = time.perf_counter()
+    metrics.start_request()
+
+    # Covers servers that import `app` directly instead of calling create_app()
+    ensure_database()
+
+    if app.config['MEMORY_PROFILE'] and not request.path.startswith(MEMORY_PROFILE_SKIP):
+        memory_trace.enable(app.config['MEMORY_PROFILE_LOG'], app.config['MEMORY_PROFILE_TOP'])
+        metrics.add_stage_hook(memory_trace.stage_hook)
+        endpoint = request.url_rule.rule if request.url_rule else request.path
+        memory_trace.start_request(f'{request.method} {endpoint}')
+        g.memory_profiled = True
+
+@app.after_request
+def record_request_metrics(response):
+    stages = metrics.finish_request()
+    started = g.get('metrics_started')
+    if started is None:
+        return response
+
+    elapsed = time.perf_counter() - started
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.REQUEST_SECONDS.observe(elapsed, endpoint=endpoint, method=request.method,
+                                    status=response.status_code)
+    if not response.is_streamed:
+        metrics.PAYLOAD_BYTES.observe(response.calculate_content_length() or 0, endpoint=endpoint)
+
+    # Stage breakdown shows up in the browser devtools timing tab
+    response.headers['Server-Timing'] = metrics.server_timing(stages, elapsed)
+    g.response_status = response.status_code
+    return response
+
+@app.teardown_request
+def finish_memory_profile(exc):
+    if g.get('memory_profiled'):
+        memory_trace.finish_request(g.get('response_status', 500))
+
+@app.route('/api/memory-profile')
+def memory_profile_report():
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({
+        'enabled': app.config['MEMORY_PROFILE'],
+        'worker': os.getpid(),
+        'log_file': app.config['MEMORY_PROFILE_LOG'],
+        'traced': memory_trace.traced_memory(),
+        'profiles': memory_trace.recent(limit=max(limit, 1), name=request.args.get('name'))
+    })
+
+@app.route('/api/frame-store')
+def frame_store_status():
+    if not app.config['FRAME_STORE']:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **get_frame_store().stats()})
+
+@app.route('/api/retention')
+def retention_status():
+    return jsonify({
+        'keep_uploads': app.config['RETENTION_UPLOADS'],
+        'interval_seconds': app.config['RETENTION_INTERVAL'],
+        'scheduled': _retention_thread is not None,
+        'database_bytes': database_size(),
+        'last_run': _last_retention
+    })
+
+@app.route('/api/retention', methods=['POST'])
+def run_retention():
+    payload = request.get_json(silent=True) or {}
+    keep = payload.get('keep')
+    if keep is not None and (not isinstance(keep, int) or isinstance(keep, bool)):
+        return jsonify({'error': 'keep must be an integer'}), 400
+    if keep is None and app.config['RETENTION_UPLOADS'] < 1:
+        return jsonify({'error': 'keep is required when RETENTION_UPLOADS is not set'}), 400
+
+    # Run in the server so its caches and frames drop the archived uploads
+    # too; under serve.py the master then reloads every worker
+    try:
+        report = apply_retention(keep, dry_run=bool(payload.get('dry_run')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(report)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    with _payload_cache_lock:
+        metrics.CACHE_ENTRIES.set(len(_payload_cache))
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/sql-trace', methods=['GET'])
+def sql_trace_report():
+    sort = request.args.get('sort', 'total')
+    if sort not in ('total', 'max', 'count', 'slow'):
+        return jsonify({'error': 'sort must be one of total, max, count, slow'}), 400
+
+    limit = request.args.get('limit', 20, type=int)
+    report = query_trace.report(limit=max(limit, 1), sort=sort)
+    report['enabled'] = app.config['SQL_TRACE']
+    report['slow_query_ms'] = app.config['SQL_SLOW_QUERY_MS']
+    report['worker'] = os.getpid()  # per process; under serve.py, whichever worker took the request
+    return jsonify(report)
+
+@app.route('/api/sql-trace', methods=['DELETE'])
+def reset_sql_trace():
+    query_trace.reset()
+    return jsonify({'success': True})
 
 @app.route('/')
 def index():
@@ -1465,8 +1828,9 @@ def upload_file():
     if file and file.filename and file.filename.endswith(('.xlsx', '.xls')):
         try:
             # Read and process file
-            file_content = file.read()
-            file_hash = hashlib.md5(file_content).hexdigest()
+            with metrics.stage('read_upload'):
+                file_content = file.read()
+                file_hash = hashlib.md5(file_content).hexdigest()
             
             # Check for existing file
             with get_db_connection() as conn:
@@ -1485,7 +1849,8 @@ def upload_file():
             
             # Process new file
             file.seek(0)
-            excel_file = pd.ExcelFile(io.BytesIO(file.read()))
+            with metrics.stage('open_workbook'):
+                excel_file = pd.ExcelFile(io.BytesIO(file.read()))
             file.seek(0)
             
             debug_info = []
@@ -1499,7 +1864,8 @@ def upload_file():
             # Process sheets
             if 'Hired' in excel_file.sheet_names:
                 try:
-                    hired_df = pd.read_excel(file, sheet_name='Hired')
+                    with metrics.stage('read_excel'):
+                        hired_df = pd.read_excel(file, sheet_name='Hired')
                     hired_data, hired_debug = prepare_df(hired_df, 'hired')
                     debug_info.append(f"✅ Hired sheet processed: {len(hired_data)} rows")
                     debug_info.append(hired_debug)
@@ -1509,7 +1875,8 @@ def upload_file():
             
             if 'Final' in excel_file.sheet_names:
                 try:
-                    final_df = pd.read_excel(file, sheet_name='Final')
+                    with metrics.stage('read_excel'):
+                        final_df = pd.read_excel(file, sheet_name='Final')
                     final_data, final_debug = prepare_df(final_df, 'final')
                     debug_info.append(f"✅ Final sheet processed: {len(final_data)} rows")
                     debug_info.append(final_debug)
@@ -1533,6 +1900,9 @@ def upload_file():
                 upload_id = cursor.lastrowid
                 conn.commit()
             
+            # Nothing trained for an earlier upload under this id may be served
+            discard_upload_models(upload_id)
+            
             # Save data
             if hired_data is not None and not hired_data.empty:
                 save_to_database(hired_data, 'hired', upload_id)
@@ -1541,6 +1911,32 @@ def upload_file():
             if final_data is not None and not final_data.empty:
                 save_to_database(final_data, 'final', upload_id)
                 debug_info.append(f"💾 Saved {len(final_data)} pipeline records to database")
+
+            follow_ups = []
+            
+            # Other worker processes attach to these instead of re-reading SQLite
+            if app.config['FRAME_STORE']:
+                follow_ups.append(('Publishing shared frames', lambda: publish_upload_frames(
+                    upload_id, [sheet_type for sheet_type, present in
+                                (('hired', has_hired), ('final', has_final)) if present])))
+            
+            # Precompute default views so the first dashboard load is a cache hit
+            follow_ups.append(('Scheduling cache warm-up', lambda: schedule_cache_warmup(upload_id, has_hired, has_final)))
+            
+            # Retrain ML models for the new upload in a separate process
+            if has_hired and app.config['AUTO_TRAIN_MODELS']:
+                follow_ups.append(('Scheduling model training', lambda: schedule_model_training(upload_id)))
+            
+            # Under serve.py, workers are re-forked with the new upload preloaded
+            follow_ups.append(('Reloading workers', notify_data_changed))
+            
+            # The data is committed by now: a failing follow-up is reported, not turned into a failed upload
+            for label, follow_up in follow_ups:
+                try:
+                    follow_up()
+                except Exception as e:
+                    print(f"⚠️ {label} failed for upload {upload_id}: {e}")
+                    debug_info.append(f"⚠️ {label} failed: {e}")
             
             return jsonify({
                 'success': True,
@@ -1561,71 +1957,398 @@ def upload_file():
 
 @app.route('/api/filter-options/<dashboard_type>')
 def get_filter_options(dashboard_type):
-    upload_id = request.args.get('upload_id')
-    df = load_from_database('hired' if dashboard_type == 'hired' else 'final', upload_id)
-    
-    if df is None or df.empty:
-        return jsonify({})
-    
-    options = {}
-    
-    # Map to your actual column names
-    filter_mapping = {
-        'hiring_manager': 'hiring_manager',
-        'ta_partner': 'ta_partner', 
-        'country': 'job_location_country',
-        'project': 'project_name'
-    }
-    
-    for filter_key, col_name in filter_mapping.items():
-        if col_name in df.columns:
-            unique_values = sorted([str(val) for val in df[col_name].unique() if pd.notna(val) and str(val) != 'Unknown'])
-            options[filter_key] = unique_values
-    
-    if 'position_created_date' in df.columns:
-        min_date = df['position_created_date'].min().strftime('%Y-%m-%d') if pd.notna(df['position_created_date'].min()) else None
-        max_date = df['position_created_date'].max().strftime('%Y-%m-%d') if pd.notna(df['position_created_date'].max()) else None
-        options['date_range'] = {'min': min_date, 'max': max_date}
-    
-    return jsonify(options)
+    upload_id = resolve_upload_id(request.args.get('upload_id'))
+    body = get_cached_payload(make_cache_key('filter_options', dashboard_type, upload_id),
+                              lambda: build_filter_options(dashboard_type, upload_id))
+    return json_body_response(body)
 
 @app.route('/api/dashboard-data/<dashboard_type>')
 def get_dashboard_data(dashboard_type):
-    upload_id = request.args.get('upload_id')
-    df = load_from_database('hired' if dashboard_type == 'hired' else 'final', upload_id)
-    
-    if df is None or df.empty:
+    upload_id = resolve_upload_id(request.args.get('upload_id'))
+    try:
+        filters = with_as_of(dashboard_type, parse_filters(request.args), parse_as_of(request.args.get('as_of')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    body = get_cached_payload(make_cache_key('dashboard', dashboard_type, upload_id, filters),
+                              lambda: build_dashboard_payload(dashboard_type, upload_id, filters))
+    return json_body_response(body)
+
+@app.route('/api/pivot/<dashboard_type>')
+def get_pivot_data(dashboard_type):
+    spec, error = parse_pivot_spec(request.args)
+    if error:
+        return jsonify({'error': error}), 400
+
+    upload_id = resolve_upload_id(request.args.get('upload_id'))
+    try:
+        filters = parse_filters(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    body = get_cached_payload(make_cache_key('pivot', dashboard_type, upload_id, filters, spec),
+                              lambda: build_pivot_payload(dashboard_type, upload_id, filters, spec))
+    return json_body_response(body)
+
+@app.route('/api/rows/<dashboard_type>')
+def get_rows(dashboard_type):
+    upload_id = resolve_upload_id(request.args.get('upload_id'))
+    if upload_id is None:
         return jsonify({'error': 'No data available'})
+
+    predicates = {key: request.args.get(key) for key in ('stage', 'partner', 'metric')}
+    columns = [col for col in request.args.get('columns', '').split(',') if col]
+
+    try:
+        limit = max(1, min(int(request.args.get('limit', ROWS_PAGE_SIZE)), ROWS_MAX_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'error': f'limit must be an integer (at most {ROWS_MAX_PAGE_SIZE} rows per page)'}), 400
+
+    try:
+        filters = with_as_of(dashboard_type, parse_filters(request.args), parse_as_of(request.args.get('as_of')))
+        page = fetch_rows_page(
+            'hired' if dashboard_type == 'hired' else 'final', upload_id, filters, predicates,
+            columns=columns,
+            sort=request.args.get('sort', 'id'),
+            order=request.args.get('order', 'asc'),
+            cursor=request.args.get('cursor'),
+            limit=limit
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify(page)
+
+@app.route('/api/export/<dashboard_type>')
+def export_data(dashboard_type):
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'xlsx'):
+        return jsonify({'error': 'format must be csv or xlsx'}), 400
+
+    upload_id = resolve_upload_id(request.args.get('upload_id'))
+    if upload_id is None:
+        return jsonify({'error': 'No data available'}), 404
+
+    table_name = 'hired_data' if dashboard_type == 'hired' else 'final_data'
+    predicates = {key: request.args.get(key) for key in ('stage', 'partner', 'metric')}
+    try:
+        filters = with_as_of(dashboard_type, parse_filters(request.args), parse_as_of(request.args.get('as_of')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    with get_db_connection() as conn:
+        table_columns = [row['name'] for row in conn.execute(f'PRAGMA table_info({table_name})')
+                         if row['name'] not in ('id', 'upload_id')]
+
+    columns = [col for col in request.args.get('columns', '').split(',') if col] or table_columns
+    unknown = [col for col in columns if col not in table_columns]
+    if unknown:
+        return jsonify({'error': f'Unknown columns: {unknown}'}), 400
+
+    try:
+        # Validate predicates up front; the generator runs after headers are sent
+        where, params = build_rows_where(table_name, upload_id, filters, predicates)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if export_format == 'xlsx':
+        with get_db_connection() as conn:
+            row_count = conn.execute(f'SELECT COUNT(*) FROM {table_name} WHERE {" AND ".join(where)}',
+                                     params).fetchone()[0]
+        if row_count > EXPORT_XLSX_MAX_ROWS:
+            return jsonify({'error': f'XLSX exports are limited to {EXPORT_XLSX_MAX_ROWS:,} rows and this one has '
+                                     f'{row_count:,}; use format=csv or narrow the filters'}), 400
+
+    batches = iter_export_batches(table_name, upload_id, filters, predicates, columns)
+    filename = f'{table_name}_{upload_id}.{export_format}'
+
+    if export_format == 'csv':
+        body = generate_csv_export(batches, columns)
+        mimetype = 'text/csv'
+    else:
+        body = generate_xlsx_export(batches, columns, 'Hired' if dashboard_type == 'hired' else 'Final')
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+    return Response(body, mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+@app.route('/api/ml-predictions', methods=['POST'])
+def ml_predictions():
+    if not ml_models.SKLEARN_AVAILABLE:
+        return jsonify({'error': 'AI features are disabled: scikit-learn is not installed'}), 503
+
+    payload = request.get_json(silent=True) or {}
+    upload_id = resolve_upload_id(payload.get('upload_id'))
+    if upload_id is None:
+        return jsonify({'error': 'No data available'}), 404
+
+    model = get_serving_model('ttf', upload_id)
+    if model is None:
+        return model_unavailable_error(upload_id)
+
+    # Batch: the whole open pipeline, or an explicit list of positions
+    if payload.get('source') == 'pipeline':
+        positions = load_from_database('final', upload_id)
+        if positions is None:
+            return jsonify({'error': 'No pipeline data available'}), 404
+    elif 'positions' in payload:
+        positions = pd.DataFrame(payload['positions'])
+    else:
+        positions = None
+
+    confidence = ml_models.describe_confidence(model)
+    explanation = f"Based on {model['training_rows']:,} filled positions; typical error ±{model['mae']:.1f} days"
+
+    if positions is None:
+        started = time.perf_counter()
+        prediction = ml_models.predict_ttf(model, pd.DataFrame([payload]))[0]
+        ml_models.record_serving_latency('ttf', time.perf_counter() - started)
+        return jsonify({
+            'time_to_fill': {
+                'prediction': round(float(prediction), 1),
+                'confidence': confidence,
+                'explanation': explanation
+            }
+        })
+
+    started = time.perf_counter()
+    predictions = ml_models.predict_ttf(model, positions)
+    ml_models.record_serving_latency('ttf', time.perf_counter() - started)
+    ids = positions['id'].tolist() if 'id' in positions.columns else list(range(len(positions)))
+    job_refs = positions['job_ref_id'].tolist() if 'job_ref_id' in positions.columns else [None] * len(positions)
+
+    return jsonify({
+        'predictions': [
+            {'id': row_id, 'job_ref_id': job_ref, 'predicted_ttf': round(float(value), 1)}
+            for row_id, job_ref, value in zip(ids, job_refs, predictions)
+        ],
+        'confidence': confidence,
+        'explanation': explanation
+    })
+
+@app.route('/api/anomaly-detection')
+def anomaly_detection():
+    sheet_type = 'hired' if request.args.get('sheet_type', 'hired') == 'hired' else 'final'
+    method = request.args.get('method', 'robust')
+    if method not in ('robust', 'isolation_forest'):
+        return jsonify({'error': 'method must be robust or isolation_forest'}), 400
+    if method == 'isolation_forest' and not ml_models.SKLEARN_AVAILABLE:
+        return jsonify({'error': 'AI features are disabled: scikit-learn is not installed'}), 503
+
+    view_type = 'hired' if sheet_type == 'hired' else 'pipeline'
+    try:
+        spec = with_as_of(view_type, {'method': method}, parse_as_of(request.args.get('as_of')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    upload_id = resolve_upload_id(request.args.get('upload_id'))
+
+    def build():
+        df = load_from_database(sheet_type, upload_id)
+        if df is None or df.empty:
+            return {'error': 'No data available'}
+        if sheet_type == 'final':
+            df = add_position_age(df, filters_as_of(spec))
+        return ml_models.detect_anomalies(df, sheet_type, method)
+
+    # One scan per (upload, sheet, method, as-of date); repeat views are served from the cache
+    body = get_cached_payload(make_cache_key('anomalies', view_type, upload_id, spec=spec), build)
+    return json_body_response(body)
+
+@app.route('/api/ml-recommendations')
+def ml_recommendations():
+    if not ml_models.SKLEARN_AVAILABLE:
+        return jsonify({'error': 'AI features are disabled: scikit-learn is not installed'}), 503
+
+    upload_id = resolve_upload_id(request.args.get('upload_id'))
+    if upload_id is None:
+        return jsonify({'error': 'No data available'}), 404
+
+    try:
+        limit = max(1, min(int(request.args.get('limit', 20)), 500))
+        position_id = int(request.args['position_id']) if request.args.get('position_id') else None
+    except ValueError:
+        return jsonify({'error': 'limit and position_id must be integers'}), 400
+    try:
+        as_of = parse_as_of(request.args.get('as_of'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    similarity = get_serving_model('similarity', upload_id)
+    if similarity is None:
+        return model_unavailable_error(upload_id)
+
+    # Keyed on the model version so a hot-swapped index is not served stale results
+    spec = with_as_of('pipeline', {'limit': limit, 'position_id': position_id,
+                                   'model_version': similarity.get('version')}, as_of)
+    body = get_cached_payload(
+        make_cache_key('recommendations', 'pipeline', upload_id, spec=spec),
+        lambda: build_recommendations_payload(upload_id, limit, position_id, as_of)
+    )
+    return json_body_response(body)
+
+@app.route('/api/ml-retrain', methods=['POST'])
+def ml_retrain():
+    if not ml_models.SKLEARN_AVAILABLE:
+        return jsonify({'error': 'AI features are disabled: scikit-learn is not installed'}), 503
+
+    payload = request.get_json(silent=True) or {}
+    upload_id = resolve_upload_id(payload.get('upload_id') or request.args.get('upload_id'))
+    if upload_id is None:
+        return jsonify({'error': 'No data available'}), 404
+
+    job = schedule_model_training(upload_id)
+    # No job here means another process is already training this upload
+    return jsonify({'success': True, 'upload_id': upload_id, 'status': job['status'] if job else 'training'}), 202
+
+@app.route('/api/ml-status')
+def ml_status():
+    if not ml_models.SKLEARN_AVAILABLE:
+        return jsonify({
+            'is_trained': False,
+            'training_requirements': 'AI features are disabled: scikit-learn is not installed'
+        })
+
+    upload_id = resolve_upload_id(request.args.get('upload_id'))
+    job = _training_jobs.get(upload_id)
+
+    details = {}
+    for kind in ml_models.MODEL_KINDS:
+        model = get_serving_model(kind, upload_id, schedule=False) if upload_id else None
+        details[kind] = {
+            'trained': model is not None,
+            'version': model.get('version') if model else None,
+            'schema': model.get('schema') if model else None,
+            'training_rows': model['training_rows'] if model else None,
+            'training_seconds': round(model['training_seconds'], 3) if model else None,
+            'trained_at': datetime.fromtimestamp(model['trained_at']).isoformat() if model else None,
+            'serving_latency': ml_models.serving_latency_summary(kind)
+        }
+
+    return jsonify({
+        'is_trained': any(d['trained'] for d in details.values()),
+        'upload_id': upload_id,
+        'models': {'ttf_prediction': details['ttf']['trained'],
+                   'partner_recommendations': details['similarity']['trained']},
+        'details': details,
+        'training_job': {
+            'status': job['status'],
+            'error': job['error'],
+            'started_at': datetime.fromtimestamp(job['started_at']).isoformat()
+        } if job else None,
+        'capabilities': [
+            'Time-to-fill prediction for open positions',
+            'Partner recommendations from similar historical roles',
+            'Anomaly detection on time-to-fill, budget and funnel metrics'
+        ],
+        'training_requirements': f'At least {ml_models.MIN_TRAINING_ROWS} filled positions in the Hired sheet'
+    })
+
+@app.route('/api/saved-views', methods=['GET'])
+def list_saved_views():
+    with get_db_connection() as conn:
+        rows = conn.execute('SELECT * FROM saved_views ORDER BY open_count DESC, name').fetchall()
+    return jsonify({'views': [saved_view_to_dict(row) for row in rows]})
+
+@app.route('/api/saved-views', methods=['POST'])
+def create_saved_view():
+    payload = request.get_json(silent=True) or {}
+    name = (payload.get('name') or '').strip()
+    dashboard_type = 'hired' if payload.get('dashboard_type', 'hired') == 'hired' else 'pipeline'
+
+    if not name:
+        return jsonify({'error': 'A view name is required'}), 400
+
+    try:
+        filters = normalize_view_filters(payload.get('filters'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    with get_db_connection() as conn:
+        try:
+            cursor = conn.execute('''
+                INSERT INTO saved_views (name, dashboard_type, filters)
+                VALUES (?, ?, ?)
+            ''', (name, dashboard_type, json.dumps(filters, sort_keys=True)))
+        except sqlite3.IntegrityError:
+            return jsonify({'error': f'A view named "{name}" already exists'}), 409
+        conn.commit()
+        view = conn.execute('SELECT * FROM saved_views WHERE id = ?', (cursor.lastrowid,)).fetchone()
+
+    # Materialize the view for the latest upload in the background
+    upload_id = resolve_upload_id()
+    if upload_id:
+        _background_executor.submit(run_saved_view_job, view, upload_id)
+
+    return jsonify({'success': True, 'view': saved_view_to_dict(view)}), 201
+
+@app.route('/api/saved-views/<int:view_id>', methods=['DELETE'])
+def delete_saved_view(view_id):
+    with get_db_connection() as conn:
+        conn.execute('DELETE FROM saved_view_results WHERE view_id = ?', (view_id,))
+        cursor = conn.execute('DELETE FROM saved_views WHERE id = ?', (view_id,))
+        conn.commit()
+
+    if cursor.rowcount == 0:
+        return jsonify({'error': 'Saved view not found'}), 404
+    return jsonify({'success': True})
+
+@app.route('/api/saved-views/<int:view_id>/data')
+def get_saved_view_data(view_id):
+    upload_id = resolve_upload_id(request.args.get('upload_id'))
+
+    with get_db_connection() as conn:
+        view = conn.execute('SELECT * FROM saved_views WHERE id = ?', (view_id,)).fetchone()
+        if view is None:
+            return jsonify({'error': 'Saved view not found'}), 404
+
+        conn.execute('''
+            UPDATE saved_views SET open_count = open_count + 1, last_opened_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (view_id,))
+        conn.commit()
+
+        row = conn.execute('''
+            SELECT payload, DATE(computed_at, 'localtime') AS computed_on FROM saved_view_results
+            WHERE view_id = ? AND upload_id = ?
+        ''', (view_id, upload_id)).fetchone()
+
+    # Served straight from the materialized result; only compute on a miss,
+    # or for pipeline views materialized before today, whose ages have moved on
+    if row and (view['dashboard_type'] == 'hired' or row['computed_on'] == date.today().isoformat()):
+        body = row['payload']
+    else:
+        body = materialize_saved_view(view, upload_id)
+    return json_body_response(body)
+
+def hired_commentary(kpis):
+    """Commentary for the hired dashboard KPIs"""
+    total_positions = kpis['total_filled']
+    avg_ttf = kpis['avg_ttf']
     
-    # Apply filters
-    filtered_df = df.copy()
+    commentary = f"<strong>📊 Performance Overview:</strong> {total_positions:,} positions successfully filled<br><br>"
     
-    # Filter mapping
-    filter_mapping = {
-        'hiring_manager': 'hiring_manager',
-        'ta_partner': 'ta_partner',
-        'country': 'job_location_country', 
-        'project': 'project_name'
-    }
+    if avg_ttf <= 30:
+        commentary += f"<strong>⚡ Excellent Speed:</strong> Average time-to-fill of {avg_ttf:.1f} days indicates highly efficient recruitment"
+    elif avg_ttf <= 45:
+        commentary += f"<strong>✅ Good Performance:</strong> Time-to-fill of {avg_ttf:.1f} days meets industry standards"
+    else:
+        commentary += f"<strong>⚠️ Improvement Opportunity:</strong> Time-to-fill of {avg_ttf:.1f} days exceeds typical benchmarks"
     
-    for param, col_name in filter_mapping.items():
-        values = request.args.get(param)
-        if values and col_name in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df[col_name].isin(values.split(','))]
+    return commentary
+
+def pipeline_commentary(kpis, has_age):
+    """Commentary for the pipeline dashboard KPIs"""
+    total_open = kpis['total_open']
+    avg_age = kpis['avg_age']
     
-    # Filter by date range
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    if start_date and end_date and 'position_created_date' in filtered_df.columns:
-        filtered_df = filtered_df[
-            (filtered_df['position_created_date'] >= start_date) & 
-            (filtered_df['position_created_date'] <= end_date)
-        ]
+    commentary = f"<strong>🎯 Pipeline Status:</strong> {total_open:,} active positions in recruitment pipeline<br><br>"
     
-    if dashboard_type == 'hired':
-        return get_hired_dashboard_data(filtered_df)
-    else:
-        return get_pipeline_dashboard_data(filtered_df)
+    if has_age:
+        if kpis['positions_over_60'] > 0:
+            commentary += f"<strong>🔍 Action Required:</strong> {kpis['positions_over_60']} positions over 60 days need priority attention"
+        else:
+            commentary += f"<strong>📈 Healthy Pipeline:</strong> All positions under 60 days, average age {avg_age:.1f} days"
+    
+    return commentary
 
 def get_hired_dashboard_data(df):
     """Generate hired dashboard data"""
@@ -1640,19 +2363,7 @@ def get_hired_dashboard_data(df):
     }
     
     # Commentary
-    total_positions = len(df)
-    avg_ttf = data['kpis']['avg_ttf']
-    
-    commentary = f"<strong>📊 Performance Overview:</strong> {total_positions:,} positions successfully filled<br><br>"
-    
-    if avg_ttf <= 30:
-        commentary += f"<strong>⚡ Excellent Speed:</strong> Average time-to-fill of {avg_ttf:.1f} days indicates highly efficient recruitment"
-    elif avg_ttf <= 45:
-        commentary += f"<strong>✅ Good Performance:</strong> Time-to-fill of {avg_ttf:.1f} days meets industry standards"
-    else:
-        commentary += f"<strong>⚠️ Improvement Opportunity:</strong> Time-to-fill of {avg_ttf:.1f} days exceeds typical benchmarks"
-    
-    data['commentary'] = commentary
+    data['commentary'] = hired_commentary(data['kpis'])
     
     # Funnel data - using your actual column names
     cvs_col = 'number_of_cvs_shared'
@@ -1701,7 +2412,7 @@ def get_hired_dashboard_data(df):
         
         data['leaderboard'] = leaderboard.to_dict('records')
     
-    return jsonify(data)
+    return data
 
 def get_pipeline_dashboard_data(df):
     """Generate pipeline dashboard data"""
@@ -1716,19 +2427,7 @@ def get_pipeline_dashboard_data(df):
     }
     
     # Commentary
-    total_open = len(df)
-    avg_age = data['kpis']['avg_age']
-    
-    commentary = f"<strong>🎯 Pipeline Status:</strong> {total_open:,} active positions in recruitment pipeline<br><br>"
-    
-    if 'position_age' in df.columns:
-        old_positions = df[df['position_age'] > 60]
-        if len(old_positions) > 0:
-            commentary += f"<strong>🔍 Action Required:</strong> {len(old_positions)} positions over 60 days need priority attention"
-        else:
-            commentary += f"<strong>📈 Healthy Pipeline:</strong> All positions under 60 days, average age {avg_age:.1f} days"
-    
-    data['commentary'] = commentary
+    data['commentary'] = pipeline_commentary(data['kpis'], 'position_age' in df.columns)
     
     # Stage distribution
     if 'job_state' in df.columns:
@@ -1746,7 +2445,7 @@ def get_pipeline_dashboard_data(df):
             'values': project_counts.values.tolist()
         }
     
-    return jsonify(data)
+    return data
 
 if __name__ == '__main__':
     print("🚀 Starting Enhanced Recruitment Analytics Dashboard...")
@@ -1755,4 +2454,4 @@ if __name__ == '__main__':
     print("🎯 Access dashboard at: http://localhost:5000")
     print("=" * 50)
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    create_app().run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Compressed columnar archives of retired uploads for the Recruitment Analytics Dashboard
+The retention policy moves uploads that fell out of the hot window from SQLite
+into one compressed .npz file per upload: the uploads row plus every table's
+rows exactly as stored (dates as day numbers), one array per column encoded by
+columnar.py. Text columns become int32 codes with their distinct values in the
+manifest, so the repetitive dimension columns compress to almost nothing.
+
+read_archive() returns the same rows as DataFrames for inspection or restores.
+"""
+
+import json
+import os
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+import columnar
+
+FORMAT_VERSION = 1
+
+def archive_path(folder, upload_id):
+    """Archive file of one upload"""
+    return os.path.join(folder, f'upload_{int(upload_id)}.npz')
+
+def write_archive(path, upload, tables):
+    """Write an upload row and its {table name: DataFrame} rows; returns the file size in bytes"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    manifest = {'version': FORMAT_VERSION, 'archived_at': datetime.now().isoformat(),
+                'upload': upload, 'tables': {}}
+    arrays = {}
+    for table_name, df in tables.items():
+        table, values = columnar.encode_frame(df)
+        for i, column in enumerate(table['columns']):
+            column['key'] = f'{table_name}.{i}'
+            arrays[column['key']] = values[i]
+        manifest['tables'][table_name] = table
+
+    arrays['manifest'] = np.array(json.dumps(manifest))
+
+    # Written aside and renamed, so an interrupted run never leaves a truncated archive
+    staging = f'{path}.tmp'
+    try:
+        with open(staging, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(staging, path)
+    except Exception:
+        if os.path.exists(staging):
+            os.remove(staging)
+        raise
+    return os.path.getsize(path)
+
+def read_archive(path):
+    """(upload row, {table name: DataFrame}) of an archive"""
+    with np.load(path, allow_pickle=False) as data:
+        manifest = json.loads(str(data['manifest']))
+        if manifest.get('version') != FORMAT_VERSION:
+            raise ValueError(f'Unsupported archive version: {manifest.get("version")}')
+
+        tables = {}
+        for table_name, table in manifest['tables'].items():
+            columns = {}
+            for column in table['columns']:
+                columns[column['name']] = columnar.decode_column(column, data[column['key']])
+            tables[table_name] = pd.DataFrame(columns, index=pd.RangeIndex(table['rows']))
+
+    return manifest['upload'], tables
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the ingest and query hot paths of the Recruitment Analytics Dashboard
+
+Usage:
+    python benchmark.py run --sizes 1000,100000,1000000 --output benchmark_results.json
+    python benchmark.py startup --repeat 5 --output startup_results.json
+    python benchmark.py backends --sizes 100000,1000000
+    python benchmark.py ingest --sizes 100000,1000000
+    python benchmark.py compare benchmark_results.json benchmark_baseline.json
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from generate_data import generate_sheets
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+DEFAULT_REPEAT = 3
+
+# A stage only counts as a regression when it is slower/larger by both margins
+DEFAULT_THRESHOLD = 0.20
+MIN_TIME_DELTA = 0.005  # seconds
+MIN_MEMORY_DELTA = 1.0  # MB
+
+# Runs in a fresh interpreter per repetition; prints stage timings as JSON
+STARTUP_PROBE = '''
+import json, os, sys, time
+started = time.perf_counter()
+import app as dashboard
+imported = time.perf_counter()
+application = dashboard.create_app({
+    'DATABASE': os.path.join(sys.argv[1], 'startup.db'),
+    'UPLOAD_FOLDER': os.path.join(sys.argv[1], 'uploads'),
+    'CACHE_WARMUP': False,
+    'AUTO_TRAIN_MODELS': False
+})
+created = time.perf_counter()
+client = application.test_client()
+client.get('/')
+page = time.perf_counter()
+client.get('/api/filter-options/hired')
+data = time.perf_counter()
+try:
+    import resource
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+except ImportError:
+    rss_mb = 0
+print(json.dumps({'import': imported - started, 'create_app': created - imported,
+                  'first_page': page - created, 'first_data_request': data - page, 'rss_mb': rss_mb}))
+'''
+
+def write_workbook(hired_df, final_df):
+    """Serialize both sheets to an in-memory xlsx"""
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        hired_df.to_excel(writer, sheet_name='Hired', index=False)
+        final_df.to_excel(writer, sheet_name='Final', index=False)
+    return buffer.getvalue()
+
+def measure(fn, repeat):
+    """Time fn `repeat` times, then run it once more under tracemalloc for peak memory"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, {
+        'seconds_min': min(timings),
+        'seconds_median': statistics.median(timings),
+        'peak_mb': peak / 1024 / 1024
+    }
+
+def benchmark_size(dashboard, n_rows, repeat, log):
+    """Run every stage for one data size"""
+    stages = {}
+
+    def stage(name, fn, stage_repeat=repeat):
+        result, stats = measure(fn, stage_repeat)
+        stages[name] = stats
+        log(f"    {name:<48} {stats['seconds_median'] * 1000:>10.1f} ms  {stats['peak_mb']:>9.1f} MB")
+        return result
+
+    app = dashboard.app
+    client = app.test_client()
+
+    log(f"[*] Generating {n_rows:,} hired / {max(n_rows // 2, 1):,} pipeline rows...")
+    hired_raw, final_raw = generate_sheets(n_rows, max(n_rows // 2, 1), end='2025-01-01')
+    workbook = write_workbook(hired_raw, final_raw)
+    log(f"[+] Workbook size: {len(workbook) / 1024 / 1024:.1f} MB")
+
+    stage('read_excel', lambda: pd.read_excel(io.BytesIO(workbook), sheet_name=['Hired', 'Final']), 1)
+
+    hired_df, _ = stage('prepare_df[hired]', lambda: dashboard.prepare_df(hired_raw, 'hired'))
+    final_df, _ = stage('prepare_df[final]', lambda: dashboard.prepare_df(final_raw, 'final'))
+
+    with dashboard.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('INSERT INTO uploads (filename, file_hash, has_hired_sheet, has_final_sheet) VALUES (?, ?, 1, 1)',
+                       (f'benchmark_{n_rows}.xlsx', f'benchmark-{n_rows}-{time.time()}'))
+        upload_id = cursor.lastrowid
+        conn.commit()
+
+    stage('save_to_database[hired]', lambda: dashboard.save_to_database(hired_df, 'hired', upload_id))
+    stage('save_to_database[final]', lambda: dashboard.save_to_database(final_df, 'final', upload_id))
+
+    # Read path comparison: row-by-row SQLite vs memory-mapped columnar snapshot
+    app.config['SNAPSHOTS'] = False
+    stage('load_from_database[hired,sqlite]', lambda: dashboard.load_from_database('hired', upload_id))
+    stage('load_from_database[final,sqlite]', lambda: dashboard.load_from_database('final', upload_id))
+    # Projected reads: only the columns the dashboard aggregations or filter options use
+    projections = {
+        'dashboard': lambda sheet_type: dashboard.DASHBOARD_COLUMNS['hired' if sheet_type == 'hired' else 'pipeline'],
+        'filter_options': lambda sheet_type: dashboard.filter_columns()
+    }
+    for sheet_type in ('hired', 'final'):
+        for name, columns in projections.items():
+            stage(f'load_from_database[{sheet_type},sqlite,{name}]',
+                  lambda: dashboard.load_from_database(sheet_type, upload_id, columns(sheet_type)))
+    app.config['SNAPSHOTS'] = True
+    for sheet_type in ('hired', 'final'):
+        df = dashboard.load_from_database(sheet_type, upload_id)
+        path = dashboard.get_snapshot_path(upload_id, sheet_type)
+        stage(f'write_snapshot[{sheet_type}]', lambda: dashboard.snapshots.write_snapshot(path, df))
+        stage(f'load_from_database[{sheet_type},snapshot]', lambda: dashboard.load_from_database(sheet_type, upload_id))
+        for name, columns in projections.items():
+            stage(f'load_from_database[{sheet_type},snapshot,{name}]',
+                  lambda: dashboard.load_from_database(sheet_type, upload_id, columns(sheet_type)))
+
+    def request(path, cold):
+        def run():
+            if cold:
+                dashboard.clear_payload_cache()
+            response = client.get(path)
+            assert response.status_code == 200, f'{path} returned {response.status_code}'
+            return response
+        return run
+
+    for view in ('hired', 'pipeline'):
+        base = f'/api/dashboard-data/{view}?upload_id={upload_id}'
+        stage(f'get_dashboard_data[{view}]', request(base, cold=True))
+        stage(f'get_dashboard_data[{view},cached]', request(base, cold=False))
+
+        filter_options = client.get(f'/api/filter-options/{view}?upload_id={upload_id}').get_json()
+        partners = ','.join(filter_options.get('ta_partner', [])[:3])
+        filtered = f"{base}&ta_partner={partners}&start_date=2023-06-01&end_date=2024-12-01"
+        stage(f'get_dashboard_data[{view},filtered]', request(filtered, cold=True))
+
+        stage(f'get_filter_options[{view}]', request(f'/api/filter-options/{view}?upload_id={upload_id}', cold=True))
+
+    workbook_hash = hashlib.md5(workbook).hexdigest()
+
+    def upload():
+        dashboard.clear_payload_cache()
+        # Forget earlier runs so the duplicate check does not short-circuit the ingest
+        with dashboard.get_db_connection() as conn:
+            conn.execute('DELETE FROM uploads WHERE file_hash = ?', (workbook_hash,))
+            conn.commit()
+        response = client.post('/upload', data={'file': (io.BytesIO(workbook), f'benchmark_{n_rows}.xlsx')},
+                               content_type='multipart/form-data')
+        assert response.status_code == 200, response.get_json()
+        return response
+
+    stage('upload_file', upload, 1)
+
+    return stages
+
+def payload_mismatches(expected, actual, path='', tolerance=1e-9):
+    """Differences between two payloads; floats compare with a relative tolerance"""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        if expected.keys() != actual.keys():
+            return [f'{path}: keys {sorted(expected)} != {sorted(actual)}']
+        return [m for key in expected for m in payload_mismatches(expected[key], actual[key], f'{path}.{key}', tolerance)]
+    if isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            return [f'{path}: {len(expected)} items != {len(actual)}']
+        return [m for i, (e, a) in enumerate(zip(expected, actual))
+                for m in payload_mismatches(e, a, f'{path}[{i}]', tolerance)]
+    if isinstance(expected, float) or isinstance(actual, float):
+        if np.isnan(expected) and np.isnan(actual):
+            return []
+        if np.isclose(expected, actual, rtol=tolerance, atol=0) or expected == actual:
+            return []
+    elif expected == actual:
+        return []
+    return [f'{path}: {expected!r} != {actual!r}']
+
+def backends(args):
+    """Time the pandas and DuckDB query backends on the same frames and check their payloads match"""
+    import app as dashboard
+
+    if not dashboard.duckdb_backend.DUCKDB_AVAILABLE:
+        print("[-] duckdb is not installed (pip install duckdb)")
+        sys.exit(1)
+
+    workdir = tempfile.mkdtemp(prefix='dashboard-backends-')
+    dashboard.create_app({
+        'DATABASE': os.path.join(workdir, 'backends.db'),
+        'UPLOAD_FOLDER': os.path.join(workdir, 'uploads'),
+        'SNAPSHOT_FOLDER': os.path.join(workdir, 'snapshots'),
+        'FRAME_STORE': False
+    })
+    app = dashboard.app
+    mismatches = 0
+
+    for n_rows in [int(s) for s in args.sizes.split(',')]:
+        print(f"\n[*] {n_rows:,} hired / {max(n_rows // 2, 1):,} pipeline rows")
+        hired_raw, final_raw = generate_sheets(n_rows, max(n_rows // 2, 1), end='2025-01-01')
+        with dashboard.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('INSERT INTO uploads (filename, file_hash, has_hired_sheet, has_final_sheet) VALUES (?, ?, 1, 1)',
+                           (f'backends_{n_rows}.xlsx', f'backends-{n_rows}-{time.time()}'))
+            upload_id = cursor.lastrowid
+            conn.commit()
+        dashboard.save_to_database(dashboard.prepare_df(hired_raw, 'hired')[0], 'hired', upload_id)
+        dashboard.save_to_database(dashboard.prepare_df(final_raw, 'final')[0], 'final', upload_id)
+
+        print(f"    {'query':<44} {'pandas ms':>10} {'duckdb ms':>10} {'speedup':>8}")
+        for view in ('hired', 'pipeline'):
+            options = dashboard.build_filter_options(view, upload_id)
+            queries = {
+                'all rows': {},
+                '3 partners': {'ta_partner': options['ta_partner'][:3]},
+                'country + date range': {'country': options['country'][:1],
+                                         'start_date': '2023-06-01', 'end_date': '2024-12-01'},
+                'no match': {'project': ['no such project']},
+                'as of 2024-06-01': {'as_of': '2024-06-01'}
+            }
+            for label, filters in queries.items():
+                timings = {}
+                payloads = {}
+                for backend in ('pandas', 'duckdb'):
+                    app.config['QUERY_BACKEND'] = backend
+                    payload, stats = measure(lambda: dashboard.build_dashboard_payload(view, upload_id, filters), args.repeat)
+                    timings[backend] = stats['seconds_median']
+                    payloads[backend] = json.loads(app.json.dumps(payload))
+
+                problems = payload_mismatches(payloads['pandas'], payloads['duckdb'])
+                mismatches += len(problems)
+                print(f"    {f'{view}: {label}':<44} {timings['pandas'] * 1000:>10.1f} "
+                      f"{timings['duckdb'] * 1000:>10.1f} {timings['pandas'] / timings['duckdb']:>7.1f}x"
+                      f"{'  MISMATCH' if problems else ''}")
+                for problem in problems[:5]:
+                    print(f"        {problem}")
+
+    if mismatches:
+        print(f"\n[-] {mismatches} payload difference(s) between backends")
+        sys.exit(1)
+    print("\n[+] Payloads match")
+
+def with_text_cells(sheet, rng):
+    """Copy of a raw sheet where some numbers and dates arrive as text, as hand-edited workbooks do"""
+    sheet = sheet.copy()
+    rows = rng.random(len(sheet)) < 0.05
+    for col in ('Max budgeted salary', 'Number of CVs shared'):
+        sheet[col] = sheet[col].astype(object)
+        sheet.loc[rows, col] = sheet.loc[rows, col].map(lambda value: f'{value}' if rng.random() < 0.5 else 'n/a')
+    col = 'Position Created Date'
+    sheet[col] = sheet[col].astype(object)
+    sheet.loc[rows, col] = sheet.loc[rows, col].map(lambda value: value.strftime('%Y-%m-%d') if not pd.isna(value) else value)
+    return sheet
+
+def ingest(args):
+    """Time prepare_df with the pandas and Polars engines and check the frames are identical"""
+    import app as dashboard
+
+    if not dashboard.polars_transform.POLARS_AVAILABLE:
+        print("[-] polars is not installed (pip install polars)")
+        sys.exit(1)
+
+    app = dashboard.app
+    rng = np.random.default_rng(7)
+    mismatches = 0
+
+    for n_rows in [int(s) for s in args.sizes.split(',')]:
+        print(f"\n[*] {n_rows:,} hired / {max(n_rows // 2, 1):,} pipeline rows")
+        hired_raw, final_raw = generate_sheets(n_rows, max(n_rows // 2, 1), end='2025-01-01', missing_rate=0.02)
+        sheets = {
+            'hired': hired_raw,
+            'final': final_raw,
+            'hired, text cells': with_text_cells(hired_raw, rng),
+            'final, text cells': with_text_cells(final_raw, rng)
+        }
+
+        print(f"    {'sheet':<24} {'pandas ms':>10} {'polars ms':>10} {'speedup':>8}")
+        for label, sheet in sheets.items():
+            sheet_type = label.split(',')[0]
+            timings = {}
+            frames = {}
+            for engine in ('pandas', 'polars'):
+                app.config['INGEST_ENGINE'] = engine
+                (frames[engine], _), stats = measure(lambda: dashboard.prepare_df(sheet, sheet_type), args.repeat)
+                timings[engine] = stats['seconds_median']
+
+            try:
+                pd.testing.assert_frame_equal(frames['pandas'], frames['polars'], check_exact=True)
+                problem = None
+            except AssertionError as e:
+                problem = str(e).strip().splitlines()
+                mismatches += 1
+            print(f"    {label:<24} {timings['pandas'] * 1000:>10.1f} {timings['polars'] * 1000:>10.1f} "
+                  f"{timings['pandas'] / timings['polars']:>7.1f}x{'  MISMATCH' if problem else ''}")
+            for line in (problem or [])[:6]:
+                print(f"        {line}")
+
+    app.config['INGEST_ENGINE'] = 'pandas'
+    if mismatches:
+        print(f"\n[-] {mismatches} sheet(s) differ between engines")
+        sys.exit(1)
+    print("\n[+] Prepared frames are identical")
+
+def run(args):
+    """Run the benchmark suite and write results as JSON"""
+    sizes = [int(s) for s in args.sizes.split(',')]
+    workdir = tempfile.mkdtemp(prefix='dashboard-bench-')
+
+    import app as dashboard
+
+    # Isolated database, no background work competing with the measurements
+    dashboard.create_app({
+        'DATABASE': os.path.join(workdir, 'benchmark.db'),
+        'UPLOAD_FOLDER': os.path.join(workdir, 'uploads'),
+        'MAX_CONTENT_LENGTH': None,
+        'CACHE_WARMUP': False,
+        'AUTO_TRAIN_MODELS': False,
+        'FRAME_STORE': False,
+        'SNAPSHOT_FOLDER': os.path.join(workdir, 'snapshots')
+    })
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'repeat': args.repeat
+        },
+        'results': {}
+    }
+
+    for n_rows in sizes:
+        print(f"\n[*] Benchmarking {n_rows:,} rows")
+        results['results'][str(n_rows)] = benchmark_size(dashboard, n_rows, args.repeat, print)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n[+] Results written to {args.output}")
+
+def startup(args):
+    """Measure cold worker start: import, create_app, first page and first data request"""
+    workdir = tempfile.mkdtemp(prefix='dashboard-startup-')
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    runs = []
+
+    print(f"[*] Starting {args.repeat} fresh interpreters...")
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', STARTUP_PROBE, workdir], cwd=repo_dir,
+                                capture_output=True, text=True, check=True).stdout
+        stats = json.loads(output.strip().splitlines()[-1])
+        stats['process'] = time.perf_counter() - started
+        runs.append(stats)
+
+    stages = {}
+    for name in ('import', 'create_app', 'first_page', 'first_data_request', 'process'):
+        timings = [run[name] for run in runs]
+        stages[name] = {
+            'seconds_min': min(timings),
+            'seconds_median': statistics.median(timings),
+            'peak_mb': max(run['rss_mb'] for run in runs) if name == 'process' else 0
+        }
+        print(f"    {name:<36} {stages[name]['seconds_median'] * 1000:>10.1f} ms")
+    print(f"[+] Peak RSS: {stages['process']['peak_mb']:.1f} MB")
+
+    if args.output:
+        results = {
+            'meta': {
+                'timestamp': datetime.now().isoformat(),
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'repeat': args.repeat
+            },
+            'results': {'startup': stages}
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"[+] Results written to {args.output}")
+
+def compare(args):
+    """Compare a results file against a baseline; exit non-zero on regressions"""
+    with open(args.results, encoding='utf-8') as f:
+        current = json.load(f)['results']
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+
+    regressions = []
+    print(f"{'size':>9}  {'stage':<36} {'baseline ms':>12} {'current ms':>12} {'time':>8} {'memory':>8}")
+
+    for size, stages in current.items():
+        for name, stats in stages.items():
+            base = baseline.get(size, {}).get(name)
+            if base is None:
+                continue
+
+            time_ratio = stats['seconds_median'] / base['seconds_median'] - 1 if base['seconds_median'] else 0
+            mem_ratio = stats['peak_mb'] / base['peak_mb'] - 1 if base['peak_mb'] else 0
+
+            slower = (time_ratio > args.threshold and
+                      stats['seconds_median'] - base['seconds_median'] > MIN_TIME_DELTA)
+            larger = (mem_ratio > args.threshold and
+                      stats['peak_mb'] - base['peak_mb'] > MIN_MEMORY_DELTA)
+            flag = ' REGRESSION' if slower or larger else ''
+            if flag:
+                regressions.append((size, name))
+
+            print(f"{size:>9}  {name:<36} {base['seconds_median'] * 1000:>12.1f} "
+                  f"{stats['seconds_median'] * 1000:>12.1f} {time_ratio:>+8.0%} {mem_ratio:>+8.0%}{flag}")
+
+    if regressions:
+        print(f"\n[-] {len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1)
+    print("\n[+] No regressions")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the dashboard ingest and query hot paths')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run the benchmark suite')
+    run_parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                            help='Comma-separated hired row counts (pipeline gets half)')
+    run_parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                            help='Timed repetitions per stage')
+    run_parser.add_argument('--output', default='benchmark_results.json')
+    run_parser.set_defaults(func=run)
+
+    startup_parser = subparsers.add_parser('startup', help='Measure worker cold-start time')
+    startup_parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters to start')
+    startup_parser.add_argument('--output', default=None)
+    startup_parser.set_defaults(func=startup)
+
+    backends_parser = subparsers.add_parser('backends', help='Compare the pandas and DuckDB query backends')
+    backends_parser.add_argument('--sizes', default='100000', help='Comma-separated hired row counts')
+    backends_parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    backends_parser.set_defaults(func=backends)
+
+    ingest_parser = subparsers.add_parser('ingest', help='Compare the pandas and Polars prepare_df engines')
+    ingest_parser.add_argument('--sizes', default='100000', help='Comma-separated hired row counts')
+    ingest_parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    ingest_parser.set_defaults(func=ingest)
+
+    compare_parser = subparsers.add_parser('compare', help='Flag regressions against a baseline')
+    compare_parser.add_argument('results')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help='Allowed relative slowdown / memory growth (0.2 = 20%%)')
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == '__main__':
+    main()
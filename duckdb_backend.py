@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+DuckDB query backend for the dashboard aggregations
+Runs the global filters and the heavy aggregation work (KPIs, funnel,
+group-bys and value counts) as SQL in DuckDB's vectorized engine. Each
+upload's prepared frame is copied once into a native in-memory DuckDB table
+(the most recent few are kept per process), so requests scan DuckDB's own
+columnar storage instead of converting Python strings on every query.
+
+The aggregated results are small, so ranking, rounding and the final
+payload shape reuse the same pandas calls as the pandas backend; payloads
+match it up to floating point summation order.
+"""
+
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# DuckDB is optional - the pandas backend is used without it
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+HIRED_COLUMNS = ['time_to_fill', 'cv_to_interview_rate', 'budget_variance_pct', 'job_title', 'ta_partner',
+                 'job_ref_id', 'number_of_cvs_shared', 'number_of_candidates_interviewed',
+                 'number_of_candidates_offered', 'number_of_candidates_accepted_offer']
+PIPELINE_COLUMNS = ['position_created_date', 'job_state', 'project_name']
+
+_database = None
+_tables = OrderedDict()  # (sheet_type, upload_id) -> (table name, columns), least recently used first
+_tables_lock = threading.Lock()
+_local = threading.local()
+
+def get_cursor():
+    """Connection to the shared in-memory database for the current thread"""
+    global _database
+    cursor = getattr(_local, 'cursor', None)
+    if cursor is None:
+        with _tables_lock:
+            if _database is None:
+                _database = duckdb.connect()
+            cursor = _local.cursor = _database.cursor()
+    return cursor
+
+def get_table(key, load, max_tables):
+    """(table name, columns) of the DuckDB table for a key, copying load()'s frame in on first use"""
+    cursor = get_cursor()
+
+    with _tables_lock:
+        if key in _tables:
+            _tables.move_to_end(key)
+            return _tables[key]
+
+        df = load()
+        if df is None or df.empty:
+            return None, []
+
+        table = f'{key[0]}_{int(key[1])}'
+        cursor.register('frame', df)
+        try:
+            cursor.execute(f'CREATE OR REPLACE TABLE {table} AS SELECT * FROM frame')
+        finally:
+            cursor.unregister('frame')
+        _tables[key] = (table, list(df.columns))
+
+        while len(_tables) > max_tables:
+            _, (evicted, _) = _tables.popitem(last=False)
+            cursor.execute(f'DROP TABLE IF EXISTS {evicted}')
+        return _tables[key]
+
+def drop_upload(upload_id):
+    """Forget the tables of an upload whose rows were rewritten"""
+    if _database is None:
+        return
+    cursor = get_cursor()
+    with _tables_lock:
+        for key in [key for key in _tables if key[1] == int(upload_id)]:
+            cursor.execute(f'DROP TABLE IF EXISTS {_tables.pop(key)[0]}')
+
+def build_where(filters, filter_mapping, columns):
+    """SQL WHERE clause and parameters equivalent to apply_filters()"""
+    clauses = []
+    params = []
+
+    for param, col_name in filter_mapping.items():
+        values = filters.get(param)
+        if values and col_name in columns:
+            clauses.append(f'"{col_name}" IN ({", ".join("?" * len(values))})')
+            params.extend(values)
+
+    if 'start_date' in filters and 'position_created_date' in columns:
+        clauses.append('position_created_date BETWEEN CAST(? AS TIMESTAMP) AND CAST(? AS TIMESTAMP)')
+        params.extend([filters['start_date'], filters['end_date']])
+
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+def nan_if_null(value):
+    """DuckDB aggregates over no values are NULL where pandas gives NaN"""
+    return float('nan') if value is None else value
+
+def value_counts(cursor, relation, column, params):
+    """Equivalent of Series.value_counts(): counts in first-seen order, then sorted"""
+    counts = cursor.execute(f'''
+        SELECT "{column}" AS value, COUNT(*) AS n FROM {relation}
+        WHERE "{column}" IS NOT NULL
+        GROUP BY 1 ORDER BY MIN(rowid)
+    ''', params).fetchdf()
+    return pd.Series(counts['n'].to_numpy(), index=pd.Index(counts['value'], name=column),
+                     name='count').sort_values(ascending=False)
+
+def group_mean(cursor, relation, key, column, params):
+    """Equivalent of df.groupby(key)[column].mean()"""
+    groups = cursor.execute(f'''
+        SELECT "{key}" AS key, AVG("{column}") AS value FROM {relation}
+        WHERE "{key}" IS NOT NULL GROUP BY 1 ORDER BY 1
+    ''', params).fetchdf()
+    return pd.Series(groups['value'].to_numpy(dtype=float), index=pd.Index(groups['key'], name=key), name=column)
+
+def hired_dashboard_data(key, load, filters, filter_mapping, max_tables):
+    """Hired dashboard payload without commentary; None if there is no data or it lacks the expected columns"""
+    table, columns = get_table(key, load, max_tables)
+    if table is None or not all(col in columns for col in HIRED_COLUMNS):
+        return None
+
+    cursor = get_cursor()
+    where, params = build_where(filters, filter_mapping, columns)
+    relation = f'(SELECT rowid, * FROM {table}{where})'
+
+    totals = cursor.execute(f'''
+        SELECT COUNT(*), AVG(time_to_fill), AVG(cv_to_interview_rate), AVG(budget_variance_pct),
+               SUM(number_of_cvs_shared), SUM(number_of_candidates_interviewed),
+               SUM(number_of_candidates_offered), SUM(number_of_candidates_accepted_offer)
+        FROM {relation}
+    ''', params).fetchone()
+
+    data = {
+        'kpis': {
+            'total_filled': int(totals[0]),
+            'avg_ttf': np.float64(nan_if_null(totals[1])),
+            'overall_conversion': np.float64(nan_if_null(totals[2])),
+            'avg_budget_variance': np.float64(nan_if_null(totals[3]))
+        },
+        'funnel': {
+            'stages': ['CVs Shared', 'Interviews', 'Offers', 'Accepted'],
+            'values': [int(value or 0) for value in totals[4:8]]
+        }
+    }
+
+    ttf_by_role = group_mean(cursor, relation, 'job_title', 'time_to_fill', params)
+    ttf_by_role = ttf_by_role.sort_values(ascending=True).head(10)
+    data['ttf_by_role'] = {
+        'roles': ttf_by_role.index.tolist(),
+        'values': ttf_by_role.values.tolist()
+    }
+
+    variance = cursor.execute(f'''
+        SELECT budget_variance_pct FROM {relation} WHERE budget_variance_pct IS NOT NULL ORDER BY rowid
+    ''', params).fetchnumpy()['budget_variance_pct']
+    if len(variance) > 0:
+        data['financial'] = {
+            'variance_data': np.asarray(variance, dtype=float).tolist()
+        }
+
+    leaderboard = cursor.execute(f'''
+        SELECT ta_partner, AVG(time_to_fill) AS avg_ttf, AVG(cv_to_interview_rate) AS conversion_rate,
+               COUNT(job_ref_id) AS total_hires
+        FROM {relation} WHERE ta_partner IS NOT NULL GROUP BY 1 ORDER BY 1
+    ''', params).fetchdf()
+    leaderboard = leaderboard.astype({'avg_ttf': float, 'conversion_rate': float, 'total_hires': 'int64'})
+    leaderboard = leaderboard.round(1).sort_values('avg_ttf').head(10)
+    data['leaderboard'] = leaderboard.to_dict('records')
+
+    return data
+
+def pipeline_dashboard_data(key, load, filters, filter_mapping, max_tables, as_of):
+    """Pipeline dashboard payload without commentary; None if there is no data or it lacks the expected columns"""
+    table, columns = get_table(key, load, max_tables)
+    if table is None or not all(col in columns for col in PIPELINE_COLUMNS):
+        return None
+
+    cursor = get_cursor()
+    where, params = build_where(filters, filter_mapping, columns)
+    # Ages are counted to the as-of date here, never read from a stored column;
+    # positions created after it are left out, as in add_position_age()
+    stored = ' EXCLUDE (position_age)' if 'position_age' in columns else ''
+    as_of_clause = ' AND ' if where else ' WHERE '
+    relation = f'''(SELECT rowid, *{stored},
+                           date_diff('day', CAST(position_created_date AS DATE), CAST(? AS DATE)) AS position_age
+                    FROM {table}{where}{as_of_clause}(position_created_date IS NULL
+                          OR CAST(position_created_date AS DATE) <= CAST(? AS DATE)))'''
+    params = [as_of.isoformat()] + params + [as_of.isoformat()]
+
+    total_open, avg_age, over_60 = cursor.execute(f'''
+        SELECT COUNT(*), AVG(position_age), COUNT(*) FILTER (WHERE position_age > 60) FROM {relation}
+    ''', params).fetchone()
+
+    stage_counts = value_counts(cursor, relation, 'job_state', params)
+    project_counts = value_counts(cursor, relation, 'project_name', params).head(10)
+
+    return {
+        'kpis': {
+            'total_open': int(total_open),
+            'avg_age': np.float64(nan_if_null(avg_age)),
+            'positions_over_60': int(over_60),
+            'bottleneck_stage': stage_counts.index[0] if total_open > 0 else 'None'
+        },
+        'stage_distribution': {
+            'stages': stage_counts.index.tolist(),
+            'values': stage_counts.values.tolist()
+        },
+        'resource_distribution': {
+            'stages': project_counts.index.tolist(),
+            'values': project_counts.values.tolist()
+        }
+    }
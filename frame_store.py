@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Cross-process shared-memory store for prepared upload frames
+After ingest each upload's prepared columns are written once into a
+multiprocessing.shared_memory segment and every worker process attaches to the
+same pages instead of rebuilding the DataFrame from SQLite. Numeric and date
+columns are used zero-copy; text columns are stored dictionary-encoded (see
+columnar.py) and decoded once per process against a shared set of strings.
+
+A registry directory records which processes hold each segment, so an evicted
+or replaced frame is unlinked as soon as its last holder lets go. Only
+serve.py's workers share frames; its master clears what a server that was
+killed left behind before it preloads.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import pickle
+import struct
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+import pandas as pd
+
+import columnar
+
+ALIGNMENT = 64
+HEADER_FORMAT = '<Q'  # length of the pickled column manifest
+SWEEP_INTERVAL = 5.0  # seconds between checks of this process's attachments
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store(folder, database):
+    """Return the process-wide store for a database, creating it on first use"""
+    key = (os.path.abspath(folder), os.path.abspath(database))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = FrameStore(folder, database)
+        return store
+
+def pid_alive(pid):
+    """Whether a process still exists"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def untrack(shm):
+    """Stop the resource tracker from unlinking a segment when this process exits"""
+    try:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+
+def align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+class FrameStore:
+    """Shared-memory frames keyed by (sheet_type, upload_id) with cross-process refcounts"""
+
+    def __init__(self, folder, database):
+        self.folder = folder
+        # Segment names are global to the host; scope them to this database
+        self.namespace = hashlib.md5(os.path.abspath(database).encode()).hexdigest()[:8]
+        self._local = {}  # key -> (SharedMemory, DataFrame)
+        self._pending_close = []
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        os.makedirs(os.path.join(folder, 'retired'), exist_ok=True)
+
+    # Registry: one JSON file per published key plus retired/<segment>.json for
+    # replaced or evicted segments that live processes still hold. Updated under
+    # an exclusive file lock.
+
+    def _entry_path(self, key):
+        sheet_type, upload_id = key
+        return os.path.join(self.folder, f'{sheet_type}_{upload_id}.json')
+
+    def _retired_path(self, segment):
+        return os.path.join(self.folder, 'retired', f'{segment}.json')
+
+    def _registry_lock(self):
+        handle = open(os.path.join(self.folder, '.lock'), 'a+')
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        return handle
+
+    def _read(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path, entry):
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(f'{path}.tmp', path)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _read_entry(self, key):
+        return self._read(self._entry_path(key))
+
+    def _unlink_segment(self, segment):
+        try:
+            # Attaching registers the name with the resource tracker and unlink() unregisters it
+            shm = shared_memory.SharedMemory(name=segment)
+            shm.close()
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _retire(self, key, entry):
+        """Stop serving an entry; unlink now or once its live holders let go (lock held)"""
+        self._remove(self._entry_path(key))
+        entry['refs'] = [pid for pid in entry['refs'] if pid_alive(pid)]
+        if entry['refs']:
+            entry['key'] = list(key)
+            self._write(self._retired_path(entry['segment']), entry)
+        else:
+            self._unlink_segment(entry['segment'])
+
+    # Writing
+
+    def publish(self, key, df):
+        """Write a frame into a new segment, replacing any stale one under the same key"""
+        if df is None or df.empty:
+            return False
+
+        manifest, arrays = columnar.encode_frame(df)
+
+        # Column offsets are relative to the aligned start of the data area
+        offset = 0
+        for column, values in zip(manifest['columns'], arrays):
+            column['dtype'] = values.dtype.str
+            column['offset'] = offset
+            offset = align(offset + values.nbytes)
+        header = pickle.dumps(manifest, protocol=pickle.HIGHEST_PROTOCOL)
+        data_start = align(struct.calcsize(HEADER_FORMAT) + len(header))
+        size = max(data_start + offset, 1)
+
+        lock = self._registry_lock()
+        try:
+            # An upload id seen again (e.g. after the database was recreated) is new data
+            existing = self._read_entry(key)
+            if existing is not None:
+                self._retire(key, existing)
+
+            segment = f'dash_{self.namespace}_{key[0]}_{key[1]}_{os.urandom(4).hex()}'
+            shm = shared_memory.SharedMemory(name=segment, create=True, size=size)
+            untrack(shm)
+            struct.pack_into(HEADER_FORMAT, shm.buf, 0, len(header))
+            shm.buf[struct.calcsize(HEADER_FORMAT):struct.calcsize(HEADER_FORMAT) + len(header)] = header
+            for column, values in zip(manifest['columns'], arrays):
+                target = np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf,
+                                    offset=data_start + column['offset'])
+                target[...] = values
+                del target
+            shm.close()
+
+            self._write(self._entry_path(key), {
+                'segment': segment,
+                'size': size,
+                'rows': len(df),
+                'created_at': time.time(),
+                'refs': []
+            })
+            return True
+        finally:
+            lock.close()
+
+    # Reading
+
+    def attach(self, key):
+        """Return the shared frame for key, or None if it is not (or no longer) published"""
+        self._maybe_sweep()
+
+        entry = self._read_entry(key)
+        with self._lock:
+            local = self._local.get(key)
+        if local is not None:
+            if entry is not None and entry['segment'] == local[0].name:
+                return local[1]
+            self.release(key)
+        if entry is None:
+            return None
+
+        lock = self._registry_lock()
+        try:
+            entry = self._read_entry(key)
+            if entry is None:
+                return None
+            try:
+                shm = shared_memory.SharedMemory(name=entry['segment'])
+            except FileNotFoundError:
+                return None
+            untrack(shm)
+            entry['refs'] = sorted(set(entry['refs']) | {os.getpid()})
+            self._write(self._entry_path(key), entry)
+        finally:
+            lock.close()
+
+        df = self._decode(shm)
+        with self._lock:
+            self._local[key] = (shm, df)
+        return df
+
+    def _decode(self, shm):
+        (header_length,) = struct.unpack_from(HEADER_FORMAT, shm.buf, 0)
+        start = struct.calcsize(HEADER_FORMAT)
+        manifest = pickle.loads(bytes(shm.buf[start:start + header_length]))
+        data_start = align(start + header_length)
+        rows = manifest['rows']
+
+        data = {}
+        for column in manifest['columns']:
+            values = np.ndarray((rows,), dtype=np.dtype(column['dtype']), buffer=shm.buf,
+                                offset=data_start + column['offset'])
+            values.flags.writeable = False
+            data[column['name']] = columnar.decode_column(column, values)
+        return pd.DataFrame(data, index=pd.RangeIndex(rows), copy=False)
+
+    # Releasing and eviction
+
+    def release(self, key):
+        """Drop this process's attachment; unlink a retired segment once nobody holds it"""
+        with self._lock:
+            local = self._local.pop(key, None)
+        if local is None:
+            return
+
+        shm, df = local
+        del df
+        self._close(shm)
+
+        lock = self._registry_lock()
+        try:
+            entry = self._read_entry(key)
+            if entry is not None and entry['segment'] == shm.name:
+                entry['refs'] = [pid for pid in entry['refs'] if pid != os.getpid()]
+                self._write(self._entry_path(key), entry)
+                return
+
+            path = self._retired_path(shm.name)
+            entry = self._read(path)
+            if entry is None:
+                return
+            entry['refs'] = [pid for pid in entry['refs'] if pid != os.getpid() and pid_alive(pid)]
+            if entry['refs']:
+                self._write(path, entry)
+            else:
+                self._remove(path)
+                self._unlink_segment(shm.name)
+        finally:
+            lock.close()
+
+    def _close(self, shm):
+        """Close a mapping, retrying later while frames handed out still use it"""
+        with self._lock:
+            pending, self._pending_close = self._pending_close + [shm], []
+        for segment in pending:
+            try:
+                segment.close()
+            except BufferError:
+                with self._lock:
+                    self._pending_close.append(segment)
+
+    def evict(self, key):
+        """Stop serving a key; the segment is unlinked once no live process holds it"""
+        self.release(key)
+        lock = self._registry_lock()
+        try:
+            entry = self._read_entry(key)
+            if entry is None:
+                return False
+            self._retire(key, entry)
+            return True
+        finally:
+            lock.close()
+
+    def _maybe_sweep(self):
+        """Periodically let go of attachments retired by another process"""
+        now = time.monotonic()
+        if now - self._last_sweep < SWEEP_INTERVAL:
+            return
+        self._last_sweep = now
+
+        with self._lock:
+            attached = [(key, shm.name) for key, (shm, _) in self._local.items()]
+        for key, segment in attached:
+            entry = self._read_entry(key)
+            if entry is None or entry['segment'] != segment:
+                self.release(key)
+
+        # Retired segments only held by dead processes can go too
+        for segment, entry in self.retired():
+            if not any(pid_alive(pid) for pid in entry['refs']):
+                lock = self._registry_lock()
+                try:
+                    if self._read(self._retired_path(segment)) is not None:
+                        self._remove(self._retired_path(segment))
+                        self._unlink_segment(segment)
+                finally:
+                    lock.close()
+
+    def clear(self):
+        """Evict every published frame, e.g. ones left behind by a server that was
+        killed; segments a live process still holds go once it lets go"""
+        for key, _ in self.entries():
+            self.evict(key)
+        self._last_sweep = 0.0
+        self._maybe_sweep()
+
+    def entries(self):
+        """[(key, entry)] for every published frame"""
+        results = []
+        for filename in sorted(os.listdir(self.folder)):
+            if not filename.endswith('.json'):
+                continue
+            sheet_type, _, upload_id = filename[:-len('.json')].rpartition('_')
+            if not upload_id.isdigit():
+                continue
+            key = (sheet_type, int(upload_id))
+            entry = self._read_entry(key)
+            if entry is not None:
+                results.append((key, entry))
+        return results
+
+    def retired(self):
+        """[(segment, entry)] for segments waiting on their last holders"""
+        results = []
+        for filename in sorted(os.listdir(os.path.join(self.folder, 'retired'))):
+            if filename.endswith('.json'):
+                entry = self._read(os.path.join(self.folder, 'retired', filename))
+                if entry is not None:
+                    results.append((filename[:-len('.json')], entry))
+        return results
+
+    def stats(self):
+        """Summary of published frames for status endpoints"""
+        entries = self.entries()
+        retired = self.retired()
+        with self._lock:
+            attached = sorted(self._local)
+        return {
+            'frames': [{
+                'sheet_type': key[0],
+                'upload_id': key[1],
+                'rows': entry['rows'],
+                'size_mb': entry['size'] / 1024 / 1024,
+                'holders': len([pid for pid in entry['refs'] if pid_alive(pid)])
+            } for key, entry in entries],
+            'retired': [{
+                'segment': segment,
+                'sheet_type': entry['key'][0],
+                'upload_id': entry['key'][1],
+                'size_mb': entry['size'] / 1024 / 1024,
+                'holders': len([pid for pid in entry['refs'] if pid_alive(pid)])
+            } for segment, entry in retired],
+            'total_mb': sum(entry['size'] for _, entry in entries + retired) / 1024 / 1024,
+            'attached_here': [list(key) for key in attached]
+        }
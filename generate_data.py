@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Synthetic recruitment workbook generator for the Recruitment Analytics Dashboard
+
+Emits Hired/Final sheets with the exact column headers prepare_df() expects,
+generated column-at-a-time with numpy so multi-million-row fixtures take seconds.
+
+Usage:
+    python generate_data.py --hired 1000 --final 500 --format xlsx --output sample_recruitment_data.xlsx
+    python generate_data.py --hired 5000000 --final 1000000 --format parquet --output fixtures/load
+    python generate_data.py --hired 100000 --partners 40 --partner-skew 1.5 --format csv --output fixtures/skewed
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Dimension -> (default cardinality, label prefix). Values are drawn with Zipf-like skew.
+DIMENSIONS = {
+    'partner': (20, 'TA Partner'),
+    'sourcing': (12, 'Sourcing Agency'),
+    'manager': (150, 'Hiring Manager'),
+    'country': (15, 'Country'),
+    'project': (60, 'Project'),
+    'title': (80, 'Job Title')
+}
+
+# Realistic names for the first few countries; the rest are numbered
+COUNTRY_NAMES = ['United States', 'United Kingdom', 'India', 'Germany', 'Canada', 'Netherlands',
+                 'France', 'Poland', 'Singapore', 'Australia', 'Spain', 'Ireland', 'Brazil',
+                 'Mexico', 'Japan']
+
+BUSINESS_LINES = ['Consulting', 'Engineering', 'Operations', 'Technology']
+SERVICE_LINES = ['Advisory', 'Delivery', 'Support', 'Design', 'Analytics']
+PIPELINE_STATES = ['Sourcing', 'Screening', 'Interview', 'Offer', 'On Hold']
+PIPELINE_STATE_WEIGHTS = [0.35, 0.25, 0.22, 0.10, 0.08]
+
+DEFAULT_SKEW = 1.1
+XLSX_MAX_ROWS = 1048575  # Excel sheet limit minus the header row
+
+def zipf_weights(k, skew):
+    """Probabilities for k categories with a Zipf-like skew (0 = uniform)"""
+    weights = 1.0 / np.arange(1, k + 1) ** skew
+    return weights / weights.sum()
+
+def category_labels(dimension, k):
+    """Label values for a dimension"""
+    prefix = DIMENSIONS[dimension][1]
+    if dimension == 'country':
+        return [COUNTRY_NAMES[i] if i < len(COUNTRY_NAMES) else f'{prefix} {i + 1}' for i in range(k)]
+    return [f'{prefix} {i + 1}' for i in range(k)]
+
+def draw_categorical(rng, dimension, n, cardinality, skew):
+    """Draw n values of a dimension as a pandas Categorical (no per-row Python objects)"""
+    k = cardinality[dimension]
+    codes = rng.choice(k, size=n, p=zipf_weights(k, skew[dimension]))
+    return pd.Categorical.from_codes(codes, categories=category_labels(dimension, k))
+
+def business_days(created):
+    """Move weekend dates to the following Monday"""
+    weekday = created.dayofweek
+    shift = np.where(weekday == 5, 2, np.where(weekday == 6, 1, 0))
+    return created + pd.to_timedelta(shift, unit='D')
+
+def generate_common(rng, n, cardinality, skew, start, end, title_budgets):
+    """Columns shared by the Hired and Final sheets"""
+    span_days = max((end - start).days, 1)
+    created = business_days(pd.DatetimeIndex(start + pd.to_timedelta(rng.integers(0, span_days, n), unit='D')))
+
+    titles = draw_categorical(rng, 'title', n, cardinality, skew)
+
+    # Budgets follow the title's pay band with some per-position spread, rounded to 500
+    budget = title_budgets[titles.codes] * rng.lognormal(0.0, 0.12, n)
+    budget = np.round(budget / 500) * 500
+
+    cvs = rng.poisson(25, n)
+    shortlisted = rng.binomial(cvs, 0.4)
+    interviewed = rng.binomial(shortlisted, 0.6)
+    offered = rng.binomial(interviewed, 0.3)
+
+    return {
+        'Job Ref ID': pd.Series(np.arange(1, n + 1)).astype(str).str.zfill(8).radd('JR').values,
+        'Position Created Date': created,
+        'Job Title': titles,
+        'Job Location (country)': draw_categorical(rng, 'country', n, cardinality, skew),
+        'Project Name': draw_categorical(rng, 'project', n, cardinality, skew),
+        'Max budgeted salary': budget,
+        'Sourcing Partner': draw_categorical(rng, 'sourcing', n, cardinality, skew),
+        'Hiring Manager': draw_categorical(rng, 'manager', n, cardinality, skew),
+        'Number of CVs shared': cvs,
+        'Number of CVs shortlisted': shortlisted,
+        'Number of candidates interviewed': interviewed,
+        'Number of candidates offered': offered,
+        'Business Line': pd.Categorical.from_codes(rng.integers(0, len(BUSINESS_LINES), n), categories=BUSINESS_LINES),
+        'Service Line': pd.Categorical.from_codes(rng.integers(0, len(SERVICE_LINES), n), categories=SERVICE_LINES)
+    }
+
+def blank_out(rng, df, columns, rate):
+    """Blank a fraction of cells so the Unknown fill in prepare_df gets exercised"""
+    if rate <= 0:
+        return df
+    for col in columns:
+        mask = rng.random(len(df)) < rate
+        df[col] = df[col].astype(object).where(~mask, None)
+    return df
+
+def generate_sheets(n_hired, n_final, seed=42, cardinality=None, skew=None,
+                    start='2022-01-01', end=None, missing_rate=0.0, categorical=False):
+    """Generate (hired_df, final_df) with the real workbook headers.
+
+    cardinality / skew map a dimension name (see DIMENSIONS) to the number of
+    distinct values and the Zipf exponent; missing entries use the defaults.
+    Text columns come back as plain object columns like read_excel() returns,
+    unless categorical=True (cheaper when the frames are only written out).
+    """
+    rng = np.random.default_rng(seed)
+    cardinality = {dim: (cardinality or {}).get(dim, default) for dim, (default, _) in DIMENSIONS.items()}
+    skew = {dim: (skew or {}).get(dim, DEFAULT_SKEW) for dim in DIMENSIONS}
+    start = pd.Timestamp(start)
+    end = pd.Timestamp(end) if end else pd.Timestamp.today().normalize()
+
+    # Pay band per title, centred around 85k
+    title_budgets = rng.lognormal(np.log(85000), 0.35, cardinality['title'])
+
+    # Hired: created early enough that the fill date is in the past
+    hired = generate_common(rng, n_hired, cardinality, skew, start, end - pd.Timedelta(days=120), title_budgets)
+    ttf = np.rint(7 + rng.gamma(2.5, 18, n_hired)).astype(int)
+    hired['TAPartner'] = draw_categorical(rng, 'partner', n_hired, cardinality, skew)
+    hired['Filled Date'] = hired['Position Created Date'] + pd.to_timedelta(ttf, unit='D')
+    hired['Number of candidates offered'] = np.maximum(hired['Number of candidates offered'], 1)
+    hired['Number of candidates interviewed'] = np.maximum(hired['Number of candidates interviewed'],
+                                                           hired['Number of candidates offered'])
+    hired['Number of candidates accepted offer'] = np.ones(n_hired, dtype=int)
+    hired['Accepted salary'] = np.round(hired['Max budgeted salary'] * rng.normal(0.98, 0.07, n_hired) / 100) * 100
+    hired['Accepted salary Currency'] = pd.Categorical.from_codes(np.zeros(n_hired, dtype=int), categories=['USD'])
+    hired['Job State'] = pd.Categorical.from_codes(np.zeros(n_hired, dtype=int), categories=['Filled'])
+
+    # Final: open positions, more of them recent
+    final = generate_common(rng, n_final, cardinality, skew, end - pd.Timedelta(days=180), end, title_budgets)
+    final['TA Partner'] = draw_categorical(rng, 'partner', n_final, cardinality, skew)
+    final['Number of candidates accepted offer'] = rng.binomial(final['Number of candidates offered'], 0.2)
+    final['Accepted salary'] = np.full(n_final, np.nan)
+    final['Job State'] = pd.Categorical.from_codes(
+        rng.choice(len(PIPELINE_STATES), size=n_final, p=PIPELINE_STATE_WEIGHTS), categories=PIPELINE_STATES)
+
+    hired_df = blank_out(rng, pd.DataFrame(hired), ['TAPartner', 'Hiring Manager', 'Project Name'], missing_rate)
+    final_df = blank_out(rng, pd.DataFrame(final), ['TA Partner', 'Hiring Manager', 'Project Name'], missing_rate)
+
+    if not categorical:
+        for df in (hired_df, final_df):
+            for col in df.select_dtypes('category').columns:
+                df[col] = df[col].astype(object)
+    return hired_df, final_df
+
+def write_sheets(hired_df, final_df, output, fmt):
+    """Write the sheets as one xlsx workbook, or <output>_hired / <output>_final csv/parquet files"""
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if fmt == 'xlsx':
+        if max(len(hired_df), len(final_df)) > XLSX_MAX_ROWS:
+            raise ValueError(f'xlsx sheets are limited to {XLSX_MAX_ROWS:,} rows; use csv or parquet')
+        path = output if output.endswith('.xlsx') else f'{output}.xlsx'
+        with pd.ExcelWriter(path) as writer:
+            hired_df.to_excel(writer, sheet_name='Hired', index=False)
+            final_df.to_excel(writer, sheet_name='Final', index=False)
+        return [path]
+
+    paths = []
+    for sheet, df in (('hired', hired_df), ('final', final_df)):
+        path = f'{output}_{sheet}.{fmt}'
+        if fmt == 'csv':
+            df.to_csv(path, index=False, date_format='%Y-%m-%d')
+        else:
+            df.to_parquet(path, index=False)
+        paths.append(path)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic Hired/Final recruitment data')
+    parser.add_argument('--hired', type=int, default=1000, help='Rows in the Hired sheet')
+    parser.add_argument('--final', type=int, default=500, help='Rows in the Final sheet')
+    parser.add_argument('--format', choices=['xlsx', 'csv', 'parquet'], default='xlsx')
+    parser.add_argument('--output', default='synthetic_recruitment_data',
+                        help='Output file (xlsx) or path prefix (csv/parquet)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--start', default='2022-01-01', help='Earliest position created date')
+    parser.add_argument('--end', default=None, help='Latest date (default: today)')
+    parser.add_argument('--skew', type=float, default=DEFAULT_SKEW, help='Default Zipf skew (0 = uniform)')
+    parser.add_argument('--missing-rate', type=float, default=0.0,
+                        help='Fraction of partner/manager/project cells left blank')
+    for dim, (default, _) in DIMENSIONS.items():
+        parser.add_argument(f'--{dim}s', type=int, default=default, help=f'Distinct {dim} values')
+        parser.add_argument(f'--{dim}-skew', type=float, default=None, help=f'Zipf skew for {dim}')
+    args = parser.parse_args()
+
+    cardinality = {dim: getattr(args, f'{dim}s') for dim in DIMENSIONS}
+    skew = {dim: getattr(args, f'{dim}_skew') if getattr(args, f'{dim}_skew') is not None else args.skew
+            for dim in DIMENSIONS}
+
+    print(f"[*] Generating {args.hired:,} hired and {args.final:,} pipeline rows...")
+    started = time.perf_counter()
+    hired_df, final_df = generate_sheets(args.hired, args.final, seed=args.seed, cardinality=cardinality,
+                                         skew=skew, start=args.start, end=args.end,
+                                         missing_rate=args.missing_rate, categorical=True)
+    print(f"[+] Generated in {time.perf_counter() - started:.2f}s")
+
+    started = time.perf_counter()
+    try:
+        paths = write_sheets(hired_df, final_df, args.output, args.format)
+    except (ValueError, ImportError) as e:
+        print(f"[-] {e}")
+        sys.exit(1)
+    print(f"[+] Wrote {', '.join(paths)} in {time.perf_counter() - started:.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Load-testing harness for the Recruitment Analytics Dashboard
+
+Simulates concurrent dashboard users against a running server and reports
+throughput and p50/p95/p99 latency per endpoint.
+
+Usage:
+    python app.py                                       # in another terminal
+    python loadtest.py --users 50 --duration 60 --seed-rows 100000
+    python loadtest.py --users 20 --mix filter_options=2,filtered_load=4,tab_switch=2,poll=6,upload=0.05
+"""
+
+import argparse
+import io
+import json
+import math
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import defaultdict
+from datetime import datetime
+
+import pandas as pd
+
+from generate_data import generate_sheets
+
+DEFAULT_URL = 'http://127.0.0.1:5000'
+
+# Relative weights of the actions a simulated user performs between think pauses
+DEFAULT_MIX = {
+    'filter_options': 2,
+    'filtered_load': 4,
+    'tab_switch': 2,
+    'poll': 6,
+    'upload': 0.05
+}
+
+VIEWS = ['hired', 'pipeline']
+FILTER_KEYS = ['hiring_manager', 'ta_partner', 'country', 'project']
+UPLOAD_POOL_SIZE = 5
+UPLOAD_POOL_ROWS = 500
+
+def parse_mix(text):
+    """Parse 'action=weight,...' into a weight dict"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f'Unknown action "{name}"; expected one of {", ".join(DEFAULT_MIX)}')
+        mix[name] = float(weight or 1)
+    return mix
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct * len(sorted_values) / 100) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+def encode_multipart(filename, content):
+    """Build a multipart/form-data body with a single 'file' field"""
+    boundary = uuid.uuid4().hex
+    body = (f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f'Content-Type: application/vnd.openxmlformats-officedocument.spreadsheetml.sheet\r\n\r\n').encode()
+    body += content + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+def make_workbook(n_rows, seed):
+    """Generate a synthetic workbook in memory"""
+    hired_df, final_df = generate_sheets(n_rows, max(n_rows // 2, 1), seed=seed)
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        hired_df.to_excel(writer, sheet_name='Hired', index=False)
+        final_df.to_excel(writer, sheet_name='Final', index=False)
+    return buffer.getvalue()
+
+class Recorder:
+    """Thread-safe latency/error collection per endpoint"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, seconds, ok):
+        with self.lock:
+            self.latencies[endpoint].append(seconds)
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def summary(self, elapsed):
+        endpoints = {}
+        with self.lock:
+            for endpoint, values in sorted(self.latencies.items()):
+                values = sorted(values)
+                endpoints[endpoint] = {
+                    'requests': len(values),
+                    'errors': self.errors[endpoint],
+                    'throughput_rps': len(values) / elapsed if elapsed else 0,
+                    'p50_ms': percentile(values, 50) * 1000,
+                    'p95_ms': percentile(values, 95) * 1000,
+                    'p99_ms': percentile(values, 99) * 1000,
+                    'max_ms': values[-1] * 1000
+                }
+        return endpoints
+
+class Client:
+    """Minimal HTTP client that times each request under an endpoint label"""
+
+    def __init__(self, base_url, recorder, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.recorder = recorder
+        self.timeout = timeout
+
+    def request(self, endpoint, path, params=None, data=None, content_type=None):
+        url = self.base_url + path
+        if params:
+            url += '?' + urllib.parse.urlencode(params)
+        req = urllib.request.Request(url, data=data, method='POST' if data is not None else 'GET')
+        if content_type:
+            req.add_header('Content-Type', content_type)
+
+        started = time.perf_counter()
+        ok = False
+        payload = None
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                body = response.read()
+                ok = 200 <= response.status < 300
+                if response.headers.get_content_type() == 'application/json':
+                    payload = json.loads(body)
+        except urllib.error.HTTPError as e:
+            e.read()
+        except (urllib.error.URLError, OSError, ValueError):
+            pass
+        self.recorder.record(endpoint, time.perf_counter() - started, ok)
+        return payload
+
+class SimulatedUser:
+    """One dashboard session: picks actions from the mix with think time in between"""
+
+    def __init__(self, client, upload_id, mix, think_time, upload_pool, rng):
+        self.client = client
+        self.upload_id = upload_id
+        self.actions = list(mix)
+        self.weights = [mix[a] for a in self.actions]
+        self.think_time = think_time
+        self.upload_pool = upload_pool
+        self.rng = rng
+        self.view = rng.choice(VIEWS)
+        self.filters = {}
+        self.options = {}
+
+    def params(self):
+        params = {'upload_id': self.upload_id} if self.upload_id else {}
+        params.update(self.filters)
+        return params
+
+    def load_filter_options(self):
+        options = self.client.request('GET /api/filter-options/<type>', f'/api/filter-options/{self.view}',
+                                      {'upload_id': self.upload_id} if self.upload_id else None)
+        if isinstance(options, dict):
+            self.options[self.view] = options
+
+    def load_dashboard(self):
+        self.client.request('GET /api/dashboard-data/<type>', f'/api/dashboard-data/{self.view}', self.params())
+
+    def filter_options(self):
+        self.load_filter_options()
+
+    def filtered_load(self):
+        # Change one or two filters the way a user clicking through dropdowns would
+        options = self.options.get(self.view)
+        if options is None:
+            self.load_filter_options()
+            options = self.options.get(self.view) or {}
+        self.filters = {}
+        for key in self.rng.sample(FILTER_KEYS, self.rng.randint(0, 2)):
+            values = options.get(key) or []
+            if values:
+                self.filters[key] = ','.join(self.rng.sample(values, min(len(values), self.rng.randint(1, 3))))
+        self.load_dashboard()
+
+    def tab_switch(self):
+        self.view = 'pipeline' if self.view == 'hired' else 'hired'
+        self.filters = {}
+        self.load_filter_options()
+        self.load_dashboard()
+
+    def poll(self):
+        # The auto-refresh timer reloads the current view with unchanged filters
+        self.load_dashboard()
+
+    def upload(self):
+        if not self.upload_pool:
+            return
+        filename, content = self.rng.choice(self.upload_pool)
+        body, content_type = encode_multipart(filename, content)
+        self.client.request('POST /upload', '/upload', data=body, content_type=content_type)
+
+    def run(self, deadline):
+        self.load_filter_options()
+        self.load_dashboard()
+        while time.monotonic() < deadline:
+            action = self.rng.choices(self.actions, self.weights)[0]
+            getattr(self, action)()
+            if self.think_time:
+                time.sleep(min(self.rng.expovariate(1 / self.think_time), max(deadline - time.monotonic(), 0)))
+
+def seed_server(client, n_rows):
+    """Upload a generated workbook of the requested size and return its upload id"""
+    print(f"[*] Uploading a synthetic workbook with {n_rows:,} hired rows...")
+    body, content_type = encode_multipart(f'loadtest_{n_rows}.xlsx', make_workbook(n_rows, seed=n_rows))
+    result = client.request('POST /upload (seed)', '/upload', data=body, content_type=content_type)
+    if not result or not result.get('success'):
+        print(f"[-] Seed upload failed: {result}")
+        sys.exit(1)
+    print(f"[+] Seeded upload {result['upload_id']}")
+    return result['upload_id']
+
+def print_report(endpoints, elapsed):
+    """Print the per-endpoint latency table"""
+    print(f"\n{'endpoint':<34} {'requests':>9} {'errors':>7} {'req/s':>8} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for endpoint, stats in endpoints.items():
+        print(f"{endpoint:<34} {stats['requests']:>9} {stats['errors']:>7} {stats['throughput_rps']:>8.1f} "
+              f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['max_ms']:>9.1f}")
+    total = sum(s['requests'] for s in endpoints.values())
+    errors = sum(s['errors'] for s in endpoints.values())
+    print(f"\n[+] {total:,} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s), {errors:,} errors")
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a dashboard traffic mix against a running server')
+    parser.add_argument('--url', default=DEFAULT_URL)
+    parser.add_argument('--users', type=int, default=20, help='Concurrent simulated users')
+    parser.add_argument('--duration', type=float, default=60, help='Test length in seconds')
+    parser.add_argument('--ramp-up', type=float, default=5, help='Seconds over which users start')
+    parser.add_argument('--think-time', type=float, default=1.0, help='Mean pause between actions (seconds)')
+    parser.add_argument('--mix', default=','.join(f'{k}={v}' for k, v in DEFAULT_MIX.items()),
+                        help='Action weights, e.g. poll=6,filtered_load=4,upload=0.05')
+    parser.add_argument('--seed-rows', type=int, default=0,
+                        help='Upload a synthetic workbook of this many hired rows before the test')
+    parser.add_argument('--upload-id', type=int, default=None, help='Existing upload to query (default: latest)')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--label', default='', help='Free-form tag stored in the results, e.g. "4 workers"')
+    parser.add_argument('--output', default=None, help='Write results as JSON')
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        print(f"[-] {e}")
+        sys.exit(1)
+
+    recorder = Recorder()
+    setup_client = Client(args.url, Recorder(), args.timeout)
+    upload_id = args.upload_id
+    if args.seed_rows:
+        upload_id = seed_server(setup_client, args.seed_rows)
+
+    upload_pool = []
+    if mix.get('upload'):
+        print(f"[*] Preparing {UPLOAD_POOL_SIZE} workbooks for upload traffic...")
+        upload_pool = [(f'loadtest_pool_{i}.xlsx', make_workbook(UPLOAD_POOL_ROWS, seed=1000 + i))
+                       for i in range(UPLOAD_POOL_SIZE)]
+
+    client = Client(args.url, recorder, args.timeout)
+    master_rng = random.Random(args.seed)
+    users = [SimulatedUser(client, upload_id, mix, args.think_time, upload_pool, random.Random(master_rng.random()))
+             for _ in range(args.users)]
+
+    print(f"[*] Running {args.users} users for {args.duration:.0f}s against {args.url}...")
+    started = time.monotonic()
+    deadline = started + args.ramp_up + args.duration
+    threads = []
+    for i, user in enumerate(users):
+        thread = threading.Thread(target=user.run, args=(deadline,), daemon=True)
+        threads.append(thread)
+        thread.start()
+        if args.ramp_up and args.users > 1:
+            time.sleep(args.ramp_up / args.users)
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    endpoints = recorder.summary(elapsed)
+    print_report(endpoints, elapsed)
+
+    if args.output:
+        results = {
+            'meta': {
+                'timestamp': datetime.now().isoformat(),
+                'url': args.url,
+                'label': args.label,
+                'users': args.users,
+                'duration': args.duration,
+                'think_time': args.think_time,
+                'mix': mix,
+                'seed_rows': args.seed_rows,
+                'upload_id': upload_id
+            },
+            'elapsed': elapsed,
+            'endpoints': endpoints
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"[+] Results written to {args.output}")
+
+if __name__ == '__main__':
+    main()
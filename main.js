@@ -251,6 +251,7 @@ function initializeInteractiveFilters() {
     document.getElementById('applyFilters').addEventListener('click', applyFiltersWithAnimation);
     document.getElementById('resetFilters').addEventListener('click', resetFiltersWithAnimation);
     document.getElementById('saveFilters').addEventListener('click', saveCurrentFilters);
+    loadSavedViews();
 }
 
 function handleFilterSearch(searchTerm, dropdown, optionsContainer, input) {
@@ -433,6 +434,141 @@ function resetFiltersWithAnimation() {
     }, 500);
 }
 
+// Saved Views (persisted server-side and precomputed per upload)
+function saveCurrentFilters() {
+    const name = prompt('Name this view:');
+    if (!name) return;
+
+    const filters = Object.fromEntries(new URLSearchParams(getFilterParams()));
+
+    fetch('/api/saved-views', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({
+            name: name,
+            dashboard_type: currentDashboard,
+            filters: filters
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.error) {
+            showAlert(data.error, 'danger');
+            return;
+        }
+        showAlert(`View "${data.view.name}" saved`, 'success');
+        loadSavedViews();
+    })
+    .catch(error => {
+        console.error('Error saving view:', error);
+        showAlert('Error saving view', 'danger');
+    });
+}
+
+function loadSavedViews() {
+    fetch('/api/saved-views')
+    .then(response => response.json())
+    .then(data => {
+        renderSavedViews(data.views || []);
+    })
+    .catch(error => {
+        console.error('Error loading saved views:', error);
+    });
+}
+
+function renderSavedViews(views) {
+    let container = document.getElementById('savedViewsList');
+    if (!container) {
+        container = document.createElement('div');
+        container.id = 'savedViewsList';
+        container.className = 'mt-3';
+        document.getElementById('saveFilters').parentElement.insertAdjacentElement('afterend', container);
+    }
+
+    if (views.length === 0) {
+        container.innerHTML = '';
+        return;
+    }
+
+    container.innerHTML = `
+        <label class="form-label"><i class="fas fa-bookmark me-2"></i>Saved Views</label>
+        <div class="d-flex flex-wrap gap-2">
+            ${views.map(view => `
+                <div class="btn-group btn-group-sm">
+                    <button class="btn btn-outline-primary saved-view-open" data-view-id="${view.id}"
+                            data-dashboard-type="${view.dashboard_type}"
+                            title="${view.last_error ? `Last refresh failed: ${view.last_error}` : `Opened ${view.open_count} times`}">
+                        ${view.last_error ? '<i class="fas fa-exclamation-triangle text-warning me-1"></i>' : ''}
+                        ${view.name} <span class="badge bg-light text-dark">${view.dashboard_type === 'hired' ? 'Hired' : 'Pipeline'}</span>
+                    </button>
+                    <button class="btn btn-outline-danger saved-view-delete" data-view-id="${view.id}" title="Delete view">
+                        <i class="fas fa-times"></i>
+                    </button>
+                </div>
+            `).join('')}
+        </div>
+    `;
+
+    container.querySelectorAll('.saved-view-open').forEach(button => {
+        button.addEventListener('click', () => {
+            openSavedView(button.dataset.viewId, button.dataset.dashboardType);
+        });
+    });
+    container.querySelectorAll('.saved-view-delete').forEach(button => {
+        button.addEventListener('click', () => {
+            deleteSavedView(button.dataset.viewId);
+        });
+    });
+}
+
+function deleteSavedView(viewId) {
+    if (!confirm('Delete this saved view?')) return;
+
+    fetch(`/api/saved-views/${viewId}`, { method: 'DELETE' })
+    .then(response => response.json())
+    .then(data => {
+        if (data.error) {
+            showAlert(data.error, 'danger');
+            return;
+        }
+        loadSavedViews();
+    })
+    .catch(error => {
+        console.error('Error deleting saved view:', error);
+        showAlert('Error deleting saved view', 'danger');
+    });
+}
+
+function openSavedView(viewId, dashboardType) {
+    switchToTab(dashboardType);
+
+    const params = new URLSearchParams();
+    if (currentUploadId) {
+        params.append('upload_id', currentUploadId);
+    }
+
+    fetch(`/api/saved-views/${viewId}/data?${params}`)
+    .then(response => response.json())
+    .then(data => {
+        if (data.error) {
+            showAlert(data.error, 'danger');
+            return;
+        }
+
+        if (dashboardType === 'hired') {
+            updateHiredDashboard(data);
+        } else {
+            updatePipelineDashboard(data);
+        }
+    })
+    .catch(error => {
+        console.error('Error opening saved view:', error);
+        showAlert('Error opening saved view', 'danger');
+    });
+}
+
 function updateFilterResultCount() {
     const filterCount = Object.keys(filterState).length;
     const countElement = document.getElementById('filterResultCount');
@@ -563,7 +699,54 @@ function initializeKPIInteractions() {
 function drillDownMetric(metric) {
     // Create modal or panel for detailed drill-down
     console.log(`Drilling down into ${metric}`);
-    // Implementation for detailed analysis
+    loadDrillDownRows({ metric: metric }).then(page => {
+        showModal('Metric Detail', renderDrillDownRows(metric, page));
+    });
+}
+
+// Row-level detail, one keyset page at a time from /api/rows
+function loadDrillDownRows(predicate, cursor = null) {
+    const params = new URLSearchParams(getFilterParams());
+    if (currentUploadId) {
+        params.append('upload_id', currentUploadId);
+    }
+    Object.entries(predicate).forEach(([key, value]) => params.append(key, value));
+    params.append('columns', 'job_ref_id,job_title,ta_partner,hiring_manager,job_state,position_created_date');
+    if (cursor) {
+        params.append('cursor', cursor);
+    }
+
+    return fetch(`/api/rows/${currentDashboard}?${params}`)
+    .then(response => response.json())
+    .then(data => {
+        if (data.error) {
+            showAlert(data.error, 'danger');
+            return { columns: [], rows: [], next_cursor: null };
+        }
+        return data;
+    });
+}
+
+function renderDrillDownRows(title, page) {
+    if (page.rows.length === 0) {
+        return '<p class="text-muted text-center">No matching positions</p>';
+    }
+
+    const header = page.columns.map(col => `<th>${col}</th>`).join('');
+    const body = page.rows.map(row =>
+        `<tr>${page.columns.map(col => `<td>${row[col] ?? ''}</td>`).join('')}</tr>`
+    ).join('');
+
+    return `
+        <h5>${title}</h5>
+        <div class="table-responsive">
+            <table class="table table-sm table-striped">
+                <thead><tr>${header}</tr></thead>
+                <tbody>${body}</tbody>
+            </table>
+        </div>
+        ${page.next_cursor ? '<p class="text-muted small">Showing first page of results</p>' : ''}
+    `;
 }
 
 // Real-time Features
@@ -758,6 +941,39 @@ function displayMLStatus(status) {
     }
 }
 
+function retrainModels() {
+    const params = new URLSearchParams();
+    if (currentUploadId) {
+        params.append('upload_id', currentUploadId);
+    }
+
+    fetch(`/api/ml-retrain?${params}`, { method: 'POST' })
+    .then(response => response.json())
+    .then(data => {
+        if (data.error) {
+            showAlert(data.error, 'danger');
+            return;
+        }
+        showAlert('Model retraining started in the background', 'info');
+
+        // Poll until the new model version is being served
+        const poll = setInterval(() => {
+            fetch(`/api/ml-status?${params}`)
+            .then(response => response.json())
+            .then(status => {
+                if (!status.training_job || status.training_job.status !== 'training') {
+                    clearInterval(poll);
+                    displayMLStatus(status);
+                }
+            });
+        }, 3000);
+    })
+    .catch(error => {
+        console.error('Error retraining models:', error);
+        showAlert('Error retraining models', 'danger');
+    });
+}
+
 function setupPredictionInputs() {
     // Populate TA Partner dropdown from current data
     const filterParams = new URLSearchParams();
@@ -1458,27 +1674,47 @@ function updateFunnelView(viewType) {
 function reloadTTFChart(groupBy) {
     // Reload TTF chart with new grouping
     console.log(`Reloading TTF chart grouped by: ${groupBy}`);
-    // Implementation for chart reload
+
+    const params = new URLSearchParams(getFilterParams());
+    if (currentUploadId) {
+        params.append('upload_id', currentUploadId);
+    }
+    params.append('dimension', groupBy);
+    params.append('measures', 'ttf_mean');
+
+    fetch(`/api/pivot/hired?${params}`)
+    .then(response => response.json())
+    .then(data => {
+        if (data.error) {
+            showAlert(data.error, 'danger');
+            return;
+        }
+        createEnhancedTTFChart('ttfChart', data);
+    })
+    .catch(error => {
+        console.error('Error reloading TTF chart:', error);
+    });
 }
 
 // Drill-down Functions
 function drillDownStage(stage, index) {
-    showModal('Stage Analysis', `
-        <div class="stage-analysis">
-            <h5>Detailed Analysis: ${stage}</h5>
-            <p>Drilling down into ${stage} stage performance...</p>
-            <!-- Add detailed metrics here -->
-        </div>
-    `);
+    loadDrillDownRows({ stage: stage }).then(page => {
+        showModal('Stage Analysis', `
+            <div class="stage-analysis">
+                ${renderDrillDownRows(`Detailed Analysis: ${stage}`, page)}
+            </div>
+        `);
+    });
 }
 
 function viewPartnerDetails(partner) {
-    showModal('Partner Performance', `
-        <div class="partner-details">
-            <h5>${partner} - Detailed Performance</h5>
-            <!-- Add detailed partner metrics here -->
-        </div>
-    `);
+    loadDrillDownRows({ partner: partner }).then(page => {
+        showModal('Partner Performance', `
+            <div class="partner-details">
+                ${renderDrillDownRows(`${partner} - Detailed Performance`, page)}
+            </div>
+        `);
+    });
 }
 
 // Utility Functions
@@ -2676,9 +2912,14 @@ function createResourceCharts(data) {
 
 // Export Functionality
 document.getElementById('exportBtn').addEventListener('click', function() {
-    // This would implement the export functionality
-    // For now, we'll show a placeholder
-    alert('Export functionality would be implemented here using libraries like jsPDF or similar');
+    // Streamed from the server; the browser starts the download on the first chunk
+    const params = new URLSearchParams(getFilterParams());
+    if (currentUploadId) {
+        params.append('upload_id', currentUploadId);
+    }
+    params.append('format', 'csv');
+
+    window.location.href = `/api/export/${currentDashboard}?${params}`;
 });
 
 // Utility Functions
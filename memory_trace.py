@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Opt-in tracemalloc memory profiler for the Recruitment Analytics Dashboard
+Records peak and retained memory plus the top allocation sites for each
+request and for each metrics stage inside it (read_excel, prepare_df, ...)
+
+tracemalloc is process-wide, so profiled requests are serialized to keep the
+numbers attributable; this mode is for diagnosis, not production traffic.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+TRACEBACK_FRAMES = 1
+RECENT_LIMIT = 100
+MB = 1024 * 1024
+
+# Allocation sites from these files are profiling noise
+IGNORED_FILES = (tracemalloc.__file__, __file__, '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>',
+                 '<unknown>')
+
+_profiles = deque(maxlen=RECENT_LIMIT)
+_profiles_lock = threading.Lock()
+
+# Only one profiled request at a time, see module docstring
+_request_lock = threading.Lock()
+
+_local = threading.local()
+_logger = None
+_top_n = 10
+
+class Frame:
+    """An open request or stage being measured"""
+
+    def __init__(self, name):
+        self.name = name
+        self.snapshot = take_snapshot()
+        # Measure from after the snapshot so its own size is not counted
+        tracemalloc.reset_peak()
+        self.start_current, _ = tracemalloc.get_traced_memory()
+        self.peak = self.start_current
+        self.stages = []
+
+def take_snapshot():
+    """Snapshot traced allocations without profiler and import noise"""
+    snapshot = tracemalloc.take_snapshot()
+    return snapshot.filter_traces([tracemalloc.Filter(False, name) for name in IGNORED_FILES])
+
+def fold_peak():
+    """Credit the current peak to every open frame, then reset it for the next frame"""
+    _, peak = tracemalloc.get_traced_memory()
+    for frame in _local.stack:
+        frame.peak = max(frame.peak, peak)
+    tracemalloc.reset_peak()
+
+def top_sites(before, after, limit):
+    """Largest allocation growth between two snapshots, by source line"""
+    sites = []
+    for stat in after.compare_to(before, 'lineno')[:limit]:
+        if stat.size_diff <= 0:
+            break
+        frame = stat.traceback[0]
+        sites.append({
+            'site': f'{os.path.basename(frame.filename)}:{frame.lineno}',
+            'file': frame.filename,
+            'size_mb': stat.size_diff / MB,
+            'count': stat.count_diff
+        })
+    return sites
+
+def close_frame(frame):
+    """Summarize a finished frame (must still be on the stack)"""
+    fold_peak()
+    current, _ = tracemalloc.get_traced_memory()
+    summary = {
+        'name': frame.name,
+        'peak_mb': (frame.peak - frame.start_current) / MB,
+        'net_mb': (current - frame.start_current) / MB,
+        'top': top_sites(frame.snapshot, take_snapshot(), _top_n),
+        'stages': frame.stages
+    }
+    # Forget the comparison snapshot's own allocations
+    tracemalloc.reset_peak()
+    return summary
+
+def enable(log_path, top_n=10, max_bytes=5 * MB, backup_count=3):
+    """Start tracing allocations and open the rotating profile log"""
+    global _logger, _top_n
+    _top_n = top_n
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEBACK_FRAMES)
+
+    if _logger is None:
+        directory = os.path.dirname(log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _logger = logging.getLogger('dashboard.memory_profile')
+        _logger.setLevel(logging.INFO)
+        _logger.propagate = False
+        handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        _logger.addHandler(handler)
+
+def start_request(name):
+    """Begin profiling a request on this thread"""
+    _request_lock.acquire()
+    _local.stack = []
+    fold_peak()
+    _local.stack.append(Frame(name))
+
+def finish_request(status=None):
+    """Finish the request profile, store and log it"""
+    stack = getattr(_local, 'stack', None)
+    if not stack:
+        return None
+    try:
+        request_frame = stack[0]
+        profile = close_frame(request_frame)
+        profile['status'] = status
+        profile['at'] = time.time()
+        with _profiles_lock:
+            _profiles.append(profile)
+        if _logger is not None:
+            _logger.info(json.dumps(profile))
+        return profile
+    finally:
+        _local.stack = None
+        _request_lock.release()
+
+@contextmanager
+def stage_hook(name):
+    """metrics stage hook: profile the stage when a request is being profiled"""
+    stack = getattr(_local, 'stack', None)
+    if not stack:
+        yield
+        return
+
+    fold_peak()
+    frame = Frame(name)
+    stack.append(frame)
+    try:
+        yield
+    finally:
+        summary = close_frame(frame)
+        stack.pop()
+        stack[-1].stages.append(summary)
+
+def recent(limit=20, name=None):
+    """Most recent request profiles, newest first"""
+    with _profiles_lock:
+        profiles = [p for p in _profiles if name is None or p['name'] == name]
+    return profiles[::-1][:limit]
+
+def traced_memory():
+    """Current and peak traced memory in MB (peak since the last fold)"""
+    if not tracemalloc.is_tracing():
+        return {'current_mb': 0, 'peak_mb': 0}
+    current, peak = tracemalloc.get_traced_memory()
+    return {'current_mb': current / MB, 'peak_mb': peak / MB}
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Request metrics for the Recruitment Analytics Dashboard
+Stage timers, counters and histograms kept in process memory and rendered in
+the Prometheus text exposition format; per-request stage durations also feed
+the Server-Timing response header
+"""
+
+import re
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Payload size buckets in bytes (1 KB .. 16 MB)
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(8))
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_registry = []
+
+# Stage durations of the request being handled on this thread
+_local = threading.local()
+
+# Extra context managers entered around every stage, see add_stage_hook()
+_stage_hooks = []
+
+# Label added to every sample, see set_process_label()
+_process_label = None
+
+def escape_label(value):
+    """Escape a label value for the text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(labelnames, values, extra=None):
+    """Render {name="value",...} for a sample"""
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(labelnames, values)]
+    if _process_label:
+        pairs.append(_process_label)
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def format_value(value):
+    """Render a sample value"""
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    """Base class for labelled metrics"""
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(labels.get(name, '') for name in self.labelnames)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+    def _render_samples(self, items):
+        return [f'{self.name}{format_labels(self.labelnames, key)} {format_value(value)}' for key, value in items]
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(Metric):
+    """Cumulative bucketed observations with sum and count"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _render_samples(self, items):
+        lines = []
+        for key, (counts, total, count) in items:
+            for bound, bucket_count in zip(self.buckets, counts):
+                labels = format_labels(self.labelnames, key, f'le="{format_value(bound)}"')
+                lines.append(f'{self.name}_bucket{labels} {bucket_count}')
+            labels = format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+REQUEST_SECONDS = Histogram('dashboard_request_duration_seconds', 'HTTP request latency',
+                            ['endpoint', 'method', 'status'])
+STAGE_SECONDS = Histogram('dashboard_stage_duration_seconds', 'Time spent in each processing stage',
+                          ['stage'])
+DB_QUERY_SECONDS = Histogram('dashboard_db_query_duration_seconds', 'SQLite query time',
+                             ['operation'])
+PAYLOAD_BYTES = Histogram('dashboard_response_bytes', 'Response body size',
+                          ['endpoint'], buckets=SIZE_BUCKETS)
+CACHE_REQUESTS = Counter('dashboard_cache_requests_total', 'Payload cache lookups',
+                         ['kind', 'result'])
+CACHE_ENTRIES = Gauge('dashboard_cache_entries', 'Payloads currently held in the cache')
+RETENTION_ARCHIVED = Counter('dashboard_retention_archived_uploads_total', 'Uploads moved from SQLite to archive files')
+RETENTION_ARCHIVE_BYTES = Counter('dashboard_retention_archive_bytes_total', 'Compressed archive bytes written')
+RETENTION_RECLAIMED_BYTES = Counter('dashboard_retention_reclaimed_bytes_total',
+                                    'Database file bytes released by retention runs')
+DATABASE_BYTES = Gauge('dashboard_database_bytes', 'SQLite database size after the last retention run')
+
+def set_process_label(name, value):
+    """Start this process's series over under a label of its own, e.g. worker="<pid>"
+    when several forked processes share one port; values inherited from the
+    parent at fork are dropped so they are not counted once per child"""
+    global _process_label
+    _process_label = f'{name}="{escape_label(value)}"'
+    for metric in _registry:
+        with metric._lock:
+            metric._values.clear()
+
+def start_request():
+    """Begin collecting stage durations for the current thread's request"""
+    _local.stages = []
+
+def finish_request():
+    """Stop collecting and return [(stage, seconds), ...] for the request"""
+    stages = getattr(_local, 'stages', None) or []
+    _local.stages = None
+    return stages
+
+def add_stage_hook(hook):
+    """Register hook(stage_name) -> context manager to run around every stage"""
+    if hook not in _stage_hooks:
+        _stage_hooks.append(hook)
+
+@contextmanager
+def stage(name):
+    """Time a block (or decorated function) as a named stage"""
+    with ExitStack() as hooks:
+        for hook in _stage_hooks:
+            hooks.enter_context(hook(name))
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            STAGE_SECONDS.observe(elapsed, stage=name)
+            stages = getattr(_local, 'stages', None)
+            if stages is not None:
+                stages.append((name, elapsed))
+
+@contextmanager
+def db_query(operation):
+    """Time a database query; also counted as the 'db' stage"""
+    started = time.perf_counter()
+    with stage('db'):
+        try:
+            yield
+        finally:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - started, operation=operation)
+
+def server_timing(stages, total=None):
+    """Build a Server-Timing header value, summing repeated stages"""
+    durations = {}
+    for name, seconds in stages:
+        durations[name] = durations.get(name, 0.0) + seconds
+    if total is not None:
+        durations['total'] = total
+    return ', '.join(f'{re.sub(r"[^A-Za-z0-9_-]", "_", name)};dur={seconds * 1000:.1f}'
+                     for name, seconds in durations.items())
+
+def render():
+    """Render every registered metric in the Prometheus text format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Machine learning models for the Recruitment Analytics Dashboard
+Models are trained per upload in a background process, persisted as versioned
+artifacts and served from memory, so requests only pay for inference
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import closing
+import numpy as np
+import pandas as pd
+
+# flock is POSIX only; elsewhere training locks fall back to exclusive-create marker files
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# scikit-learn is optional - AI features are disabled without it
+try:
+    import joblib
+    import sklearn
+    from sklearn.compose import ColumnTransformer
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    from sklearn.model_selection import train_test_split
+    from sklearn.neighbors import NearestNeighbors
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+# Features used by the time-to-fill model
+TTF_CATEGORICAL_FEATURES = ['job_title', 'job_location_country', 'project_name', 'ta_partner']
+TTF_NUMERIC_FEATURES = ['max_budgeted_salary', 'number_of_cvs_shared', 'number_of_cvs_shortlisted',
+                        'number_of_candidates_interviewed', 'number_of_candidates_offered']
+
+# Request field names accepted as aliases of the stored column names
+FEATURE_ALIASES = {
+    'role': 'job_title',
+    'country': 'job_location_country',
+    'project': 'project_name',
+    'max_budget': 'max_budgeted_salary'
+}
+
+# Features used to find similar historical roles for recommendations
+SIMILARITY_CATEGORICAL_FEATURES = ['job_title', 'job_location_country', 'project_name',
+                                   'business_line', 'service_line']
+SIMILARITY_NUMERIC_FEATURES = ['max_budgeted_salary']
+RECOMMENDATION_NEIGHBORS = 15
+
+MIN_TRAINING_ROWS = 20
+
+# Marker-file training locks (no flock) older than this belong to a crashed process
+TRAINING_LOCK_STALE_SECONDS = 3600
+
+# Model kinds trained by run_training_job
+MODEL_KINDS = ('ttf', 'similarity')
+
+# Serving models keyed by (model kind, upload_id)
+_model_cache = {}
+_model_cache_lock = threading.Lock()
+
+# Recent inference durations per model kind, for /api/ml-status
+_serving_latencies = {kind: deque(maxlen=1000) for kind in MODEL_KINDS}
+
+def build_feature_frame(df, categorical=TTF_CATEGORICAL_FEATURES, numeric=TTF_NUMERIC_FEATURES):
+    """Select model features from a dataframe, filling anything missing"""
+    aliases = {col: alias for alias, col in FEATURE_ALIASES.items()}
+
+    def column(col, default):
+        values = df[col] if col in df.columns else pd.Series(np.nan, index=df.index, dtype=object)
+        if aliases.get(col) in df.columns:
+            values = values.fillna(df[aliases[col]])
+        return values.fillna(default)
+
+    features = pd.DataFrame(index=df.index)
+
+    for col in categorical:
+        features[col] = column(col, 'Unknown').astype(str)
+
+    for col in numeric:
+        features[col] = pd.to_numeric(column(col, 0), errors='coerce').fillna(0).astype(float)
+
+    return features
+
+def train_ttf_model(hired_df):
+    """Fit a time-to-fill regressor on hired positions, or return None if there is too little data"""
+    if hired_df is None or 'time_to_fill' not in hired_df.columns:
+        return None
+
+    hired_df = hired_df[hired_df['time_to_fill'].notna()]
+    if len(hired_df) < MIN_TRAINING_ROWS:
+        return None
+
+    started = time.perf_counter()
+    X = build_feature_frame(hired_df)
+    y = hired_df['time_to_fill'].astype(float).values
+
+    def make_pipeline():
+        encoder = ColumnTransformer([
+            ('categorical', OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1),
+             TTF_CATEGORICAL_FEATURES)
+        ], remainder='passthrough')
+        return Pipeline([
+            ('encode', encoder),
+            ('regress', HistGradientBoostingRegressor(max_iter=200, random_state=42))
+        ])
+
+    # Holdout error drives the reported confidence; the served model sees all rows
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    holdout = make_pipeline().fit(X_train, y_train)
+    mae = float(np.mean(np.abs(holdout.predict(X_test) - y_test)))
+
+    pipeline = make_pipeline().fit(X, y)
+
+    return {
+        'pipeline': pipeline,
+        'training_rows': len(hired_df),
+        'mae': mae,
+        'training_seconds': time.perf_counter() - started,
+        'trained_at': time.time()
+    }
+
+def predict_ttf(model, positions_df):
+    """Score a batch of positions in one vectorized call"""
+    return model['pipeline'].predict(build_feature_frame(positions_df))
+
+def describe_confidence(model):
+    """Map the holdout error of a model to a confidence label"""
+    if model['mae'] <= 10:
+        return 'High'
+    elif model['mae'] <= 20:
+        return 'Medium'
+    return 'Low'
+
+def get_model(kind, upload_id):
+    """Return the serving model for (kind, upload_id), or None if none is installed"""
+    with _model_cache_lock:
+        return _model_cache.get((kind, upload_id))
+
+def install_model(kind, upload_id, model):
+    """Atomically swap in a new serving model"""
+    with _model_cache_lock:
+        _model_cache[(kind, upload_id)] = model
+
+def record_serving_latency(kind, seconds):
+    """Record the duration of one inference call"""
+    _serving_latencies[kind].append(seconds)
+
+def serving_latency_summary(kind):
+    """Summarize recent inference durations in milliseconds"""
+    samples = np.array(_serving_latencies[kind], dtype=float) * 1000
+    if len(samples) == 0:
+        return {'count': 0, 'p50_ms': None, 'p95_ms': None}
+    return {
+        'count': len(samples),
+        'p50_ms': round(float(np.percentile(samples, 50)), 2),
+        'p95_ms': round(float(np.percentile(samples, 95)), 2)
+    }
+
+def feature_schema_hash():
+    """Short hash of the feature layout and sklearn version; artifacts only load for a matching schema"""
+    schema = {
+        'ttf': [TTF_CATEGORICAL_FEATURES, TTF_NUMERIC_FEATURES],
+        'similarity': [SIMILARITY_CATEGORICAL_FEATURES, SIMILARITY_NUMERIC_FEATURES],
+        'sklearn': sklearn.__version__
+    }
+    return hashlib.sha1(json.dumps(schema, sort_keys=True).encode('utf-8')).hexdigest()[:10]
+
+def latest_artifact(models_folder, kind, upload_id):
+    """Return (version, path) of the newest artifact for the current schema, or None"""
+    pattern = os.path.join(models_folder, f'{kind}_upload{upload_id}_{feature_schema_hash()}_v*.joblib')
+    versions = []
+    for path in glob.glob(pattern):
+        match = re.search(r'_v(\d+)\.joblib$', path)
+        if match:
+            versions.append((int(match.group(1)), path))
+    return max(versions) if versions else None
+
+def remove_upload_models(models_folder, upload_id):
+    """Uninstall an upload's serving models and delete its artifacts of every schema; returns the files removed"""
+    with _model_cache_lock:
+        for kind in MODEL_KINDS:
+            _model_cache.pop((kind, upload_id), None)
+
+    removed = []
+    for kind in MODEL_KINDS:
+        for path in glob.glob(os.path.join(models_folder, f'{kind}_upload{upload_id}_*.joblib')):
+            try:
+                os.remove(path)
+                removed.append(path)
+            except OSError:
+                pass
+    return removed
+
+def acquire_training_lock(models_folder, upload_id):
+    """Claim the training of an upload's models for the current schema across processes.
+
+    Returns a handle for release_training_lock(), or None when another process
+    is already training them. flock locks are dropped by the OS if the holder
+    dies; marker files are taken over once TRAINING_LOCK_STALE_SECONDS old.
+    """
+    os.makedirs(models_folder, exist_ok=True)
+    path = os.path.join(models_folder, f'.training_upload{upload_id}_{feature_schema_hash()}.lock')
+
+    if fcntl is not None:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return None
+        return fd
+
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        try:
+            if time.time() - os.path.getmtime(path) < TRAINING_LOCK_STALE_SECONDS:
+                return None
+            os.remove(path)
+        except OSError:
+            return None
+        return acquire_training_lock(models_folder, upload_id)
+    os.write(fd, str(os.getpid()).encode('ascii'))
+    os.close(fd)
+    return path
+
+def release_training_lock(handle):
+    """Release a lock taken by acquire_training_lock()"""
+    if isinstance(handle, int):
+        os.close(handle)  # closing the descriptor drops the flock
+        return
+    try:
+        os.remove(handle)
+    except OSError:
+        pass
+
+def load_artifact(path):
+    """Load a persisted model artifact"""
+    return joblib.load(path)
+
+def load_training_frame(database, upload_id):
+    """Read the hired rows of an upload straight from SQLite"""
+    with closing(sqlite3.connect(database)) as conn:
+        df = pd.read_sql_query('SELECT * FROM hired_data WHERE upload_id = ?', conn, params=(upload_id,))
+    return None if df.empty else df
+
+def run_training_job(database, models_folder, upload_id):
+    """Train every model kind for an upload and persist versioned artifacts.
+
+    Runs in a separate process. Each artifact is written to a temporary file
+    and renamed into place, so readers never see a partial file. Returns
+    {kind: artifact path or None when there was too little data}.
+    """
+    os.makedirs(models_folder, exist_ok=True)
+    hired_df = load_training_frame(database, upload_id)
+    schema = feature_schema_hash()
+    trainers = {'ttf': train_ttf_model, 'similarity': build_similarity_index}
+
+    results = {}
+    for kind in MODEL_KINDS:
+        model = trainers[kind](hired_df)
+        if model is None:
+            results[kind] = None
+            continue
+
+        latest = latest_artifact(models_folder, kind, upload_id)
+        version = latest[0] + 1 if latest else 1
+        model.update({'version': version, 'schema': schema, 'upload_id': upload_id})
+
+        path = os.path.join(models_folder, f'{kind}_upload{upload_id}_{schema}_v{version}.joblib')
+        joblib.dump(model, path + '.tmp')
+        os.replace(path + '.tmp', path)
+        results[kind] = path
+
+    return results
+
+# Metrics scanned for anomalies per sheet type
+ANOMALY_METRICS = {
+    'hired': ['time_to_fill', 'budget_variance_pct', 'cv_to_interview_rate', 'interview_to_offer_rate'],
+    'final': ['position_age', 'cv_to_interview_rate', 'interview_to_offer_rate']
+}
+
+ANOMALY_GROUP_COLUMN = 'job_title'
+ANOMALY_Z_THRESHOLD = 3.5  # Iglewicz-Hoaglin cut-off for modified z-scores
+ANOMALY_MIN_GROUP_SIZE = 5
+
+def add_funnel_ratios(df):
+    """Return a frame with the derived funnel ratios used by the anomaly scan"""
+    df = df.copy()
+    if 'number_of_candidates_interviewed' in df.columns and 'number_of_candidates_offered' in df.columns:
+        interviewed = df['number_of_candidates_interviewed']
+        df['interview_to_offer_rate'] = np.where(
+            interviewed > 0, df['number_of_candidates_offered'] / interviewed.where(interviewed > 0) * 100, np.nan)
+    return df
+
+def robust_zscores(df, metrics, group_col=ANOMALY_GROUP_COLUMN):
+    """Modified z-scores (median/MAD) of each metric within its group.
+
+    Groups smaller than ANOMALY_MIN_GROUP_SIZE fall back to the global
+    median and MAD so a single odd role is still compared to something.
+    """
+    scores = pd.DataFrame(index=df.index)
+    groups = df[group_col].fillna('Unknown') if group_col in df.columns else pd.Series('All', index=df.index)
+    group_sizes = groups.map(groups.value_counts())
+
+    for metric in metrics:
+        values = df[metric].astype(float)
+        grouped = values.groupby(groups)
+        median = grouped.transform('median')
+        mad = (values - median).abs().groupby(groups).transform('median')
+
+        global_median = values.median()
+        global_mad = (values - global_median).abs().median()
+        small = group_sizes < ANOMALY_MIN_GROUP_SIZE
+        median = median.where(~small, global_median)
+        mad = mad.where(~small, global_mad)
+
+        # MAD of zero means most of the group is identical; no spread to score against
+        mad = mad.where(mad > 0)
+        scores[metric] = 0.6745 * (values - median) / mad
+
+    return scores
+
+def detect_anomalies(df, sheet_type, method='robust'):
+    """Scan a prepared frame for anomalous positions and build the API payload"""
+    df = add_funnel_ratios(df)
+    metrics = [m for m in ANOMALY_METRICS[sheet_type] if m in df.columns]
+    zscores = robust_zscores(df, metrics)
+    abs_z = zscores.abs()
+
+    if method == 'isolation_forest':
+        from sklearn.ensemble import IsolationForest
+
+        X = df[metrics].astype(float).fillna(df[metrics].median()).fillna(0)
+        forest = IsolationForest(n_estimators=200, contamination='auto', random_state=42).fit(X)
+        scores = pd.Series(-forest.decision_function(X), index=df.index)
+        flagged = pd.Series(forest.predict(X) == -1, index=df.index)
+    else:
+        scores = abs_z.max(axis=1).fillna(0)
+        flagged = scores > ANOMALY_Z_THRESHOLD
+
+    # The metric with the largest robust z-score explains each flagged row
+    top_metric = abs_z.fillna(0).idxmax(axis=1) if metrics else pd.Series('', index=df.index)
+    flagged_idx = scores[flagged].sort_values(ascending=False).index
+
+    anomalies = []
+    for idx in flagged_idx:
+        row = df.loc[idx]
+        metric = top_metric[idx]
+        z = zscores.at[idx, metric] if metric else np.nan
+        direction = 'high' if z > 0 else 'low'
+        reason = (f"Unusually {direction} {metric.replace('_', ' ')} for {row.get(ANOMALY_GROUP_COLUMN, 'this role')} "
+                  f"(robust z = {z:.1f})") if pd.notna(z) else 'Unusual combination of metrics'
+        created = row.get('position_created_date')
+
+        anomalies.append({
+            'id': int(row['id']) if 'id' in row and pd.notna(row['id']) else int(idx),
+            'anomaly_score': round(float(scores[idx]), 3),
+            'reason': reason,
+            'metric': metric,
+            'position_details': {
+                'job_ref_id': row.get('job_ref_id'),
+                'role': row.get('job_title'),
+                'ta_partner': row.get('ta_partner'),
+                'pos_created': created.strftime('%Y-%m-%d') if pd.notna(created) else None,
+                'time_to_fill': float(row['time_to_fill']) if pd.notna(row.get('time_to_fill')) else None,
+                'budget_variance_pct': float(row['budget_variance_pct']) if pd.notna(row.get('budget_variance_pct')) else None,
+                'position_age': float(row['position_age']) if pd.notna(row.get('position_age')) else None
+            }
+        })
+
+    total = len(df)
+    return {
+        'method': method,
+        'metrics': metrics,
+        'anomalies': anomalies,
+        'total_positions': total,
+        'anomaly_rate': len(anomalies) / total * 100 if total else 0
+    }
+
+def build_similarity_index(hired_df):
+    """Build a nearest-neighbour index over encoded hired positions, or None if there is too little data"""
+    if hired_df is None or len(hired_df) < MIN_TRAINING_ROWS:
+        return None
+
+    started = time.perf_counter()
+    X = build_feature_frame(hired_df, SIMILARITY_CATEGORICAL_FEATURES, SIMILARITY_NUMERIC_FEATURES)
+
+    encoder = ColumnTransformer([
+        ('categorical', OneHotEncoder(handle_unknown='ignore', sparse_output=False),
+         SIMILARITY_CATEGORICAL_FEATURES),
+        ('numeric', StandardScaler(), SIMILARITY_NUMERIC_FEATURES)
+    ])
+    matrix = encoder.fit_transform(X)
+    index = NearestNeighbors(n_neighbors=min(RECOMMENDATION_NEIGHBORS, len(X)),
+                             algorithm='ball_tree').fit(matrix)
+
+    def column(col):
+        if col in hired_df.columns:
+            return hired_df[col].to_numpy()
+        return np.full(len(hired_df), np.nan)
+
+    return {
+        'encoder': encoder,
+        'index': index,
+        'ta_partner': column('ta_partner'),
+        'sourcing_partner': column('sourcing_partner'),
+        'time_to_fill': column('time_to_fill').astype(float),
+        'training_rows': len(hired_df),
+        'training_seconds': time.perf_counter() - started,
+        'trained_at': time.time()
+    }
+
+def recommend_partners(similarity, positions_df, top_n=3):
+    """Recommend partners for a batch of open positions with one index query"""
+    X = build_feature_frame(positions_df, SIMILARITY_CATEGORICAL_FEATURES, SIMILARITY_NUMERIC_FEATURES)
+    _, indices = similarity['index'].kneighbors(similarity['encoder'].transform(X))
+
+    neighbour_ttf = similarity['time_to_fill'][indices]
+    with np.errstate(all='ignore'):
+        expected_ttf = np.nanmean(neighbour_ttf, axis=1)
+
+    def top_partners(role):
+        neighbours = pd.DataFrame({
+            'position': np.repeat(np.arange(len(indices)), indices.shape[1]),
+            'partner': similarity[role][indices].ravel(),
+            'time_to_fill': neighbour_ttf.ravel()
+        })
+        neighbours = neighbours[neighbours['partner'].notna() & (neighbours['partner'] != 'Unknown')]
+        ranked = (neighbours.groupby(['position', 'partner'])
+                  .agg(matches=('time_to_fill', 'size'), avg_ttf=('time_to_fill', 'mean'))
+                  .reset_index()
+                  .sort_values(['position', 'matches', 'avg_ttf'], ascending=[True, False, True])
+                  .groupby('position').head(top_n))
+
+        per_position = {}
+        for position, partner, matches, avg_ttf in ranked.itertuples(index=False):
+            per_position.setdefault(position, []).append({
+                'name': partner,
+                'similar_roles_filled': int(matches),
+                'avg_ttf': round(float(avg_ttf), 1) if pd.notna(avg_ttf) else None
+            })
+        return per_position
+
+    ta_partners = top_partners('ta_partner')
+    sourcing_partners = top_partners('sourcing_partner')
+
+    return [
+        {
+            'ta_partners': ta_partners.get(i, []),
+            'sourcing_partners': sourcing_partners.get(i, []),
+            'expected_ttf': round(float(expected_ttf[i]), 1) if pd.notna(expected_ttf[i]) else None
+        }
+        for i in range(len(indices))
+    ]
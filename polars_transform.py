@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Polars engine for the numeric part of prepare_df()
+Numeric coercion and the derived metrics (time_to_fill, budget_variance_pct,
+cv_to_interview_rate) run as one lazy Polars query over the parsed sheet's
+columns, which Polars evaluates on its thread pool. The result
+matches the pandas engine column for column, dtypes included.
+
+Columns that are still Python objects after read_excel (text dates, numbers
+stored as text) keep pandas' parsing rules, and text columns never leave
+pandas: converting Python strings to Arrow and back costs more than filling
+them in place.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Polars is optional - prepare_df uses pandas without it
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
+NS_PER_DAY = 86_400_000_000_000
+
+def to_polars(series):
+    """Series -> Polars series, sharing the numpy buffer where the dtype allows"""
+    return pl.Series(series.name, series.to_numpy(), nan_to_null=False)
+
+def days_between(end, start):
+    """Whole days from start to end, floored like pandas' Timedelta.days"""
+    return (end - start).dt.total_nanoseconds() // NS_PER_DAY
+
+def convert_and_derive(df, sheet_type, date_cols, numeric_cols, debug_info):
+    """Polars equivalent of prepare_df's date/numeric conversion and derived metrics"""
+    df = df.copy(deep=False)
+
+    for col in date_cols:
+        if col in df.columns:
+            if not pd.api.types.is_datetime64_dtype(df[col]):
+                df[col] = pd.to_datetime(df[col], errors='coerce')
+            debug_info.append(f"Converted {col} to datetime")
+
+    # Numbers stored as text keep pandas' parsing; native numeric columns are filled in Polars
+    present_numeric = [col for col in numeric_cols if col in df.columns]
+    for col in present_numeric:
+        if df[col].dtype.kind not in 'iuf':
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+    inputs = [to_polars(df[col]) for col in present_numeric + [col for col in date_cols if col in df.columns]]
+    frame = pl.LazyFrame(inputs)
+
+    fills = []
+    for col in present_numeric:
+        expr = pl.col(col)
+        if df[col].dtype.kind == 'f':
+            expr = expr.fill_nan(0)
+        fills.append(expr.fill_null(0))
+        debug_info.append(f"Converted {col} to numeric")
+    frame = frame.with_columns(fills)
+
+    derived = []
+    columns = set(df.columns)
+    if sheet_type == 'hired':
+        if 'filled_date' in columns and 'position_created_date' in columns:
+            derived.append(days_between(pl.col('filled_date'), pl.col('position_created_date')).alias('time_to_fill'))
+            debug_info.append("Calculated time_to_fill")
+
+        if 'accepted_salary' in columns and 'max_budgeted_salary' in columns:
+            derived.append(((pl.col('accepted_salary') - pl.col('max_budgeted_salary')) / pl.col('max_budgeted_salary') * 100)
+                           .cast(pl.Float64).alias('budget_variance_pct'))
+            debug_info.append("Calculated budget_variance_pct")
+
+    if 'number_of_cvs_shared' in columns and 'number_of_candidates_interviewed' in columns:
+        derived.append(pl.when(pl.col('number_of_cvs_shared') > 0)
+                       .then(pl.col('number_of_candidates_interviewed') / pl.col('number_of_cvs_shared') * 100)
+                       .otherwise(0.0).cast(pl.Float64).alias('cv_to_interview_rate'))
+        debug_info.append("Calculated cv_to_interview_rate")
+
+    result = frame.with_columns(derived).collect()
+
+    # Integer results with nulls come back as float64 with NaN, as pandas produces them
+    for col in present_numeric + [expr.meta.output_name() for expr in derived]:
+        df[col] = np.asarray(result[col].to_numpy())
+    return df
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Opt-in SQLite statement tracing for the Recruitment Analytics Dashboard
+Times every statement run through a traced connection (execute plus fetching),
+logs the ones over a threshold with the shape of their bound parameters and
+captures EXPLAIN QUERY PLAN for them, aggregated per statement for a report
+"""
+
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from collections import deque
+
+RECENT_SLOW_LIMIT = 200
+
+# Aggregated stats keyed by normalized SQL text
+_stats = {}
+_recent_slow = deque(maxlen=RECENT_SLOW_LIMIT)
+_lock = threading.Lock()
+
+def normalize_sql(sql):
+    """Collapse whitespace so the same statement aggregates under one key"""
+    return re.sub(r'\s+', ' ', sql).strip()
+
+def parameter_shape(params, many=False):
+    """Describe bound parameters by type only, never by value"""
+    if many:
+        params = list(params) if not isinstance(params, (list, tuple)) else params
+        first = parameter_shape(params[0]) if params else '()'
+        return f'{len(params)} x {first}'
+    if params is None:
+        return '()'
+    if isinstance(params, dict):
+        return '{' + ', '.join(f'{key}: {type(value).__name__}' for key, value in params.items()) + '}'
+    return '(' + ', '.join(type(value).__name__ for value in params) + ')'
+
+def explain_query_plan(conn, sql, params):
+    """Return EXPLAIN QUERY PLAN lines for a read statement, indented by depth"""
+    if not re.match(r'\s*(SELECT|WITH)\b', sql, re.IGNORECASE):
+        return []
+    try:
+        cursor = sqlite3.Cursor(conn)
+        rows = sqlite3.Cursor.execute(cursor, f'EXPLAIN QUERY PLAN {sql}', params or ()).fetchall()
+    except sqlite3.Error as e:
+        return [f'unavailable: {e}']
+
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node_id] + detail)
+    return lines
+
+class StatementTimer:
+    """Accumulates execute + fetch time for one statement on a cursor"""
+
+    def __init__(self, sql, shape, params):
+        self.sql = sql
+        self.shape = shape
+        self.params = params
+        self.seconds = 0.0
+        self.rows = 0
+
+class TracingCursor(sqlite3.Cursor):
+    """Cursor that times statements until their results are exhausted"""
+
+    _timer = None
+
+    def _timed(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self._timer is not None:
+                self._timer.seconds += time.perf_counter() - started
+
+    def _begin(self, sql, shape, params):
+        self._finish()
+        self._timer = StatementTimer(sql, shape, params)
+
+    def _finish(self):
+        timer, self._timer = self._timer, None
+        if timer is not None:
+            self.connection.record(timer)
+
+    def execute(self, sql, parameters=()):
+        self._begin(sql, parameter_shape(parameters), parameters)
+        result = self._timed(super().execute, sql, parameters)
+        if self.description is None:
+            self._finish()
+        return result
+
+    def executemany(self, sql, seq_of_parameters):
+        seq_of_parameters = list(seq_of_parameters)
+        self._begin(sql, parameter_shape(seq_of_parameters, many=True), None)
+        result = self._timed(super().executemany, sql, seq_of_parameters)
+        self._finish()
+        return result
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        elif self._timer is not None:
+            self._timer.rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        rows = self._timed(super().fetchmany, size)
+        if self._timer is not None:
+            self._timer.rows += len(rows)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        if self._timer is not None:
+            self._timer.rows += len(rows)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+class TracingConnection(sqlite3.Connection):
+    """Connection whose statements all go through TracingCursor.
+
+    Python's sqlite3 module does not expose SQLite's profile hook, so timing is
+    taken around cursor calls instead of inside the library.
+    """
+
+    slow_threshold = 0.1
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursors = weakref.WeakSet()
+
+    def cursor(self, factory=TracingCursor):
+        cursor = super().cursor(factory)
+        self._cursors.add(cursor)
+        return cursor
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def record(self, timer):
+        """Aggregate a finished statement; log and explain it when slow"""
+        sql = normalize_sql(timer.sql)
+        slow = timer.seconds >= self.slow_threshold
+
+        with _lock:
+            stats = _stats.get(sql)
+            if stats is None:
+                stats = _stats[sql] = {
+                    'sql': sql, 'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0,
+                    'slow_count': 0, 'rows': 0, 'param_shape': timer.shape, 'plan': None
+                }
+            stats['count'] += 1
+            stats['total_seconds'] += timer.seconds
+            stats['max_seconds'] = max(stats['max_seconds'], timer.seconds)
+            stats['rows'] += timer.rows
+            stats['param_shape'] = timer.shape
+            need_plan = slow and stats['plan'] is None
+
+        if not slow:
+            return
+
+        plan = explain_query_plan(self, timer.sql, timer.params) if need_plan else None
+        with _lock:
+            stats['slow_count'] += 1
+            if plan is not None:
+                stats['plan'] = plan
+            _recent_slow.append({
+                'sql': sql,
+                'seconds': timer.seconds,
+                'rows': timer.rows,
+                'param_shape': timer.shape,
+                'at': time.time()
+            })
+
+        print(f"🐢 Slow query ({timer.seconds * 1000:.1f} ms, {timer.rows} rows, params {timer.shape}): {sql[:200]}")
+        for line in plan or []:
+            print(f"   {line}")
+
+    def close(self):
+        for cursor in list(self._cursors):
+            cursor._finish()
+        super().close()
+
+def connect(database, slow_threshold):
+    """Open a traced connection"""
+    conn = sqlite3.connect(database, factory=TracingConnection)
+    conn.slow_threshold = slow_threshold
+    return conn
+
+def report(limit=20, sort='total'):
+    """Top statements by total, max or slow count, plus the most recent slow ones"""
+    sort_key = {'total': 'total_seconds', 'max': 'max_seconds', 'count': 'count', 'slow': 'slow_count'}[sort]
+    with _lock:
+        statements = sorted((dict(s) for s in _stats.values()), key=lambda s: s[sort_key], reverse=True)
+        recent = list(_recent_slow)[-limit:]
+
+    for stats in statements:
+        stats['mean_seconds'] = stats['total_seconds'] / stats['count'] if stats['count'] else 0
+        stats['full_scan'] = any(line.strip().startswith('SCAN') for line in stats['plan'] or [])
+
+    return {'statements': statements[:limit], 'recent_slow': recent[::-1], 'tracked': len(statements)}
+
+def reset():
+    """Forget all collected statements"""
+    with _lock:
+        _stats.clear()
+        _recent_slow.clear()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Retention for the Recruitment Analytics Dashboard
+Keeps the latest N uploads in SQLite and moves older ones to compressed
+columnar archives (archive/upload_<id>.npz, see archive.py): their data rows,
+materialized saved-view results and upload record are deleted, snapshots,
+shared frames and model artifacts are dropped, and the freed pages are handed
+back to the filesystem with an incremental VACUUM.
+
+The server does the same in the background when RETENTION_UPLOADS is set;
+this command runs it on demand, e.g. from cron. With --server it asks the
+running server to do it (POST /api/retention), which also drops the archived
+uploads from the server's caches and, under serve.py, reloads every worker.
+Run locally, against the database file, a running server keeps serving the
+archived uploads from memory until it reloads: send SIGHUP to serve.py's
+master or restart the server.
+
+Usage:
+    python retention.py --keep 5 --dry-run
+    python retention.py --keep 5 --server http://localhost:5000
+    python retention.py --keep 5
+    python retention.py --keep 5 --database /data/recruitment_data.db --archive-folder /data/archive
+"""
+
+import argparse
+import json
+import sys
+import urllib.error
+import urllib.request
+
+def run_on_server(server, keep, dry_run):
+    """Retention report from a running server's POST /api/retention"""
+    req = urllib.request.Request(server.rstrip('/') + '/api/retention',
+                                 data=json.dumps({'keep': keep, 'dry_run': dry_run}).encode('utf-8'),
+                                 headers={'Content-Type': 'application/json'}, method='POST')
+    try:
+        with urllib.request.urlopen(req, timeout=3600) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.loads(e.read()).get('error', e.reason)
+        except ValueError:
+            message = e.reason
+        print(f"[-] Server refused the retention run: {message}")
+    except (urllib.error.URLError, OSError) as e:
+        print(f"[-] Could not reach the server at {server}: {e}")
+    sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description='Archive old uploads and compact the dashboard database')
+    parser.add_argument('--keep', type=int, required=True, help='Latest uploads kept in the database')
+    parser.add_argument('--database', default=None, help='SQLite database (default: the app setting)')
+    parser.add_argument('--archive-folder', default=None, help='Where archives are written (default: the app setting)')
+    parser.add_argument('--dry-run', action='store_true', help='Only list the uploads that would be archived')
+    parser.add_argument('--server', default=None,
+                        help='Run it in the server at this URL (e.g. http://localhost:5000), which also '
+                             'reloads the server; --database and --archive-folder are then the server\'s')
+    args = parser.parse_args()
+
+    if args.keep < 1:
+        print("[-] --keep must be at least 1")
+        sys.exit(1)
+
+    if args.server:
+        if args.database or args.archive_folder:
+            print("[-] --database and --archive-folder cannot be combined with --server")
+            sys.exit(1)
+        report = run_on_server(args.server, args.keep, args.dry_run)
+        archive_folder = 'the server\'s archive folder'
+    else:
+        import app as dashboard
+        config = {'RETENTION_UPLOADS': 0}  # no background schedule in this process
+        if args.database:
+            config['DATABASE'] = args.database
+        if args.archive_folder:
+            config['ARCHIVE_FOLDER'] = args.archive_folder
+        dashboard.create_app(config)
+        report = dashboard.apply_retention(args.keep, dry_run=args.dry_run)
+        archive_folder = dashboard.app.config['ARCHIVE_FOLDER']
+
+    if args.dry_run:
+        print(f"[*] Would archive {len(report['to_archive'])} upload(s): {report['to_archive']}")
+        return
+
+    if not report['archived']:
+        print(f"[*] Nothing to archive; {args.keep} or fewer uploads in the database")
+    else:
+        print(f"[+] Archived {len(report['archived'])} upload(s) {report['archived']} to "
+              f"{archive_folder} ({report['archive_bytes'] / 1024 / 1024:.1f} MB)")
+    print(f"[+] Database {report['database_bytes_before'] / 1024 / 1024:.1f} MB -> "
+          f"{report['database_bytes_after'] / 1024 / 1024:.1f} MB, reclaimed "
+          f"{report['reclaimed_bytes'] / 1024 / 1024:.1f} MB in {report['seconds']:.1f}s")
+    if report['archived'] and not args.server:
+        print("[*] A running server keeps serving the archived uploads until it reloads: "
+              "send SIGHUP to serve.py's master or restart it (or use --server)")
+
+if __name__ == '__main__':
+    main()
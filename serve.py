@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Pre-fork production server for the Recruitment Analytics Dashboard
+
+The master process imports the app, loads the prepared frames of the latest
+uploads and then forks the workers, so every worker shares one copy of that
+data copy-on-write instead of loading its own. Each worker runs a threaded
+WSGI server on the shared listening socket.
+
+SIGHUP (sent by a worker after an upload or a retention run that archived
+uploads, by the master after its own retention runs, and once a day after
+midnight with DAILY_REFRESH) makes the master reload and warm the latest
+uploads, fork a new generation of workers and stop the old one. Background
+retention runs in the master's loop, since no thread may be running when it
+forks.
+
+Dashboard requests are CPU-bound, so one worker saturates about one core;
+the default is a single worker. /metrics, /api/sql-trace and
+/api/memory-profile describe the worker that answered: metric samples carry
+a worker="<pid>" label and the JSON reports a "worker" field.
+
+Usage:
+    python serve.py --port 5000 --preload-uploads 2
+    kill -HUP <master pid>      # reload data into a new worker generation
+    kill -TERM <master pid>     # graceful shutdown
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from datetime import date
+
+GRACEFUL_TIMEOUT = 30  # seconds an old worker gets to finish in-flight requests
+POLL_INTERVAL = 0.5
+
+def memory_usage(pid):
+    """RSS and private memory of a process in MB, from /proc (Linux only)"""
+    usage = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', encoding='utf-8') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty'):
+                    usage[key] = int(value.split()[0]) / 1024
+    except OSError:
+        return None
+    return {
+        'rss_mb': usage.get('Rss', 0),
+        'pss_mb': usage.get('Pss', 0),
+        'private_mb': usage.get('Private_Clean', 0) + usage.get('Private_Dirty', 0)
+    }
+
+def run_worker(application, dashboard, sock, host, port):
+    """Serve requests on the inherited socket until told to stop"""
+    from werkzeug.serving import make_server
+
+    server = make_server(host, port, application, threaded=True, fd=sock.fileno())
+    dashboard.metrics.set_process_label('worker', os.getpid())
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    server.serve_forever()
+
+    # Let in-flight requests and queued training finish before exiting
+    deadline = time.monotonic() + GRACEFUL_TIMEOUT
+    for thread in threading.enumerate():
+        if thread is not threading.current_thread() and thread.daemon:
+            thread.join(max(deadline - time.monotonic(), 0))
+    dashboard.shutdown_background_work()
+
+class Master:
+    """Preloads data, forks workers and replaces them on reload or crash"""
+
+    def __init__(self, application, dashboard, sock, args):
+        self.application = application
+        self.dashboard = dashboard
+        self.sock = sock
+        self.args = args
+        self.generation = 0
+        self.workers = {}  # pid -> generation
+        self.reload_requested = False
+        self.stop_requested = False
+        self.next_retention = time.monotonic()
+        self.warmed_on = None
+
+    def preload(self):
+        gc.unfreeze()
+        started = time.perf_counter()
+        # Import the heavy libraries here too so workers share them instead of importing their own
+        import numpy, pandas  # noqa: F401
+        frames = self.dashboard.preload_frames(self.args.preload_uploads)
+        # Workers inherit the warm cache; warming in each worker would be lost on the next reload
+        warmed = self.dashboard.warm_latest_uploads(self.args.preload_uploads)
+        self.warmed_on = date.today()
+        # Keep the preloaded objects out of the collector so workers do not dirty their pages
+        gc.collect()
+        gc.freeze()
+        print(f"[+] Preloaded {len(frames)} frames and warmed uploads {warmed} "
+              f"in {time.perf_counter() - started:.2f}s: {frames}")
+
+    def new_day_started(self):
+        """Whether the workers' pipeline payloads were warmed for an earlier date"""
+        config = self.dashboard.app.config
+        if not config['DAILY_REFRESH'] or date.today() == self.warmed_on:
+            return False
+        seconds_into_day = time.time() - time.mktime(date.today().timetuple())
+        return seconds_into_day >= config['DAILY_REFRESH_DELAY']
+
+    def run_due_retention(self):
+        """Background retention on the master's own loop; archiving signals a reload"""
+        if not self.dashboard.retention_scheduled() or time.monotonic() < self.next_retention:
+            return
+        self.dashboard.run_scheduled_retention()
+        self.next_retention = time.monotonic() + self.dashboard.app.config['RETENTION_INTERVAL']
+
+    def spawn_worker(self):
+        # Unflushed output would otherwise be written again by the child
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.application, self.dashboard, self.sock, self.args.host, self.args.port)
+            except Exception as e:
+                print(f"[-] Worker {os.getpid()} failed: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = self.generation
+
+    def spawn_generation(self):
+        self.generation += 1
+        for _ in range(self.args.workers):
+            self.spawn_worker()
+        print(f"[+] Generation {self.generation}: {self.args.workers} workers "
+              f"{sorted(pid for pid, gen in self.workers.items() if gen == self.generation)}")
+
+    def stop_workers(self, generation=None):
+        for pid, gen in list(self.workers.items()):
+            if generation is None or gen == generation:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+    def reap(self):
+        """Collect exited workers; replace unexpected exits of the current generation"""
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            generation = self.workers.pop(pid, None)
+            if generation == self.generation and not self.stop_requested:
+                print(f"[-] Worker {pid} exited unexpectedly (status {status}), restarting")
+                self.spawn_worker()
+
+    def report(self):
+        master = memory_usage(os.getpid())
+        if master is None:
+            return
+        print(f"[*] Master RSS {master['rss_mb']:.0f} MB")
+        for pid in sorted(self.workers):
+            usage = memory_usage(pid)
+            if usage:
+                print(f"    worker {pid}: RSS {usage['rss_mb']:.0f} MB, PSS {usage['pss_mb']:.0f} MB, "
+                      f"private {usage['private_mb']:.0f} MB")
+
+    def run(self):
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, 'reload_requested', True))
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, 'stop_requested', True))
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, 'stop_requested', True))
+
+        self.preload()
+        self.spawn_generation()
+        last_report = time.monotonic()
+
+        while not self.stop_requested:
+            time.sleep(POLL_INTERVAL)
+            self.reap()
+            self.run_due_retention()
+            if self.new_day_started():
+                print("[*] New day: refreshing pipeline views")
+                self.reload_requested = True
+
+            if self.reload_requested:
+                self.reload_requested = False
+                old_generation = self.generation
+                print("[*] Reloading data...")
+                self.preload()
+                self.spawn_generation()
+                self.stop_workers(old_generation)
+
+            if self.args.stats and time.monotonic() - last_report >= self.args.stats:
+                self.report()
+                last_report = time.monotonic()
+
+        print("[*] Shutting down workers...")
+        self.stop_workers()
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(POLL_INTERVAL)
+        self.stop_workers()
+        print("[+] Stopped")
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the dashboard with pre-forked workers')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes; more than one only helps with a core free for each (default: 1)')
+    parser.add_argument('--preload-uploads', type=int, default=1,
+                        help='Latest uploads whose frames are loaded before forking')
+    parser.add_argument('--stats', type=float, default=0,
+                        help='Print per-worker memory every N seconds (0 = off)')
+    args = parser.parse_args()
+
+    if not hasattr(os, 'fork'):
+        print("[-] Pre-fork serving needs a POSIX system; use python app.py instead")
+        sys.exit(1)
+
+    import app as dashboard
+    application = dashboard.create_app({'PREFORK_MASTER_PID': os.getpid(), 'FRAME_STORE': True})
+
+    # Segments of a previous server that did not shut down cleanly hold stale frames
+    dashboard.get_frame_store().clear()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(128)
+    sock.set_inheritable(True)
+
+    print(f"[*] Master {os.getpid()} listening on http://{args.host}:{args.port}")
+    Master(application, dashboard, sock, args).run()
+
+if __name__ == '__main__':
+    main()
@@ -256,81 +256,9 @@ def create_sample_data(env_name):
     """Create sample Excel file for testing"""
     print(f"\n[*] Creating sample data...")
     
-    sample_script = '''
-import pandas as pd
-from datetime import datetime, timedelta
-import random
-
-# Sample data generation
-ta_partners = ['Alice Brown', 'Bob Smith', 'Carol Davis', 'David Wilson']
-roles = ['Software Engineer', 'Data Scientist', 'Product Manager', 'Sales Manager']
-countries = ['United States', 'United Kingdom', 'Germany', 'Canada']
-projects = ['Project Alpha', 'Project Beta', 'Project Gamma']
-
-# Generate hired data
-hired_data = []
-for i in range(50):
-    pos_created = datetime.now() - timedelta(days=random.randint(30, 365))
-    filled_date = pos_created + timedelta(days=random.randint(10, 80))
-    
-    hired_data.append({
-        'Position Created Date': pos_created,
-        'Filled Date': filled_date,
-        'Hiring Manager': f'Manager {random.randint(1, 10)}',
-        'TA Partner': random.choice(ta_partners),
-        'Sourcing Partner': random.choice(ta_partners),
-        'Country': random.choice(countries),
-        'Project': random.choice(projects),
-        'Role': random.choice(roles),
-        'Number of CVs shared': random.randint(10, 100),
-        'Number of 1st interviews': random.randint(2, 20),
-        'Number of offers': random.randint(1, 5),
-        'Number of accepted offers': 1,
-        'Max budgeted salary': random.randint(50000, 150000),
-        'Accepted salary': random.randint(48000, 155000),
-        'Currency': 'USD'
-    })
-
-# Generate pipeline data
-pipeline_data = []
-job_states = ['Sourcing', 'Interview', 'Offer', 'Reference Check']
-
-for i in range(30):
-    pipeline_data.append({
-        'Position Created Date': datetime.now() - timedelta(days=random.randint(1, 90)),
-        'Hiring Manager': f'Manager {random.randint(1, 10)}',
-        'TA Partner': random.choice(ta_partners),
-        'Sourcing Partner': random.choice(ta_partners),
-        'Country': random.choice(countries),
-        'Project': random.choice(projects),
-        'Role': random.choice(roles),
-        'Job State': random.choice(job_states),
-        'Number of CVs shared': random.randint(5, 50),
-        'Number of 1st interviews': random.randint(0, 15),
-        'Number of offers': random.randint(0, 3),
-        'Max budgeted salary': random.randint(50000, 150000),
-        'Currency': 'USD'
-    })
-
-# Create Excel file
-with pd.ExcelWriter('sample_recruitment_data.xlsx', engine='openpyxl') as writer:
-    pd.DataFrame(hired_data).to_excel(writer, sheet_name='Hired', index=False)
-    pd.DataFrame(pipeline_data).to_excel(writer, sheet_name='Final', index=False)
-
-print("[+] Sample data file created: sample_recruitment_data.xlsx")
-'''
-    
-    # Save and run the sample data script
-    with open("create_sample.py", "w", encoding='utf-8') as f:
-        f.write(sample_script)
-    
-    success = run_command(f"conda run -n {env_name} python create_sample.py", "Creating sample data")
-    
-    # Clean up
-    if os.path.exists("create_sample.py"):
-        os.remove("create_sample.py")
-    
-    return success
+    # generate_data.py writes the real Hired/Final headers that prepare_df() expects
+    return run_command(f"conda run -n {env_name} python generate_data.py --hired 50 --final 30 "
+                       f"--format xlsx --output sample_recruitment_data.xlsx", "Creating sample data")
 
 def main():
     """Main setup function"""
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Columnar per-upload snapshots of prepared sheets for the Recruitment Analytics Dashboard
+Each sheet is written once as a directory of .npy column files plus a JSON
+manifest. Reads memory-map only the requested columns, so loading a frame costs
+a few page faults instead of rebuilding every row from SQLite. Columns are
+encoded by columnar.py (text as int32 codes into the manifest's distinct values).
+
+SQLite stays the source of truth; a missing or unreadable snapshot just means
+the caller falls back to the database.
+"""
+
+import json
+import os
+import shutil
+import uuid
+import numpy as np
+import pandas as pd
+
+import columnar
+
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 1
+
+def snapshot_path(folder, upload_id, sheet_type):
+    """Directory holding one upload's sheet"""
+    return os.path.join(folder, str(int(upload_id)), sheet_type)
+
+def write_snapshot(path, df):
+    """Write a frame as one .npy file per column; replaces an existing snapshot atomically"""
+    if df is None or df.empty:
+        return False
+
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    staging = os.path.join(parent, f'.{os.path.basename(path)}.{uuid.uuid4().hex}')
+    os.makedirs(staging)
+
+    try:
+        manifest, arrays = columnar.encode_frame(df)
+        manifest = {'version': FORMAT_VERSION, **manifest}
+        for i, (column, values) in enumerate(zip(manifest['columns'], arrays)):
+            column['file'] = f'{i}.npy'
+            np.save(os.path.join(staging, column['file']), values, allow_pickle=False)
+
+        with open(os.path.join(staging, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+
+        # Swap the finished directory in; readers see the old or the new snapshot, never a mix
+        if os.path.isdir(path):
+            retired = f'{staging}.old'
+            os.rename(path, retired)
+            os.rename(staging, path)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            os.rename(staging, path)
+        return True
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+def read_snapshot(path, columns=None):
+    """Memory-map a snapshot, optionally only some columns; None if there is none"""
+    try:
+        with open(os.path.join(path, MANIFEST), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != FORMAT_VERSION:
+        return None
+
+    wanted = None if columns is None else set(columns)
+    data = {}
+    for column in manifest['columns']:
+        if wanted is not None and column['name'] not in wanted:
+            continue
+        try:
+            values = np.load(os.path.join(path, column['file']), mmap_mode='r', allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+        data[column['name']] = columnar.decode_column(column, values)
+
+    return pd.DataFrame(data, index=pd.RangeIndex(manifest['rows']), copy=False)
+
+def remove_snapshot(path):
+    """Delete a snapshot if present"""
+    shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,70 @@
+"""
+Shared fixtures: the dashboard app against an empty database in a temporary
+folder, and uploads made of generated sheets (see generate_data.py).
+
+Run from the repository root:
+    python -m pytest tests
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as dashboard_module
+from generate_data import generate_sheets
+
+@pytest.fixture
+def dashboard(tmp_path):
+    """The app module configured against its own database and folders in tmp_path"""
+    saved_config = dict(dashboard_module.app.config)
+    dashboard_module._initialized_databases.clear()
+    dashboard_module._preloaded_frames = {}
+    dashboard_module.clear_payload_cache()
+    dashboard_module.create_app({
+        'DATABASE': str(tmp_path / 'recruitment_data.db'),
+        'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+        'MODELS_FOLDER': str(tmp_path / 'models'),
+        'SNAPSHOT_FOLDER': str(tmp_path / 'snapshots'),
+        'ARCHIVE_FOLDER': str(tmp_path / 'archive'),
+        'FRAME_STORE_FOLDER': str(tmp_path / 'frame_store'),
+        'FRAME_STORE': False,
+        'AUTO_TRAIN_MODELS': False,
+        'CACHE_WARMUP': False,
+        'RETENTION_UPLOADS': 0,
+        'DAILY_REFRESH': False,
+        'QUERY_BACKEND': 'pandas',
+        'INGEST_ENGINE': 'pandas'
+    })
+
+    yield dashboard_module
+
+    # DuckDB tables and cached payloads are keyed by upload id, which the next database reuses
+    with dashboard_module.get_db_connection() as conn:
+        upload_ids = [row['id'] for row in conn.execute('SELECT id FROM uploads')]
+    if dashboard_module.duckdb_backend.DUCKDB_AVAILABLE:
+        for upload_id in upload_ids:
+            dashboard_module.duckdb_backend.drop_upload(upload_id)
+    dashboard_module.clear_payload_cache()
+    dashboard_module._initialized_databases.clear()
+    dashboard_module.app.config.clear()
+    dashboard_module.app.config.update(saved_config)
+
+@pytest.fixture
+def add_upload(dashboard):
+    """Function that stores generated Hired and Final sheets as a new upload and returns its id"""
+    def add(n_hired=300, n_final=150, seed=42, **options):
+        hired_raw, final_raw = generate_sheets(n_hired, n_final, seed=seed, end='2025-01-01', **options)
+        with dashboard.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('INSERT INTO uploads (filename, file_hash, has_hired_sheet, has_final_sheet) '
+                           'VALUES (?, ?, 1, 1)', (f'generated_{seed}.xlsx', f'generated-{seed}-{time.time_ns()}'))
+            upload_id = cursor.lastrowid
+            conn.commit()
+        dashboard.save_to_database(dashboard.prepare_df(hired_raw, 'hired')[0], 'hired', upload_id)
+        dashboard.save_to_database(dashboard.prepare_df(final_raw, 'final')[0], 'final', upload_id)
+        return upload_id
+    return add
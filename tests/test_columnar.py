@@ -0,0 +1,57 @@
+"""Frames survive the columnar encoding of snapshots, the frame store and archives unchanged"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import archive
+import columnar
+import snapshots
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'id': np.arange(1, 6, dtype=np.int64),
+        'salary': [85000.0, np.nan, 91000.5, 70000.0, np.nan],
+        'filled': [True, False, True, True, False],
+        'created': pd.to_datetime(['2024-01-02', None, '2024-03-04', '2023-12-31', '2024-02-29']),
+        'partner': ['TA Partner 1', None, 'TA Partner 2', 'TA Partner 1', 'TA Partner 3'],
+        'mixed': ['12', 7, None, 'n/a', 7]
+    })
+
+def test_encode_decode_round_trip(frame):
+    manifest, arrays = columnar.encode_frame(frame)
+    assert [column['kind'] for column in manifest['columns']] == ['numeric', 'numeric', 'numeric', 'datetime',
+                                                                  'text', 'text']
+    decoded = pd.DataFrame({column['name']: columnar.decode_column(column, values)
+                            for column, values in zip(manifest['columns'], arrays)})
+    pd.testing.assert_frame_equal(decoded, frame, check_exact=True)
+
+def test_snapshot_round_trip(tmp_path, frame):
+    path = snapshots.snapshot_path(str(tmp_path), 1, 'hired')
+    frame = frame.drop(columns='mixed')  # the manifest is JSON; text columns hold strings
+    assert snapshots.write_snapshot(path, frame)
+    pd.testing.assert_frame_equal(snapshots.read_snapshot(path).copy(), frame, check_exact=True)
+    pd.testing.assert_frame_equal(snapshots.read_snapshot(path, ['partner', 'id']).copy(),
+                                  frame[['id', 'partner']], check_exact=True)
+
+def test_archive_round_trip(tmp_path, frame):
+    path = archive.archive_path(str(tmp_path), 3)
+    frame = frame.drop(columns='mixed')
+    upload = {'id': 3, 'filename': 'sample.xlsx'}
+    archive.write_archive(path, upload, {'hired_data': frame, 'final_data': frame.iloc[:0]})
+
+    read_upload, tables = archive.read_archive(path)
+    assert read_upload == upload
+    pd.testing.assert_frame_equal(tables['hired_data'], frame, check_exact=True)
+    assert len(tables['final_data']) == 0
+
+def test_frame_store_round_trip(tmp_path, frame):
+    frame_store = pytest.importorskip('frame_store')
+    store = frame_store.FrameStore(str(tmp_path / 'frame_store'), str(tmp_path / 'test.db'))
+    try:
+        assert store.publish(('hired', 1), frame)
+        pd.testing.assert_frame_equal(store.attach(('hired', 1)).copy(), frame, check_exact=True)
+    finally:
+        store.release(('hired', 1))
+        store.evict(('hired', 1))
@@ -0,0 +1,33 @@
+"""The Polars ingest engine prepares exactly the frames the pandas engine does"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark import with_text_cells
+from generate_data import generate_sheets
+
+pytest.importorskip('polars')
+
+@pytest.fixture(scope='module')
+def raw_sheets():
+    """Generated sheets with missing values, and copies where some numbers and dates arrive as text"""
+    hired_raw, final_raw = generate_sheets(2000, 1000, end='2025-01-01', missing_rate=0.02)
+    rng = np.random.default_rng(7)
+    return {
+        'hired': ('hired', hired_raw),
+        'final': ('final', final_raw),
+        'hired, text cells': ('hired', with_text_cells(hired_raw, rng)),
+        'final, text cells': ('final', with_text_cells(final_raw, rng))
+    }
+
+@pytest.mark.parametrize('label', ['hired', 'final', 'hired, text cells', 'final, text cells'])
+def test_polars_matches_pandas(dashboard, raw_sheets, label):
+    sheet_type, sheet = raw_sheets[label]
+
+    frames = {}
+    for engine in ('pandas', 'polars'):
+        dashboard.app.config['INGEST_ENGINE'] = engine
+        frames[engine], _ = dashboard.prepare_df(sheet.copy(), sheet_type)
+
+    pd.testing.assert_frame_equal(frames['polars'], frames['pandas'], check_exact=True)
@@ -0,0 +1,173 @@
+"""Databases created by earlier versions are migrated in place when the app opens them"""
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# Schema of the original release: dates as YYYY-MM-DD text, no saved views, user_version 0
+BASELINE_SCHEMA = '''
+    CREATE TABLE uploads (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        filename TEXT NOT NULL,
+        file_hash TEXT UNIQUE NOT NULL,
+        upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        has_hired_sheet BOOLEAN DEFAULT 0,
+        has_final_sheet BOOLEAN DEFAULT 0
+    );
+    CREATE TABLE hired_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        upload_id INTEGER,
+        job_ref_id TEXT,
+        ta_partner TEXT,
+        position_created_date DATE,
+        job_title TEXT,
+        job_location_country TEXT,
+        project_name TEXT,
+        max_budgeted_salary REAL,
+        accepted_salary REAL,
+        accepted_salary_currency TEXT,
+        sourcing_partner TEXT,
+        hiring_manager TEXT,
+        filled_date DATE,
+        number_of_cvs_shared INTEGER,
+        number_of_cvs_shortlisted INTEGER,
+        number_of_candidates_interviewed INTEGER,
+        number_of_candidates_offered INTEGER,
+        number_of_candidates_accepted_offer INTEGER,
+        job_state TEXT,
+        business_line TEXT,
+        service_line TEXT,
+        time_to_fill INTEGER,
+        budget_variance_pct REAL,
+        cv_to_interview_rate REAL,
+        FOREIGN KEY (upload_id) REFERENCES uploads (id)
+    );
+    CREATE TABLE final_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        upload_id INTEGER,
+        job_ref_id TEXT,
+        ta_partner TEXT,
+        position_created_date DATE,
+        job_title TEXT,
+        job_location_country TEXT,
+        project_name TEXT,
+        max_budgeted_salary REAL,
+        accepted_salary REAL,
+        sourcing_partner TEXT,
+        hiring_manager TEXT,
+        number_of_cvs_shared INTEGER,
+        number_of_cvs_shortlisted INTEGER,
+        number_of_candidates_interviewed INTEGER,
+        number_of_candidates_offered INTEGER,
+        number_of_candidates_accepted_offer INTEGER,
+        job_state TEXT,
+        business_line TEXT,
+        service_line TEXT,
+        position_age INTEGER,
+        cv_to_interview_rate REAL,
+        FOREIGN KEY (upload_id) REFERENCES uploads (id)
+    );
+'''
+
+HIRED_ROWS = [
+    # job_ref_id, ta_partner, position_created_date, filled_date, time_to_fill
+    ('JR-1', 'TA Partner 1', '2024-01-15', '2024-02-20', 36),
+    ('JR-2', 'TA Partner 2', '1969-12-31', '1970-01-02', 2),
+    ('JR-3', 'TA Partner 1', None, '2024-03-01', None),
+    ('JR-4', 'TA Partner 3', '2024-02-29', None, None)
+]
+FINAL_ROWS = [
+    # job_ref_id, position_created_date, job_state
+    ('JR-10', '2024-06-01', 'Sourcing'),
+    ('JR-11', None, 'Interview')
+]
+
+def create_baseline_database(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.execute("INSERT INTO uploads (filename, file_hash, has_hired_sheet, has_final_sheet) "
+                 "VALUES ('old.xlsx', 'old-hash', 1, 1)")
+    conn.executemany('INSERT INTO hired_data (upload_id, job_ref_id, ta_partner, position_created_date, '
+                     'filled_date, time_to_fill) VALUES (1, ?, ?, ?, ?, ?)', HIRED_ROWS)
+    conn.executemany('INSERT INTO final_data (upload_id, job_ref_id, position_created_date, job_state) '
+                     'VALUES (1, ?, ?, ?)', FINAL_ROWS)
+    conn.commit()
+    conn.close()
+
+def open_database(dashboard, path):
+    """Point the app at a database and run its schema setup"""
+    dashboard.app.config['DATABASE'] = str(path)
+    dashboard.app.config['SNAPSHOTS'] = False
+    dashboard.ensure_database()
+
+def test_baseline_dates_become_day_numbers(dashboard, tmp_path):
+    path = tmp_path / 'baseline.db'
+    create_baseline_database(path)
+    open_database(dashboard, path)
+
+    conn = sqlite3.connect(path)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == 2
+    stored = conn.execute('SELECT position_created_date, filled_date, typeof(position_created_date) '
+                          'FROM hired_data ORDER BY id').fetchall()
+    assert stored == [(19737, 19773, 'integer'), (-1, 1, 'integer'), (None, 19783, 'null'),
+                      (19782, None, 'integer')]
+    assert conn.execute('SELECT position_created_date FROM final_data ORDER BY id').fetchall() == [(19875,), (None,)]
+
+    # Running the setup again leaves migrated values alone
+    dashboard.init_database()
+    assert conn.execute('SELECT position_created_date, filled_date, typeof(position_created_date) '
+                        'FROM hired_data ORDER BY id').fetchall() == stored
+    conn.close()
+
+    hired = dashboard.load_from_database('hired', 1).sort_values('id')
+    expected = pd.to_datetime([row[2] for row in HIRED_ROWS])
+    np.testing.assert_array_equal(hired['position_created_date'].to_numpy(), expected.to_numpy())
+    assert hired['filled_date'].isna().tolist() == [False, False, False, True]
+
+def test_migrated_database_serves_dashboards(dashboard, tmp_path):
+    path = tmp_path / 'baseline.db'
+    create_baseline_database(path)
+    open_database(dashboard, path)
+    client = dashboard.app.test_client()
+
+    hired = client.get('/api/dashboard-data/hired?upload_id=1').get_json()
+    assert hired['kpis']['total_filled'] == len(HIRED_ROWS)
+
+    pipeline = client.get('/api/dashboard-data/pipeline?upload_id=1&as_of=2024-06-11').get_json()
+    assert pipeline['kpis']['total_open'] == len(FINAL_ROWS)
+
+    rows = client.get('/api/rows/hired?upload_id=1&sort=position_created_date&start_date=2024-01-01'
+                      '&end_date=2024-12-31&columns=job_ref_id').get_json()
+    assert [row['job_ref_id'] for row in rows['rows']] == ['JR-1', 'JR-4']
+
+def test_saved_views_gain_error_columns(dashboard, tmp_path):
+    # A database from before materialization failures were recorded (user_version 1)
+    path = tmp_path / 'views.db'
+    create_baseline_database(path)
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE saved_views (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            dashboard_type TEXT NOT NULL,
+            filters TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            open_count INTEGER DEFAULT 0,
+            last_opened_at TIMESTAMP
+        );
+        INSERT INTO saved_views (name, dashboard_type, filters) VALUES ('Partner 1', 'hired', '{"ta_partner": ["TA Partner 1"]}');
+        PRAGMA user_version = 1;
+    ''')
+    conn.close()
+
+    open_database(dashboard, path)
+
+    conn = sqlite3.connect(path)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == 2
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(saved_views)')}
+    assert {'last_error', 'last_error_at'} <= columns
+    conn.close()
+
+    views = dashboard.app.test_client().get('/api/saved-views').get_json()['views']
+    assert [(view['name'], view['last_error']) for view in views] == [('Partner 1', None)]
@@ -0,0 +1,41 @@
+"""Pipeline ages are counted to an as_of date and never negative"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+def test_add_position_age(dashboard):
+    df = pd.DataFrame({'job_ref_id': ['a', 'b', 'c', 'd'],
+                       'position_created_date': pd.to_datetime(['2024-01-01', '2024-03-01', None, '2024-02-29'])})
+
+    aged = dashboard.add_position_age(df, '2024-02-29')
+
+    # Created after as_of: left out; no creation date: kept without an age
+    assert aged['job_ref_id'].tolist() == ['a', 'c', 'd']
+    np.testing.assert_array_equal(aged['position_age'].to_numpy(), [59, np.nan, 0])
+    assert 'position_age' not in df.columns
+
+@pytest.mark.parametrize('as_of', ['2024-08-15', '2024-10-15', '2025-06-01'])
+def test_pipeline_ages_as_of(dashboard, add_upload, as_of):
+    upload_id = add_upload(50, 400)
+    client = dashboard.app.test_client()
+
+    rows = client.get('/api/rows/pipeline', query_string={
+        'upload_id': upload_id, 'as_of': as_of, 'limit': 500,
+        'columns': 'position_created_date,position_age'}).get_json()['rows']
+    ages = [row['position_age'] for row in rows]
+    assert ages and min(ages) >= 0
+
+    with dashboard.get_db_connection() as conn:
+        existing = conn.execute('SELECT COUNT(*) FROM final_data WHERE upload_id = ? AND position_created_date <= ?',
+                                (upload_id, dashboard.epoch_day(as_of))).fetchone()[0]
+    assert len(rows) == existing
+
+    kpis = client.get(f'/api/dashboard-data/pipeline?upload_id={upload_id}&as_of={as_of}').get_json()['kpis']
+    assert kpis['total_open'] == existing
+
+def test_nothing_open_before_the_first_position(dashboard, add_upload):
+    upload_id = add_upload(50, 100)
+    kpis = dashboard.app.test_client().get(
+        f'/api/dashboard-data/pipeline?upload_id={upload_id}&as_of=2000-01-01').get_json()['kpis']
+    assert kpis['total_open'] == 0
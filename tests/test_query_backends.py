@@ -0,0 +1,45 @@
+"""The DuckDB query backend serves the same dashboard payloads as the pandas one"""
+
+import pytest
+
+from benchmark import payload_mismatches
+
+pytest.importorskip('duckdb')
+
+QUERIES = {
+    'all rows': {},
+    'partner': {'ta_partner': 'TA Partner 1,TA Partner 2'},
+    'date range': {'start_date': '2023-06-01', 'end_date': '2024-06-30'},
+    'empty date range': {'start_date': '2030-01-01', 'end_date': '2030-12-31'},
+    'country + date range': {'country': 'United States', 'start_date': '2023-01-01', 'end_date': '2024-12-01'},
+    'as of': {'as_of': '2024-10-01'},
+    'as of + date range': {'as_of': '2024-10-01', 'start_date': '2024-08-01', 'end_date': '2024-12-31'},
+    'no match': {'project': 'no such project'}
+}
+
+@pytest.fixture
+def upload_id(add_upload):
+    return add_upload(1500, 800, missing_rate=0.02)
+
+@pytest.mark.parametrize('dashboard_type', ['hired', 'pipeline'])
+@pytest.mark.parametrize('query', list(QUERIES))
+def test_duckdb_matches_pandas(dashboard, upload_id, dashboard_type, query, monkeypatch):
+    client = dashboard.app.test_client()
+    params = {'upload_id': upload_id, **QUERIES[query]}
+
+    # A DuckDB failure falls back to pandas quietly, which would compare pandas with itself
+    answered = []
+    in_duckdb = dashboard.build_dashboard_payload_duckdb
+    monkeypatch.setattr(dashboard, 'build_dashboard_payload_duckdb',
+                        lambda *args: answered.append(in_duckdb(*args)) or answered[-1])
+
+    payloads = {}
+    for backend in ('pandas', 'duckdb'):
+        dashboard.app.config['QUERY_BACKEND'] = backend
+        dashboard.clear_payload_cache()
+        response = client.get(f'/api/dashboard-data/{dashboard_type}', query_string=params)
+        assert response.status_code == 200
+        payloads[backend] = response.get_json()
+
+    assert len(answered) == 1 and answered[0] is not None
+    assert payload_mismatches(payloads['pandas'], payloads['duckdb']) == []
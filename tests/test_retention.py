@@ -0,0 +1,91 @@
+"""Retention archives old uploads, removes them from SQLite and keeps them readable"""
+
+import os
+
+import pandas as pd
+import pytest
+
+import archive
+
+def stored_rows(dashboard, upload_id):
+    """(uploads row, {table name: rows exactly as stored}) of an upload"""
+    with dashboard.get_db_connection() as conn:
+        upload = dict(conn.execute('SELECT * FROM uploads WHERE id = ?', (upload_id,)).fetchone())
+        tables = {table_name: pd.read_sql_query(f'SELECT * FROM {table_name} WHERE upload_id = ? ORDER BY id',
+                                                conn, params=(upload_id,))
+                  for table_name in ('hired_data', 'final_data')}
+    return upload, tables
+
+def remaining_rows(dashboard, upload_id):
+    """Rows of an upload left in any table"""
+    with dashboard.get_db_connection() as conn:
+        return sum(conn.execute(f'SELECT COUNT(*) FROM {table_name} WHERE {column} = ?', (upload_id,)).fetchone()[0]
+                   for table_name, column in (('uploads', 'id'), ('hired_data', 'upload_id'),
+                                              ('final_data', 'upload_id'), ('saved_view_results', 'upload_id')))
+
+def upload_ids(dashboard):
+    """ids of the uploads still in the database"""
+    with dashboard.get_db_connection() as conn:
+        return [row['id'] for row in conn.execute('SELECT id FROM uploads ORDER BY id')]
+
+@pytest.fixture
+def uploads(add_upload):
+    return [add_upload(200, 100, seed=seed, missing_rate=0.05) for seed in (1, 2, 3)]
+
+def test_dry_run_changes_nothing(dashboard, uploads):
+    report = dashboard.apply_retention(1, dry_run=True)
+
+    assert report == {'keep': 1, 'dry_run': True, 'to_archive': uploads[:2]}
+    assert upload_ids(dashboard) == uploads
+    assert not os.path.exists(dashboard.get_archive_path(uploads[0]))
+
+def test_run_archives_what_the_dry_run_listed(dashboard, uploads):
+    to_archive = dashboard.apply_retention(1, dry_run=True)['to_archive']
+    before = {upload_id: stored_rows(dashboard, upload_id) for upload_id in uploads}
+    kept_before = dashboard.load_from_database('hired', uploads[2])
+
+    report = dashboard.apply_retention(1)
+
+    assert report['archived'] == to_archive
+    assert report['archive_bytes'] == sum(os.path.getsize(dashboard.get_archive_path(upload_id))
+                                          for upload_id in to_archive)
+    assert report['database_bytes_after'] <= report['database_bytes_before']
+    assert upload_ids(dashboard) == uploads[2:]
+
+    client = dashboard.app.test_client()
+    for upload_id in to_archive:
+        assert remaining_rows(dashboard, upload_id) == 0
+        assert not os.path.exists(dashboard.get_snapshot_path(upload_id, 'hired'))
+        assert client.get(f'/api/dashboard-data/hired?upload_id={upload_id}').get_json() == \
+            {'error': 'No data available'}
+
+        # The archive holds exactly the rows that were stored
+        upload, tables = archive.read_archive(dashboard.get_archive_path(upload_id))
+        expected_upload, expected_tables = before[upload_id]
+        assert upload == expected_upload
+        for table_name, expected in expected_tables.items():
+            pd.testing.assert_frame_equal(tables[table_name], expected, check_exact=True)
+
+    pd.testing.assert_frame_equal(dashboard.load_from_database('hired', uploads[2]), kept_before, check_exact=True)
+
+    # Nothing left to archive
+    assert dashboard.apply_retention(1)['archived'] == []
+
+def test_keep_must_be_positive(dashboard, uploads):
+    with pytest.raises(ValueError):
+        dashboard.apply_retention(0)
+
+def test_retention_endpoint(dashboard, uploads):
+    client = dashboard.app.test_client()
+
+    assert client.post('/api/retention', json={'keep': 'two'}).status_code == 400
+    assert client.post('/api/retention', json={}).status_code == 400  # RETENTION_UPLOADS is not set
+    assert client.post('/api/retention', json={'keep': 0}).status_code == 400
+
+    dry_run = client.post('/api/retention', json={'keep': 2, 'dry_run': True}).get_json()
+    assert dry_run['to_archive'] == uploads[:1]
+    assert upload_ids(dashboard) == uploads
+
+    report = client.post('/api/retention', json={'keep': 2}).get_json()
+    assert report['archived'] == uploads[:1]
+    assert upload_ids(dashboard) == uploads[1:]
@@ -0,0 +1,34 @@
+"""Snapshot reads return exactly the frames a SQLite read returns"""
+
+import os
+
+import pandas as pd
+import pytest
+
+@pytest.mark.parametrize('sheet_type', ['hired', 'final'])
+@pytest.mark.parametrize('columns', [None, ['job_title', 'position_created_date', 'max_budgeted_salary']])
+def test_snapshot_matches_sqlite(dashboard, add_upload, sheet_type, columns):
+    upload_id = add_upload(missing_rate=0.05)
+
+    dashboard.app.config['SNAPSHOTS'] = True
+    assert os.path.isdir(dashboard.get_snapshot_path(upload_id, sheet_type))
+    from_snapshot = dashboard.load_from_database(sheet_type, upload_id, columns)
+
+    dashboard.app.config['SNAPSHOTS'] = False
+    from_sqlite = dashboard.load_from_database(sheet_type, upload_id, columns)
+
+    # Same rows, columns and dtypes; a snapshot keeps the table's column order
+    pd.testing.assert_frame_equal(from_snapshot.copy(), from_sqlite, check_exact=True, check_like=True)
+
+def test_first_full_read_writes_snapshot(dashboard, add_upload):
+    dashboard.app.config['SNAPSHOTS'] = False
+    upload_id = add_upload()
+    from_sqlite = dashboard.load_from_database('hired', upload_id)
+
+    dashboard.app.config['SNAPSHOTS'] = True
+    path = dashboard.get_snapshot_path(upload_id, 'hired')
+    assert not os.path.isdir(path)
+    dashboard.load_from_database('hired', upload_id)
+    assert os.path.isdir(path)
+
+    pd.testing.assert_frame_equal(dashboard.load_from_database('hired', upload_id).copy(), from_sqlite, check_exact=True)
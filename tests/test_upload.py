@@ -0,0 +1,35 @@
+"""Uploading a workbook stores its sheets; follow-up work never fails a committed upload"""
+
+import io
+
+from benchmark import write_workbook
+from generate_data import generate_sheets
+
+def post_workbook(client, seed=42):
+    hired_raw, final_raw = generate_sheets(120, 60, seed=seed, end='2025-01-01')
+    return client.post('/upload', content_type='multipart/form-data', data={
+        'file': (io.BytesIO(write_workbook(hired_raw, final_raw)), f'recruitment_{seed}.xlsx')})
+
+def test_upload_stores_both_sheets(dashboard):
+    response = post_workbook(dashboard.app.test_client())
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['success'] and body['has_hired'] and body['has_final']
+    assert len(dashboard.load_from_database('hired', body['upload_id'])) == 120
+    assert len(dashboard.load_from_database('final', body['upload_id'])) == 60
+
+def test_failed_follow_up_still_reports_success(dashboard, monkeypatch):
+    def refuse(*args):
+        raise RuntimeError('cannot schedule new futures after shutdown')
+    dashboard.app.config['AUTO_TRAIN_MODELS'] = True
+    monkeypatch.setattr(dashboard, 'schedule_model_training', refuse)
+    monkeypatch.setattr(dashboard, 'schedule_cache_warmup', refuse)
+
+    response = post_workbook(dashboard.app.test_client())
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['success']
+    assert 'Scheduling model training failed' in body['debug_info']
+    assert len(dashboard.load_from_database('hired', body['upload_id'])) == 120